@@ -0,0 +1,66 @@
+"""Measures the time taken to import the inference systems.
+
+Each measurement imports the module in a fresh interpreter, so it includes
+every dependency pulled in by the import.
+
+Usage:
+    python benchmarks/import_time.py [--module MODULE] [--repeat N]
+                                     [--max SECONDS]
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("matplotlib", "skfuzzy", "scipy")
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """Imports module in a fresh interpreter.
+
+    Returns:
+        the import time in seconds and the heavy modules it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(module=module,
+                                             heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    elapsed, heavy = result.stdout.split(" ")
+    return float(elapsed), [m for m in heavy.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="fuzzycontroller.system.singleton")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max", type=float, default=None,
+                        help="fail if the median import time is larger")
+    args = parser.parse_args()
+
+    times = []
+    for _ in range(args.repeat):
+        elapsed, heavy = measure(args.module)
+        times.append(elapsed)
+    median = statistics.median(times)
+    print(f"import {args.module}: median {median * 1000:.1f} ms, "
+          f"min {min(times) * 1000:.1f} ms over {args.repeat} runs")
+    if heavy:
+        print("heavy modules imported: " + ", ".join(heavy))
+    if args.max is not None and median > args.max:
+        sys.exit(f"median import time {median:.3f}s exceeds {args.max}s")
+
+
+if __name__ == "__main__":
+    main()
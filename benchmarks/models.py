@@ -0,0 +1,141 @@
+"""Generates synthetic models for the benchmarks.
+
+A model is described by the number of input variables, the number of terms
+per variable, the number of rules, the step of the universes and the depth
+of the antecedent trees. The same description and seed always give the
+same model.
+"""
+from __future__ import annotations
+import random
+
+MF_TYPES = ("trimf", "trapmf", "gauanglemf")
+
+
+def _fmt(value: float) -> str:
+    """Formats a number like the model json files do."""
+    return repr(round(value, 6))
+
+
+def generate_variable(n_terms: int, step: float, rng: random.Random,
+                      end: float = 100.0) -> dict:
+    """Generates a linguistic variable with evenly spread, overlapping
+    terms of random types over [0, end].
+
+    Args:
+        n_terms: number of terms.
+        step: step of the universe.
+        rng: the random generator.
+        end: end of the universe.
+
+    Returns:
+        the variable, in the model json format.
+    """
+    width = end / max(n_terms - 1, 1)
+    terms = {}
+    for i in range(n_terms):
+        centre = i * width
+        kind = rng.choice(MF_TYPES)
+        if kind == "trimf":
+            mf = {"type": "trimf",
+                  "params": [max(centre - width, 0), centre,
+                             min(centre + width, end)]}
+        elif kind == "trapmf":
+            mf = {"type": "trapmf",
+                  "params": [max(centre - width, 0),
+                             max(centre - width / 4, 0),
+                             min(centre + width / 4, end),
+                             min(centre + width, end)]}
+        else:
+            mf = {"type": "gauanglemf", "params": [centre, width / 2],
+                  "start": _fmt(centre - width), "end": _fmt(centre + width)}
+        terms[f"t{i}"] = {"name": f"t{i}", "mf": mf}
+    return {"universe": {"start": "0", "end": _fmt(end + step),
+                         "step": _fmt(step)},
+            "terms": terms}
+
+
+def generate_antecedent(depth: int, inputs: dict, rng: random.Random,
+                        negate_rate: float = 0.1) -> dict:
+    """Generates an antecedent tree of the given depth, with random AND / OR
+    operators and random, sometimes negated, propositions.
+
+    Args:
+        depth: number of operator levels, 0 for a single proposition.
+        inputs: the input variables of the model.
+        rng: the random generator.
+        negate_rate: probability of negating a proposition.
+
+    Returns:
+        the antecedent, in the model json format.
+    """
+    if depth == 0:
+        name = rng.choice(sorted(inputs))
+        term = rng.choice(sorted(inputs[name]["terms"]))
+        prefix = "NOT " if rng.random() < negate_rate else ""
+        return {"antecedent1": f"{prefix}{name} IS {term}"}
+
+    def operand(child_depth):
+        child = generate_antecedent(child_depth, inputs, rng, negate_rate)
+        return child["antecedent1"] if child_depth == 0 else child
+
+    return {"antecedent1": operand(depth - 1),
+            "operator": rng.choice(("AND", "OR")),
+            "antecedent2": operand(rng.randint(0, depth - 1))}
+
+
+def generate_model(n_inputs: int = 3, n_terms: int = 5, n_rules: int = 20,
+                   step: float = 0.1, depth: int = 2,
+                   seed: int = 0) -> dict:
+    """Generates a model.
+
+    Args:
+        n_inputs: number of input variables.
+        n_terms: number of terms of every variable.
+        n_rules: number of rules.
+        step: step of every universe.
+        depth: depth of every antecedent tree.
+        seed: seed of the random generator.
+
+    Returns:
+        the model, in the model json format.
+    """
+    rng = random.Random(seed)
+    inputs = {f"x{i}": generate_variable(n_terms, step, rng)
+              for i in range(n_inputs)}
+    output = {"y": generate_variable(n_terms, step, rng)}
+    rules = {}
+    for i in range(n_rules):
+        rules[f"rule{i}"] = {
+            "antecedent": generate_antecedent(depth, inputs, rng),
+            "consequent": f"y IS {rng.choice(sorted(output['y']['terms']))}"}
+    return {"inputs": inputs, "output": output, "rules": rules}
+
+
+def generate_inputs(model: dict, system_type: str, n: int,
+                    seed: int = 0) -> list[dict]:
+    """Generates random inputs within the universes of a model.
+
+    Args:
+        model: the model.
+        system_type: either 'singleton' or 'non-singleton'.
+        n: number of inputs.
+        seed: seed of the random generator.
+
+    Returns:
+        a list of input dictionaries.
+    """
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        sample = {}
+        for name, variable in model["inputs"].items():
+            end = float(variable["universe"]["end"]) \
+                - float(variable["universe"]["step"])
+            if system_type == "singleton":
+                sample[name] = rng.uniform(0, end)
+            else:
+                start = rng.uniform(0, end * 0.9)
+                sample[name] = {"start": start,
+                                "end": start + rng.uniform(0.5, end * 0.1)}
+        samples.append(sample)
+    return samples
@@ -0,0 +1,105 @@
+"""Compares the accuracy, memory and speed of the float32 and float16 modes
+with float64.
+
+Every mode evaluates the same batch of random inputs on the same synthetic
+model (see benchmarks/models.py). The report gives the largest and mean
+absolute difference of the outputs from float64, the memory held by the
+term matrices, and the time spent in the aggregation stage and in a whole
+batch. Most CPUs have no float16 arithmetic, so numpy emulates it and the
+float16 mode saves memory but is slower.
+
+Usage:
+    python benchmarks/precision.py [--type TYPE] [--samples N]
+                                   [--output FILE]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.models import generate_inputs, generate_model  # noqa: E402
+from fuzzycontroller.cli import SYSTEMS, rows_to_batch  # noqa: E402
+import numpy as np  # noqa: E402
+
+DTYPES = ("float64", "float32", "float16")
+
+# Cases as (inputs, terms, rules, step, depth).
+CASES = [(3, 5, 20, 0.1, 2), (3, 5, 100, 0.01, 2), (6, 7, 200, 0.05, 3)]
+
+
+def run_case(case: tuple, system_type: str, samples: int,
+             repeat: int = 5) -> list[dict]:
+    """Evaluates one case in every dtype.
+
+    Returns:
+        one result per dtype.
+    """
+    model = generate_model(*case)
+    rows = generate_inputs(model, system_type, samples)
+    results = []
+    reference = None
+    for dtype in DTYPES:
+        fis = SYSTEMS[system_type]()
+        fis.load_dict(model, dtype=dtype)
+        batch = rows_to_batch(fis, rows)
+        profiler = fis.enable_profiling()
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs = fis.compute_defuzzified_outputs(batch)
+            best = min(best, time.perf_counter() - start)
+        fis.disable_profiling()
+        if reference is None:
+            reference = outputs
+
+        error = np.abs(outputs - reference)
+        results.append({
+            "case": "i{}-t{}-r{}-s{}-d{}".format(*case),
+            "type": system_type, "dtype": dtype,
+            "max_abs_error": float(np.nanmax(error)),
+            "mean_abs_error": float(np.nanmean(error)),
+            "term_matrix_kib": sum(variable.term_matrix.nbytes
+                                   for variable in fis.variables.values())
+            / 1024,
+            "aggregation_ms": profiler.times_ns["aggregation"]
+            / profiler.calls["aggregation"] / 1e6,
+            "batch_ms": best * 1000})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--type", choices=sorted(SYSTEMS), nargs="+",
+                        default=sorted(SYSTEMS), help="types of system")
+    parser.add_argument("--samples", type=int, default=500,
+                        help="number of random inputs per case")
+    parser.add_argument("--output", help="file the results are written to")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'case':<20} {'type':<14} {'dtype':<8} {'max err':>10} "
+          f"{'mean err':>10} {'terms KiB':>10} {'aggr ms':>8} "
+          f"{'batch ms':>9}")
+    for case in CASES:
+        for system_type in args.type:
+            for result in run_case(case, system_type, args.samples):
+                results.append(result)
+                print(f"{result['case']:<20} {system_type:<14} "
+                      f"{result['dtype']:<8} {result['max_abs_error']:10.2e} "
+                      f"{result['mean_abs_error']:10.2e} "
+                      f"{result['term_matrix_kib']:10.0f} "
+                      f"{result['aggregation_ms']:8.2f} "
+                      f"{result['batch_ms']:9.2f}", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Benchmarks the hot paths of the inference systems on synthetic models.
+
+For every case (inputs x terms x rules x universe step x antecedent depth)
+and system type, it measures the latency and throughput of load_data,
+get_all_firing_strengths, compute_aggregate_set and
+compute_defuzzified_output, and the peak memory traced while loading the
+model and evaluating one input. The results are written as JSON and can be
+compared against a previous run.
+
+The cases with 2000 rules and 50 terms per variable exercise the sparse
+rule path (at least RuleProgram.min_sparse_rules rules) and the indexed
+fuzzification (at least LinguisticVariable.min_indexed_terms terms).
+
+load_data includes compiling the rules into a RuleProgram.
+
+Usage:
+    python benchmarks/run.py [--quick] [--output FILE] [--baseline FILE]
+                             [--tolerance FRACTION]
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.models import generate_inputs, generate_model  # noqa: E402
+from fuzzycontroller.system.nonsingleton import NonSingletonFIS  # noqa: E402
+from fuzzycontroller.system.singleton import SingletonFIS  # noqa: E402
+import numpy as np  # noqa: E402
+
+SYSTEMS = {"singleton": SingletonFIS, "non-singleton": NonSingletonFIS}
+OPERATIONS = ("load_data", "get_all_firing_strengths",
+              "compute_aggregate_set", "compute_defuzzified_output")
+
+# Cases as (inputs, terms, rules, step, depth).
+QUICK_CASES = [(2, 3, 5, 0.1, 1), (3, 5, 20, 0.1, 2)]
+FULL_CASES = QUICK_CASES + [
+    (3, 5, 20, 0.01, 2), (3, 5, 100, 0.1, 2), (3, 5, 20, 0.1, 4),
+    (6, 5, 50, 0.1, 2), (3, 9, 50, 0.1, 2), (8, 7, 200, 0.05, 3),
+    (3, 50, 2000, 0.1, 2), (4, 50, 2000, 0.1, 1)]
+
+
+def case_name(case: tuple) -> str:
+    """Returns the name of a case, e.g. 'i3-t5-r20-s0.1-d2'."""
+    return "i{}-t{}-r{}-s{}-d{}".format(*case)
+
+
+def time_calls(function, inputs: list, min_time: float) -> list[float]:
+    """Calls function on the inputs, cycling through them, until min_time
+    has passed.
+
+    Returns:
+        the duration of every call, in seconds.
+    """
+    durations = []
+    total = 0.0
+    for x in itertools.cycle(inputs):
+        start = time.perf_counter()
+        function(x)
+        elapsed = time.perf_counter() - start
+        durations.append(elapsed)
+        total += elapsed
+        if total >= min_time and len(durations) >= len(inputs):
+            return durations
+
+
+def summarize(durations: list[float]) -> dict[str, float]:
+    """Summarizes call durations into latencies (µs) and throughput."""
+    durations = np.array(durations)
+    return {"calls": len(durations),
+            "median_us": float(np.median(durations) * 1e6),
+            "p90_us": float(np.percentile(durations, 90) * 1e6),
+            "per_second": float(len(durations) / durations.sum())}
+
+
+def run_case(case: tuple, system_type: str, min_time: float,
+             n_inputs: int = 64) -> dict:
+    """Benchmarks one case with one system type.
+
+    Returns:
+        the results, with one entry per operation and the peak memory.
+    """
+    model = generate_model(*case)
+    inputs = generate_inputs(model, system_type, n_inputs)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.json")
+        with open(path, "w") as f:
+            json.dump(model, f)
+
+        # Warm up first so lazily imported modules are not traced.
+        warmup = SYSTEMS[system_type]()
+        warmup.load_data(path)
+        warmup.compute_defuzzified_output(inputs[0])
+
+        tracemalloc.start()
+        fis = SYSTEMS[system_type]()
+        fis.load_data(path)
+        fis.compute_defuzzified_output(inputs[0])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results = {"case": case_name(case), "type": system_type,
+                   "peak_memory_kib": peak / 1024,
+                   "load_data": summarize(time_calls(
+                       lambda _: SYSTEMS[system_type]().load_data(path),
+                       [None], min_time))}
+    for operation in OPERATIONS[1:]:
+        results[operation] = summarize(time_calls(
+            getattr(fis, operation), inputs, min_time))
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict],
+            tolerance: float) -> list[str]:
+    """Compares the median latencies against a baseline.
+
+    Returns:
+        a description of every latency which grew by more than tolerance.
+    """
+    previous = {(r["case"], r["type"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["case"], result["type"]))
+        if old is None:
+            continue
+        for operation in OPERATIONS:
+            ratio = result[operation]["median_us"] \
+                / old[operation]["median_us"]
+            line = (f"{result['case']:<22} {result['type']:<14} "
+                    f"{operation:<27} {ratio:6.2f}x")
+            print(line)
+            if ratio > 1 + tolerance:
+                regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true",
+                        help="only run the small cases")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds spent timing each operation")
+    parser.add_argument("--output", default="benchmark-results.json",
+                        help="file the results are written to")
+    parser.add_argument("--baseline",
+                        help="results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown of a median latency")
+    args = parser.parse_args()
+
+    results = []
+    for case in QUICK_CASES if args.quick else FULL_CASES:
+        for system_type in SYSTEMS:
+            result = run_case(case, system_type, args.min_time)
+            results.append(result)
+            print(f"{result['case']:<22} {system_type:<14} " + "  ".join(
+                f"{operation} {result[operation]['median_us']:.1f}us"
+                for operation in OPERATIONS)
+                + f"  peak {result['peak_memory_kib']:.0f}KiB")
+
+    with open(args.output, "w") as f:
+        json.dump({"python": platform.python_version(),
+                   "numpy": np.__version__,
+                   "machine": platform.machine(),
+                   "results": results}, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            sys.exit("regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
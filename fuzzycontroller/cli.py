@@ -0,0 +1,315 @@
+from __future__ import annotations
+from .system.singleton import SingletonFIS
+from .system.nonsingleton import NonSingletonFIS
+from .system.tsk import TSKFIS
+from .system.fis import FIS
+from typing import Iterator, TextIO
+import argparse
+import asyncio
+import contextlib
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+import time
+import numpy as np
+
+SYSTEMS = {"singleton": SingletonFIS, "non-singleton": NonSingletonFIS,
+           "tsk": TSKFIS}
+
+
+def load_system(model: str, system_type: str) -> FIS:
+    """Creates an inference system and loads a model into it.
+
+    Args:
+        model: path to the model json file, or to a compiled model written
+            by the compile command ('.fzc').
+        system_type: either 'singleton' or 'non-singleton'.
+
+    Returns:
+        the loaded inference system.
+    """
+    fis = SYSTEMS[system_type]()
+    if model.endswith(".fzc"):
+        fis.load_compiled(model)
+    else:
+        fis.load_data(model)
+    return fis
+
+
+def read_rows(stream: TextIO, input_format: str) \
+        -> Iterator[tuple[int, dict]]:
+    """Lazily reads the input rows of a csv or jsonl stream.
+
+    Args:
+        stream: the text stream to read.
+        input_format: either 'csv' or 'jsonl'.
+
+    Returns:
+        an iterator over the rows, as (line number, dictionary) pairs. A
+        jsonl line which is not valid JSON gives the raised exception
+        instead of a dictionary.
+    """
+    if input_format == "csv":
+        reader = csv.DictReader(stream)
+        return ((reader.line_num, row) for row in reader)
+    return ((number, _parse_json(line))
+            for number, line in enumerate(stream, 1) if line.strip())
+
+
+def _parse_json(line: str) -> dict or ValueError:
+    """Parses a jsonl line, returning the exception if it is invalid."""
+    try:
+        return json.loads(line)
+    except ValueError as error:
+        return error
+
+
+def rows_to_batch(fis: FIS, rows: list[dict]) -> dict:
+    """Converts input rows into a batch for
+    :meth:`.FIS.compute_defuzzified_outputs`.
+
+    Singleton and TSK rows hold one value per input variable. Non-singleton
+    rows hold a {'start', 'end'} interval per input variable, or, when read
+    from a csv file, '<variable>_start' and '<variable>_end' columns.
+
+    Args:
+        fis: the inference system the batch is for.
+        rows: the input rows.
+
+    Returns:
+        the batch.
+    """
+    if isinstance(fis, SingletonFIS):
+        return {name: np.array([float(row[name]) for row in rows])
+                for name in fis.input_names}
+
+    batch = {}
+    for name in fis.input_names:
+        bounds = [row[name] if name in row else
+                  {"start": row[f"{name}_start"], "end": row[f"{name}_end"]}
+                  for row in rows]
+        batch[name] = {key: np.array([float(bound[key]) for bound in bounds])
+                       for key in ("start", "end")}
+    return batch
+
+
+def write_outputs(stream: TextIO, outputs: np.ndarray, output_format: str):
+    """Writes a chunk of outputs to a csv or jsonl stream.
+
+    Args:
+        stream: the text stream to write to.
+        outputs: the defuzzified outputs.
+        output_format: either 'csv' or 'jsonl'.
+    """
+    if output_format == "csv":
+        stream.writelines(f"{output!r}\n" for output in outputs.tolist())
+    else:
+        stream.writelines(
+            json.dumps({"output": None if math.isnan(output) else output})
+            + "\n" for output in outputs.tolist())
+    stream.flush()
+
+
+def evaluate_stream(fis: FIS, source: TextIO, sink: TextIO,
+                    input_format: str, output_format: str,
+                    chunk_size: int = 4096,
+                    defuzzication_method: str = "centroid",
+                    skip_errors: bool = False) -> int:
+    """Evaluates a stream of inputs in fixed size chunks.
+
+    Only one chunk is held in memory at a time, and its outputs are written
+    before the next chunk is read. A row which cannot be evaluated, e.g.
+    because it is malformed or out of range, raises a ValueError naming its
+    line, or, with skip_errors, is reported on stderr and output as nan so
+    that the outputs stay aligned with the rows.
+
+    Args:
+        fis: the inference system.
+        source: the input stream.
+        sink: the output stream.
+        input_format: either 'csv' or 'jsonl'.
+        output_format: either 'csv' or 'jsonl'.
+        chunk_size: number of rows evaluated per batch.
+        defuzzication_method: method used to defuzzify the outputs.
+        skip_errors: report and skip the rows which cannot be evaluated
+            instead of stopping.
+
+    Returns:
+        the number of rows read.
+
+    Raises:
+        ValueError: if a row cannot be evaluated and skip_errors is False.
+    """
+    if output_format == "csv":
+        sink.write("output\n")
+    rows = read_rows(source, input_format)
+    count = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return count
+        outputs = _evaluate_chunk(fis, chunk, defuzzication_method,
+                                  skip_errors)
+        write_outputs(sink, outputs, output_format)
+        count += len(chunk)
+
+
+def _evaluate_chunk(fis: FIS, chunk: list[tuple[int, dict]],
+                    defuzzication_method: str,
+                    skip_errors: bool) -> np.ndarray:
+    """Evaluates a chunk of (line number, row) pairs as one batch. If the
+    batch cannot be evaluated, the rows are evaluated one by one to find
+    the bad ones, see :func:`evaluate_stream`."""
+    try:
+        return fis.compute_defuzzified_outputs(
+            rows_to_batch(fis, [row for _, row in chunk]),
+            defuzzication_method)
+    except Exception:
+        pass
+
+    outputs = np.empty(len(chunk))
+    for i, (line, row) in enumerate(chunk):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            outputs[i] = fis.compute_defuzzified_outputs(
+                rows_to_batch(fis, [row]), defuzzication_method)[0]
+        except Exception as error:
+            if not skip_errors:
+                raise ValueError(f"line {line}: {error}") from error
+            print(f"line {line}: skipped, {error}", file=sys.stderr)
+            outputs[i] = np.nan
+    return outputs
+
+
+def _guess_format(path: str, default: str) -> str:
+    """Guesses the format of a file from its extension."""
+    if path.endswith(".jsonl"):
+        return "jsonl"
+    if path.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def _open(path: str, mode: str, stack: contextlib.ExitStack) -> TextIO:
+    """Opens path, or returns stdin / stdout for '-'."""
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return stack.enter_context(open(path, mode, newline=""))
+
+
+def _eval(args: argparse.Namespace) -> int:
+    """Runs the eval command."""
+    fis = load_system(args.model, args.type)
+    input_format = args.format or _guess_format(args.input, "csv")
+    output_format = args.output_format or _guess_format(args.output,
+                                                        input_format)
+    with contextlib.ExitStack() as stack:
+        source = _open(args.input, "r", stack)
+        sink = _open(args.output, "w", stack)
+        start = time.perf_counter()
+        count = evaluate_stream(fis, source, sink, input_format,
+                                output_format, args.chunk_size, args.method,
+                                args.skip_errors)
+        elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"{count} rows in {elapsed:.3f}s ({rate:.0f} rows/sec)",
+          file=sys.stderr)
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    """Runs the serve command."""
+    from .server import serve
+    fis = load_system(args.model, args.type)
+    print(f"serving {args.model} on "
+          + (args.unix or f"{args.host}:{args.port}"), file=sys.stderr)
+    try:
+        asyncio.run(serve(fis, args.host, args.port, args.unix,
+                          args.max_batch_size, args.max_wait_ms / 1000,
+                          args.method))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _compile(args: argparse.Namespace) -> int:
+    """Runs the compile command."""
+    output = args.output or os.path.splitext(args.model)[0] + ".fzc"
+    load_system(args.model, args.type).save_compiled(output)
+    print(f"compiled {args.model} to {output}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the command line parser."""
+    parser = argparse.ArgumentParser(prog="python -m fuzzycontroller")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evaluate = commands.add_parser(
+        "eval", help="evaluate a stream of inputs with a model")
+    evaluate.add_argument("model",
+                          help="path to the model json or .fzc file")
+    evaluate.add_argument("-i", "--input", default="-",
+                          help="csv or jsonl input file, - for stdin")
+    evaluate.add_argument("-o", "--output", default="-",
+                          help="output file, - for stdout")
+    evaluate.add_argument("--format", choices=["csv", "jsonl"],
+                          help="input format, guessed from the extension")
+    evaluate.add_argument("--output-format", choices=["csv", "jsonl"],
+                          help="output format, defaults to the input format")
+    evaluate.add_argument("--type", choices=sorted(SYSTEMS),
+                          default="singleton", help="type of the system")
+    evaluate.add_argument("--chunk-size", type=int, default=4096,
+                          help="number of rows evaluated per batch")
+    evaluate.add_argument("--method", default="centroid",
+                          help="defuzzification method")
+    evaluate.add_argument("--skip-errors", action="store_true",
+                          help="report rows which cannot be evaluated on "
+                          "stderr and output them as nan / null")
+    evaluate.set_defaults(func=_eval)
+
+    server = commands.add_parser(
+        "serve", help="serve a model over line-delimited JSON")
+    server.add_argument("model", help="path to the model json or .fzc file")
+    server.add_argument("--host", default="127.0.0.1",
+                        help="host to listen on")
+    server.add_argument("--port", type=int, default=8765,
+                        help="TCP port to listen on")
+    server.add_argument("--unix", help="listen on this Unix socket instead")
+    server.add_argument("--type", choices=sorted(SYSTEMS),
+                        default="singleton", help="type of the system")
+    server.add_argument("--max-batch-size", type=int, default=256,
+                        help="largest number of requests evaluated together")
+    server.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="longest time a batch waits for requests")
+    server.add_argument("--method", default="centroid",
+                        help="defuzzification method")
+    server.set_defaults(func=_serve)
+
+    compiler = commands.add_parser(
+        "compile", help="build a model and save it in the binary format")
+    compiler.add_argument("model", help="path to the model json file")
+    compiler.add_argument("-o", "--output",
+                          help="output file, defaults to the model with a "
+                          ".fzc extension")
+    compiler.add_argument("--type", choices=sorted(SYSTEMS),
+                          default="singleton", help="type of the system")
+    compiler.set_defaults(func=_compile)
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """Entry point of ``python -m fuzzycontroller``.
+
+    Args:
+        argv: command line arguments, defaults to sys.argv[1:].
+
+    Returns:
+        the exit code.
+    """
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -1,6 +1,8 @@
 from numpy._typing import NDArray
 from ..membership.membership_functions import TriangularMF, \
         TrapezoidalMF, GauAngleMF, MembershipFunction
+from ..utils.pool import ArrayPool
+import numbers
 import numpy as np
 
 
@@ -18,7 +20,9 @@ class LinguisticTerm:
             associated membership function.
     """
 
-    def __init__(self, universe: NDArray, term: dict) -> None:
+    def __init__(self, universe: NDArray, term: dict,
+                 mf: NDArray = None, pool: ArrayPool = None,
+                 dtype=np.float64) -> None:
         """Initializes the LinguisticTerm based on the universe and a
         dictionary.
 
@@ -26,10 +30,17 @@ class LinguisticTerm:
             universe: the universe of discourse
             term: a dictionary defining the term. should be of the
                 form, {'name': str, 'mf': {'type': str, 'params': lst}}
+            mf: the membership function already sampled over the
+                universe, e.g. from a compiled model.
+            pool: pool in which the sampled membership function is
+                interned, so that terms with the same membership function
+                over the same (interned) universe share one array.
+            dtype: the floating point type of the sampled membership
+                function.
         """
         self.name = term['name']
         self.universe = universe
-        self.mf = self._load_mf(term['mf'])
+        self.mf = self._load_mf(term['mf'], mf, pool, dtype)
 
     def __eq__(self, other) -> bool:
         """Tests equality of this LinguisticTerm and another.
@@ -47,37 +58,59 @@ class LinguisticTerm:
                     self.mf == other.mf
         return False
 
-    def _load_mf(self, mf: dict) -> MembershipFunction:
+    def _load_mf(self, mf: dict, sampled: NDArray = None,
+                 pool: ArrayPool = None,
+                 dtype=np.float64) -> MembershipFunction:
         """Loads the membership function from a dictionary.
         Example dict: {'type': 'trimf', 'params': [1, 5, 10]}
 
         Args:
             mf: dictionary containing the membership function info.
+            sampled: the already sampled membership function, if any.
+            pool: pool to intern the sampled membership function in.
+            dtype: the floating point type of the sampled membership
+                function.
 
         Returns:
             A membership function defined in the dictionary.
         """
+        if sampled is None and pool is not None and \
+                pool.key_of(self.universe) is not None:
+            key = ("mf", pool.key_of(self.universe), np.dtype(dtype).str,
+                   mf['type'], tuple(float(param) for param in mf['params']),
+                   float(mf.get('start', 0)), float(mf.get('end', 0)))
+            sampled = pool.intern(key,
+                                  lambda: self._load_mf(mf, dtype=dtype).mf)
+
         if mf['type'] == "trimf":
-            return TriangularMF(self.universe, mf['params'])
+            return TriangularMF(self.universe, mf['params'], sampled, dtype)
         elif mf['type'] == "trapmf":
-            return TrapezoidalMF(self.universe, mf['params'])
+            return TrapezoidalMF(self.universe, mf['params'], sampled, dtype)
         return GauAngleMF(self.universe, mf['params'],
-                          float(mf['start']), float(mf['end']))
+                          float(mf['start']), float(mf['end']), sampled,
+                          dtype)
 
     def compute_membership(self, input_value,
                            input_type: str) -> float:
         """Compute the membership value of the given input.
 
         Args:
-            crisp_input: crisp input value.
+            crisp_input: crisp input value (an int or a float), or a 1-D
+                numpy array of crisp input values when computing a batch of
+                singleton inputs.
             input_type: type of the input, either 'singleton' or
                 'non-singleton'
         Returns:
-            membership value of the given crisp input.
+            membership value of the given crisp input, or a numpy array of
+                membership values for a batch of inputs.
         """
-        if input_type == "singleton" and isinstance(input_value, float):
+        if input_type == "singleton" and \
+                isinstance(input_value, numbers.Real):
             return self.mf.singleton_interp_mem(input_value)
 
+        if input_type == "singleton" and isinstance(input_value, np.ndarray):
+            return self.mf.singleton_interp_mems(input_value)
+
         if input_type == "non-singleton" and isinstance(input_value,
                                                         MembershipFunction):
             return self.mf.nonsingleton_interp_mem(input_value.mf,
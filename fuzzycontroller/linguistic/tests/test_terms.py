@@ -16,6 +16,8 @@ def test_compute_membership_singleton():
                                               "mf": {"type": "trimf",
                                                      "params": [0, 5, 10]}})
     assert lt.compute_membership(5.0, "singleton") == 1.0
+    assert lt.compute_membership(5, "singleton") == 1.0
+    assert lt.compute_membership(np.int64(5), "singleton") == 1.0
 
 
 def test_compute_membership_nonsingleton():
@@ -1,6 +1,7 @@
 from ..variables import LinguisticVariable
 from ..terms import LinguisticTerm
 import numpy as np
+import pytest
 
 
 def test_load_name():
@@ -85,3 +86,115 @@ def test_get_all_firing_strengths_singleton():
                              })
     fs = lv.compute_memberships(10.0, "singleton")
     assert fs == {"cold": 1.0}
+
+
+def _temperature():
+    return LinguisticVariable("temp",
+                              {"universe": {"start": 0, "end": 60,
+                                            "step": 0.1},
+                               "terms": {
+                                   "cold": {
+                                       "name": "cold",
+                                       "mf": {"type": "trimf",
+                                              "params": [0, 10, 20]}},
+                                   "warm": {
+                                       "name": "warm",
+                                       "mf": {"type": "gauanglemf",
+                                              "params": [25, 3],
+                                              "start": 15,
+                                              "end": 35}},
+                                   "hot": {
+                                       "name": "hot",
+                                       "mf": {"type": "trapmf",
+                                              "params": [30, 40, 60, 60]}}}})
+
+
+def test_term_matrix():
+    lv = _temperature()
+    assert lv.term_matrix.shape == (3, len(lv.universe))
+    assert lv.term_index == {"cold": 0, "warm": 1, "hot": 2}
+    for name, row in lv.term_index.items():
+        assert np.shares_memory(lv.terms[name].mf.mf, lv.term_matrix)
+        assert np.array_equal(lv.terms[name].mf.mf, lv.term_matrix[row])
+
+
+def test_compute_memberships_matches_terms():
+    lv = _temperature()
+    for x in [0.0, 12.34, 25.05, 33.3, 59.9]:
+        fs = lv.compute_memberships(x, "singleton")
+        assert fs == {name: term.compute_membership(x, "singleton")
+                      for name, term in lv.terms.items()}
+
+
+def test_compute_memberships_batch():
+    lv = _temperature()
+    xs = np.array([0.0, 12.34, 25.05, 33.3, 59.9])
+    fs = lv.compute_memberships(xs, "singleton")
+    for name, term in lv.terms.items():
+        assert np.array_equal(fs[name], term.mf.singleton_interp_mems(xs))
+
+
+def test_compute_memberships_nonsingleton():
+    lv = _temperature()
+    input_mf = lv.get_term("warm").mf
+    fs = lv.compute_memberships(input_mf, "non-singleton")
+    # The sums only run over the supports, so they are added up in a
+    # different order than the dense reference.
+    assert fs == pytest.approx(
+        {name: term.compute_membership(input_mf, "non-singleton")
+         for name, term in lv.terms.items()}, rel=1e-12)
+
+
+def test_supports():
+    lv = _temperature()
+    for (start, stop), term in zip(lv.supports, lv.terms.values()):
+        nonzero = np.flatnonzero(term.mf.mf)
+        assert (start, stop) == (nonzero[0], nonzero[-1] + 1)
+        assert term.mf.support == slice(start, stop)
+
+
+def _setpoints(n_terms=60):
+    centers = np.linspace(0, 100, n_terms)
+    width = centers[1] - centers[0]
+    terms = {f"sp{i}": {"name": f"sp{i}",
+                        "mf": {"type": "trimf",
+                               "params": [c - width, c, c + width]}}
+             for i, c in enumerate(centers)}
+    terms["low"] = {"name": "low", "mf": {"type": "trapmf",
+                                          "params": [0, 0, 5, 10]}}
+    terms["bump"] = {"name": "bump",
+                     "mf": {"type": "gauanglemf", "params": [40, 2],
+                            "start": 36, "end": 44}}
+    return LinguisticVariable("setpoint",
+                              {"universe": {"start": 0, "end": 100.1,
+                                            "step": 0.1},
+                               "terms": terms})
+
+
+def test_segment_terms_cover_non_zero_terms():
+    lv = _setpoints()
+    assert lv._indexed
+    assert lv.segment_terms.shape[1] < len(lv.terms) // 10
+    xs = np.linspace(0, 100, 997)
+    lv._indexed = False
+    dense = np.array(list(lv.compute_memberships(xs, "singleton").values()))
+    rows = lv.segment_terms[np.searchsorted(lv.breakpoints, xs,
+                                            side='right')]
+    for x, row, memberships in zip(xs, rows, dense.T):
+        assert set(np.flatnonzero(memberships)) <= set(row)
+
+
+def test_indexed_memberships_match_dense():
+    lv = _setpoints()
+    xs = np.concatenate([np.linspace(0, 100, 1001), lv.breakpoints[
+        (lv.breakpoints >= 0) & (lv.breakpoints <= 100)]])
+    singles = [0.0, 4.2, 38.7, 40.0, 100.0, float(lv.breakpoints[7])]
+    indexed = lv.compute_memberships(xs, "singleton")
+    indexed_singles = [lv.compute_memberships(x, "singleton")
+                       for x in singles]
+    lv._indexed = False
+    dense = lv.compute_memberships(xs, "singleton")
+    for name in lv.terms:
+        assert np.array_equal(indexed[name], dense[name])
+    assert indexed_singles == [lv.compute_memberships(x, "singleton")
+                               for x in singles]
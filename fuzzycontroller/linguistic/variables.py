@@ -2,6 +2,11 @@ from __future__ import annotations
 
 from numpy._typing import NDArray
 from ..linguistic.terms import LinguisticTerm
+from ..membership.membership_functions import MembershipFunction, \
+        PiecewiseLinearMF, supports, trapezoid
+from ..utils.pool import ArrayPool
+from bisect import bisect_right
+import numbers
 import numpy as np
 
 
@@ -18,9 +23,32 @@ class LinguisticVariable:
             of discourse
         terms: A dictionary to store the associated LinguisticTerms.
             Of the form {'hot': LinguisticTerm}
+        term_index: A dictionary mapping the name of each term to its row
+            in term_matrix.
+        term_matrix: A contiguous (n_terms x U) matrix of the membership
+            functions of all the terms. The membership function of each
+            term is a view of its row.
+        supports: A (n_terms x 2) array of the (start, stop) slice of the
+            universe outside of which each term is zero. Non-singleton
+            similarities only look at these slices.
+        breakpoints: The sorted ends of the intervals of the universe
+            outside of which each term is zero. None, like segment_terms,
+            for variables with fewer than min_indexed_terms terms, which
+            are not indexed.
+        segment_terms: A (len(breakpoints) + 1 x W) matrix of term rows.
+            Row i + 1 holds every term which can be non-zero between
+            breakpoints[i] and breakpoints[i + 1] (row 0 is before the
+            first breakpoint), padded with other terms up to W, the
+            largest number of overlapping terms.
+        min_indexed_terms: smallest number of terms for which singleton
+            inputs only compute the terms found in segment_terms.
     """
 
-    def __init__(self, name: str, data: dict):
+    min_indexed_terms = 16
+
+    def __init__(self, name: str, data: dict, universe: NDArray = None,
+                 term_matrix: NDArray = None, pool: ArrayPool = None,
+                 dtype=np.float64):
         """Initializes the LinguisticVariable based on a name
         and a dictionary
 
@@ -29,32 +57,58 @@ class LinguisticVariable:
             data: a dictionary defining the linguistic variable
                 should be of the form {'universe': dict, 'terms':
                 dict}
+            universe: the already built universe, e.g. from a compiled
+                model. Built from data by default.
+            term_matrix: the already sampled term matrix, with one row per
+                term in the order of data['terms']. Requires universe.
+            pool: pool in which the universe, membership functions and term
+                matrix are interned, so that variables sharing them hold
+                one read-only copy.
+            dtype: the floating point type of the membership functions and
+                term matrix. The universe is always float64.
         """
         self.name = name
-        self.universe = self._load_universe(data['universe'])
-        self.terms = self._load_terms(data['terms'])
+        if universe is None:
+            self.universe = self._load_universe(data['universe'], pool)
+        else:
+            self.universe = universe
+        self.terms = self._load_terms(data['terms'], term_matrix, pool,
+                                      dtype)
+        if term_matrix is None:
+            term_matrix = self._stack_mfs(pool)
+        self._stack_terms(term_matrix)
 
-    def _load_universe(self, universe: dict) -> NDArray:
+    def _load_universe(self, universe: dict,
+                       pool: ArrayPool = None) -> NDArray:
         """Loads the universe from a dictionary.
         Should be of the form {'start': 0, 'end': 10, 'step': 0.1}
 
         Args:
             universe: dictionary containing the universe info.
+            pool: pool to intern the universe in.
 
         Returns:
             A numpy array representation of the universe.
         """
-        return np.arange(float(universe['start']),
-                         float(universe['end']),
-                         float(universe['step']))
+        bounds = (float(universe['start']), float(universe['end']),
+                  float(universe['step']))
+        if pool is None:
+            return np.arange(*bounds)
+        return pool.intern(("universe",) + bounds,
+                           lambda: np.arange(*bounds))
 
-    def _load_terms(self, terms) -> dict[str, LinguisticTerm]:
+    def _load_terms(self, terms, term_matrix: NDArray = None,
+                    pool: ArrayPool = None,
+                    dtype=np.float64) -> dict[str, LinguisticTerm]:
         """Loads the linguistic terms from a dictionary.
         Should be of the form {'term1': {'name': 'term1', 'mf': mf1},
         'term2': {'name': 'term2', 'mf': mf2}}
 
         Args:
             terms: dict containing the linguistic terms info.
+            term_matrix: the already sampled membership functions, if any.
+            pool: pool to intern the membership functions in.
+            dtype: the floating point type of the membership functions.
 
         Returns:
             A new dictionary representing the linguistic terms.
@@ -62,32 +116,268 @@ class LinguisticVariable:
         """
 
         loaded_terms = {}
-        for item in terms.items():
-            lt = LinguisticTerm(self.universe, item[1])
+        for i, item in enumerate(terms.items()):
+            lt = LinguisticTerm(self.universe, item[1],
+                                None if term_matrix is None
+                                else term_matrix[i], pool, dtype)
             loaded_terms[lt.name] = lt
 
         return loaded_terms
 
+    def _stack_mfs(self, pool: ArrayPool = None) -> NDArray:
+        """Stacks the membership functions of all the terms into a new
+        (n_terms x U) matrix, or the interned matrix of the same membership
+        functions.
+
+        Args:
+            pool: pool to intern the matrix in.
+
+        Returns:
+            the term matrix.
+        """
+        rows = [term.mf.mf for term in self.terms.values()]
+        keys = tuple(pool.key_of(row) for row in rows) \
+            if pool is not None else (None,)
+        if None in keys:
+            return np.array(rows)
+        return pool.intern(("term_matrix",) + keys, lambda: np.array(rows))
+
+    def _stack_terms(self, term_matrix: NDArray):
+        """Makes each term's membership function a view of its row of the
+        term matrix.
+
+        Args:
+            term_matrix: the (n_terms x U) matrix of the membership
+                functions.
+        """
+        self.term_index = {name: i for i, name in enumerate(self.terms)}
+        self.term_matrix = term_matrix
+        for term, row in zip(self.terms.values(), self.term_matrix):
+            term.mf.share(row)
+        self.supports = supports(term_matrix)
+        self._term_sums = term_matrix.sum(axis=1, dtype=np.float64)
+
+        mfs = [term.mf for term in self.terms.values()]
+        self._linear_rows = np.array(
+            [i for i, mf in enumerate(mfs)
+             if isinstance(mf, PiecewiseLinearMF)], dtype=int)
+        self._sampled_rows = np.array(
+            [i for i, mf in enumerate(mfs)
+             if not isinstance(mf, PiecewiseLinearMF)], dtype=int)
+        self._corners = np.array([mfs[i].corners for i in self._linear_rows],
+                                 dtype=float).reshape(-1, 4).T
+        self._lower = float(self.universe.min())
+        self._upper = float(self.universe.max())
+        self._index_intervals()
+
+    def _index_intervals(self):
+        """Builds the index of the terms which can be non-zero in each
+        segment between the breakpoints of the terms' intervals."""
+        n_terms = len(self.terms)
+        if n_terms < self.min_indexed_terms:
+            self.breakpoints = self.segment_terms = None
+            self._indexed = False
+            return
+        lows = np.full(n_terms, np.inf)
+        highs = np.full(n_terms, -np.inf)
+        # Triangular / trapezoidal terms are zero outside [a, d].
+        lows[self._linear_rows] = self._corners[0]
+        highs[self._linear_rows] = self._corners[3]
+        # Interpolated terms are zero outside the samples around their
+        # support.
+        u = self.universe
+        for row in self._sampled_rows:
+            start, stop = self.supports[row]
+            if start < stop:
+                lows[row] = u[max(start - 1, 0)]
+                highs[row] = u[min(stop, len(u) - 1)]
+
+        finite = np.isfinite(lows)
+        self.breakpoints = np.unique(np.concatenate([lows[finite],
+                                                     highs[finite]]))
+        cover = np.zeros((len(self.breakpoints) + 1, n_terms), dtype=bool)
+        cover[1:] = (lows <= self.breakpoints[:, None]) \
+            & (self.breakpoints[:, None] <= highs)
+        width = max(int(cover.sum(axis=1).max()), 1)
+        # Computing a term outside its interval gives its true value, 0, so
+        # any term can pad a row.
+        self.segment_terms = np.argsort(~cover, axis=1,
+                                        kind="stable")[:, :width]
+        self._segment_lists = [np.flatnonzero(row).tolist() for row in cover]
+        self._breakpoint_list = self.breakpoints.tolist()
+        mfs = list(self.terms.values())
+        self._scalar_corners = [mfs[row].mf.corners
+                                if isinstance(mfs[row].mf, PiecewiseLinearMF)
+                                else None for row in range(n_terms)]
+        self._linear_mask = np.zeros(n_terms, dtype=bool)
+        self._linear_mask[self._linear_rows] = True
+        all_corners = np.zeros((4, n_terms))
+        all_corners[:, self._linear_rows] = self._corners
+        self._all_corners = all_corners
+        self._indexed = 2 * width <= n_terms
+
+    def attach(self, universe: NDArray, term_matrix: NDArray):
+        """Replaces the universe and term matrix with equal arrays, e.g.
+        arrays in shared memory, which every term then views.
+
+        Args:
+            universe: an array equal to :attr:`universe`.
+            term_matrix: an array equal to :attr:`term_matrix`.
+        """
+        self.universe = universe
+        self.term_matrix = term_matrix
+        for term, row in zip(self.terms.values(), term_matrix):
+            term.universe = universe
+            term.mf.share(row, universe)
+
+    def _interp_sampled_rows(self, x: float or np.ndarray,
+                             rows: np.ndarray = None) -> np.ndarray:
+        """Linearly interpolates the rows of term_matrix which are not
+        known in closed form, for all of them at once.
+
+        Args:
+            x: crisp input value, or 1-D array of crisp input values.
+            rows: the rows to interpolate, broadcast against x. All the
+                sampled rows by default.
+
+        Returns:
+            (n_rows,) or (n_rows x N) array of membership values.
+        """
+        u = self.universe
+        j = np.clip(np.searchsorted(u, x, side='right') - 1, 0, len(u) - 2)
+        if rows is None:
+            rows = self._sampled_rows.reshape((-1,) + (1,) * np.ndim(x))
+        left = self.term_matrix[rows, j]
+        right = self.term_matrix[rows, j + 1]
+        slope = (right - left) / (u[j + 1] - u[j])
+        return np.where(x == u[-1], right, slope * (x - u[j]) + left)
+
+    def _indexed_memberships(self, x: float or np.ndarray) -> np.ndarray:
+        """Computes the memberships of singleton inputs, only for the terms
+        which overlap each input, found with a binary search of the
+        breakpoints. The other terms are zero.
+
+        Args:
+            x: crisp input value, or 1-D array of crisp input values.
+
+        Returns:
+            (n_terms,) or (n_terms x N) array of membership values.
+        """
+        if np.ndim(x) == 0:
+            return self._indexed_membership(float(x))
+        rows = self.segment_terms[np.searchsorted(self.breakpoints, x,
+                                                  side='right')]
+        xs = x[:, None]
+        values = trapezoid(xs, *self._all_corners[:, rows])
+        if len(self._sampled_rows):
+            values = np.where(self._linear_mask[rows], values,
+                              self._interp_sampled_rows(xs, rows))
+        memberships = np.zeros((len(self.terms), len(x)))
+        memberships[rows, np.arange(len(x))[:, None]] = values
+        return memberships
+
+    def _indexed_membership(self, x: float) -> np.ndarray:
+        """Computes the memberships of one singleton input like
+        :meth:`_indexed_memberships`, with python floats rather than numpy
+        calls, which cost more than the few overlapping terms."""
+        memberships = np.zeros(len(self.terms))
+        for row in self._segment_lists[bisect_right(self._breakpoint_list,
+                                                    x)]:
+            corners = self._scalar_corners[row]
+            if corners is None:
+                memberships[row] = self._interp_sampled_rows(
+                    x, np.array([row]))[0]
+                continue
+            a, b, c, d = corners
+            if b <= x <= c:
+                memberships[row] = 1.0
+            elif a < x < d:
+                memberships[row] = (x - a) / (b - a) if x < b \
+                    else (d - x) / (d - c)
+        return memberships
+
+    def _similarities(self, input_sets: np.ndarray,
+                      chunk_size: int = 2 ** 22) -> np.ndarray:
+        """Computes the similarity of every input fuzzy set with every term,
+        sum(fmin) / sum(fmax) over the universe.
+
+        fmin is zero outside the support of the term, so sum(fmin) is only
+        computed over the support, and sum(fmax) follows from
+        fmin + fmax = input + term. The input sets are processed in chunks
+        of at most chunk_size elements.
+
+        Args:
+            input_sets: a (N x U) matrix of input fuzzy sets.
+            chunk_size: maximum number of elements of a chunk.
+
+        Returns:
+            (n_terms x N) array of similarities.
+        """
+        input_sets = input_sets.astype(self.term_matrix.dtype, copy=False)
+        num = np.empty((len(self.terms), len(input_sets)))
+        rows = max(chunk_size // max(input_sets.shape[1], 1), 1)
+        for start in range(0, len(input_sets), rows):
+            chunk = input_sets[start:start + rows]
+            for i, (lo, hi) in enumerate(self.supports):
+                num[i, start:start + rows] = np.sum(
+                    np.fmin(chunk[:, lo:hi], self.term_matrix[i, lo:hi]),
+                    axis=1, dtype=np.float64)
+        den = input_sets.sum(axis=1, dtype=np.float64) \
+            + self._term_sums[:, None] - num
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return num / den
+
     def compute_memberships(self, crisp_input: float or np.ndarray,
                             input_type: str) -> dict[str, float or np.ndarray]:
         """Computes the degree of membership of all the linguistic terms.
 
+        The memberships of all the terms are computed together: in closed
+        form for triangular / trapezoidal terms and by interpolating
+        term_matrix for the others, or as similarities with term_matrix
+        for non-singleton inputs. With many terms, singleton inputs only
+        compute the terms which overlap them, see :attr:`segment_terms`.
+
         Args:
-            crisp_input: crisp input value.
+            crisp_input: crisp input value (an int or a float), a 1-D array
+                of crisp input values or, for non-singleton inputs, the
+                input MembershipFunction or a (N x U) matrix of input fuzzy
+                sets.
             input_type: type of the input, either 'singleton' or
                 'non-singleton'
 
         Returns:
             A dictionary of the memberships of each term for the input
                 crisp value.
-        """
 
-        memberships = {}
-        for item in self.terms.items():
-            memberships[item[0]] = item[1].compute_membership(
-                crisp_input, input_type)
+        Raises:
+            ValueError: if a singleton input is outside the universe.
+        """
+        if input_type == "singleton" and \
+                isinstance(crisp_input, (numbers.Real, np.ndarray)):
+            if np.any(crisp_input > self._upper) or \
+                    np.any(crisp_input < self._lower):
+                raise ValueError("input values are outside range of universe")
+            if self._indexed:
+                memberships = self._indexed_memberships(crisp_input)
+            else:
+                memberships = np.empty((len(self.terms),)
+                                       + np.shape(crisp_input))
+                corners = self._corners.reshape(
+                    self._corners.shape + (1,) * np.ndim(crisp_input))
+                memberships[self._linear_rows] = trapezoid(crisp_input,
+                                                           *corners)
+                memberships[self._sampled_rows] = \
+                    self._interp_sampled_rows(crisp_input)
+        elif input_type == "non-singleton" and \
+                isinstance(crisp_input, MembershipFunction):
+            memberships = self._similarities(crisp_input.mf[None])[:, 0]
+        elif input_type == "non-singleton" and \
+                isinstance(crisp_input, np.ndarray):
+            memberships = self._similarities(crisp_input)
+        else:
+            memberships = np.zeros(len(self.terms))
 
-        return memberships
+        return dict(zip(self.terms, memberships))
 
     def get_term(self, search_term: str) -> LinguisticTerm:
         """Returns a linguistic term by name
@@ -1,7 +1,96 @@
 from abc import ABC, abstractmethod
 import numpy as np
 from numpy.typing import NDArray
-import skfuzzy as fuzz
+
+
+def trapezoid(x: NDArray, a: float, b: float, c: float, d: float) -> NDArray:
+    """Computes a trapezoidal membership function in closed form.
+
+    Gives the same values as skfuzzy's trapmf, and as its trimf for a
+    triangle [a, b, c] passed as the trapezoid (a, b, b, c).
+
+    Args:
+        x: values at which to compute the membership function.
+        a, b, c, d: the corners of the trapezoid, with a <= b <= c <= d.
+
+    Returns:
+        The membership value of every element of x.
+    """
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = np.where(x < b, (x - a) / (b - a),
+                     np.where(x > c, (d - x) / (d - c), 1.0))
+    return np.where(((x > a) & (x < d)) | ((x >= b) & (x <= c)), y, 0.0)
+
+
+def gaussian(x: NDArray, mean: float, sigma: float) -> NDArray:
+    """Computes a gaussian membership function, same as skfuzzy's gaussmf.
+
+    Args:
+        x: values at which to compute the membership function.
+        mean: the mean of the gaussian.
+        sigma: the standard deviation of the gaussian.
+
+    Returns:
+        The membership value of every element of x.
+    """
+    return np.exp(-((x - mean)**2.) / (2 * sigma**2.))
+
+
+def gauangle_matrix(universe: NDArray, means: NDArray, sigmas: NDArray,
+                    starts: NDArray, ends: NDArray) -> NDArray:
+    """Computes many GauAngle membership functions at once.
+
+    Row i is equal to the mf of GauAngleMF(universe, [means[i], sigmas[i]],
+    starts[i], ends[i]), but all the rows are built in one pass.
+
+    Args:
+        universe: The universe of discourse for the fuzzy sets, of length U.
+        means: (N,) array of the means of the gaussians.
+        sigmas: (N,) array of the standard deviations of the gaussians.
+        starts: (N,) array of the first values at which the membership
+            functions are non-zero.
+        ends: (N,) array of the last values at which the membership
+            functions are non-zero, -1 for no end.
+
+    Returns:
+        A (N x U) matrix, one membership function per row.
+    """
+    means, sigmas, starts, ends = (np.asarray(values, dtype=float)[:, None]
+                                   for values in (means, sigmas, starts, ends))
+    mfs = gaussian(universe, means, sigmas)
+    step = universe[1] - universe[0]
+    idx = np.arange(len(universe))
+    start_idx = np.maximum(np.trunc(starts * (1 / step)) + 1, 0)
+    end_idx = np.trunc(ends * (1 / step))
+    # Negative end indices count from the end, as slicing does.
+    end_idx = np.where(end_idx < 0, np.maximum(len(universe) + end_idx, 0),
+                       end_idx)
+    inside = (idx >= start_idx) & ((ends == -1) | (idx < end_idx))
+    return np.where(inside, mfs, 0.0)
+
+
+def supports(mfs: NDArray) -> NDArray:
+    """Finds the support of every row of a matrix of membership functions.
+
+    The support of a row is the smallest slice [start, stop) of the universe
+    outside of which the membership function is zero.
+
+    Args:
+        mfs: a (N x U) matrix, one membership function per row.
+
+    Returns:
+        A (N x 2) integer array of the (start, stop) of each support. Rows
+            which are zero everywhere have the empty support (0, 0).
+    """
+    nonzero = np.asarray(mfs) != 0
+    if nonzero.shape[1] == 0:
+        return np.zeros((len(nonzero), 2), dtype=int)
+    empty = ~nonzero.any(axis=1)
+    start = np.where(empty, 0, nonzero.argmax(axis=1))
+    stop = np.where(empty, 0,
+                    nonzero.shape[1] - nonzero[:, ::-1].argmax(axis=1))
+    return np.stack([start, stop], axis=1)
 
 
 class MembershipFunction(ABC):
@@ -11,8 +100,7 @@ class MembershipFunction(ABC):
 
     Attributes:
         _universe: a numpy array representing the universe
-        _mf: a numpy array (wrapped with the skfuzzy library)
-            representing the membership function
+        _mf: a numpy array representing the membership function
     """
 
     @property
@@ -43,6 +131,26 @@ class MembershipFunction(ABC):
                 np.array_equal(self.mf, other.mf)
         return False
 
+    @property
+    def support(self) -> slice:
+        """The slice of the universe outside of which the membership
+        function is zero, see :func:`supports`."""
+        start, stop = supports(self.mf[None])[0]
+        return slice(int(start), int(stop))
+
+    def share(self, mf: NDArray, universe: NDArray = None):
+        """Replaces the sampled membership function with an equal array,
+        typically a row of a larger matrix, so that the memory is shared.
+
+        Args:
+            mf: an array equal to :attr:`mf`.
+            universe: optionally, an array equal to :attr:`universe` to
+                share as well.
+        """
+        self._mf = mf
+        if universe is not None:
+            self._universe = universe
+
     def singleton_interp_mem(self, x) -> float:
         """Computes the membership value of a singleton fuzzy set x with
         this class
@@ -54,9 +162,29 @@ class MembershipFunction(ABC):
             The membership value of x in this class.
 
         """
-        if x > max(self.universe) or x < min(self.universe):
+        universe = self.universe
+        if x > universe[-1] or x < universe[0]:
             raise ValueError("%f is outside range of universe" % (x))
-        return fuzz.interp_membership(self.universe, self.mf, x)
+        return np.interp(x, universe, self.mf, left=0.0, right=0.0)
+
+    def singleton_interp_mems(self, xs: NDArray) -> NDArray:
+        """Computes the membership values of many singleton fuzzy sets
+        with this class in one vectorized call.
+
+        Args:
+            xs: 1-D array of singleton values.
+
+        Returns:
+            A numpy array with the membership value of each element of xs.
+
+        Raises:
+            ValueError: if any value of xs is outside the universe.
+        """
+        xs = np.asarray(xs, dtype=float)
+        if np.any(xs > self.universe.max()) or \
+                np.any(xs < self.universe.min()):
+            raise ValueError("input values are outside range of universe")
+        return np.interp(xs, self.universe, self.mf, left=0.0, right=0.0)
 
     def nonsingleton_interp_mem(self, input_mf: NDArray,
                                 defuzz: str) -> float:
@@ -73,10 +201,12 @@ class MembershipFunction(ABC):
             float: The membership value of input_mf in mf.
         """
         if defuzz == "centroid":
+            import skfuzzy as fuzz
             agg = np.fmin(input_mf, self.mf)
             try:
                 x = fuzz.defuzz(self.universe, agg, defuzz)
-                return fuzz.interp_membership(self.universe, self.mf, x)
+                return np.interp(x, self.universe, self.mf, left=0.0,
+                                 right=0.0)
             except AssertionError:
                 return 0
         elif defuzz == "similarity":
@@ -91,19 +221,39 @@ class MembershipFunction(ABC):
         ax.plot(self.universe, self.mf, linewidth=1.5, label=name)
 
 
-class TriangularMF(MembershipFunction):
-    """A Triangular Membership Function"""
+class PiecewiseLinearMF(MembershipFunction):
+    """A Membership Function defined by the corners of a trapezoid
 
-    def __init__(self, universe: NDArray, params: list):
-        """Initializes a triangular membership function.
+    Triangular and trapezoidal membership functions are both known exactly
+    from their parameters, so their membership values are computed in closed
+    form rather than interpolated from the sampled membership function. The
+    cost of this is independent of the resolution of the universe.
+
+    Attributes:
+        corners: the corners (a, b, c, d) of the trapezoid. A triangle
+            [a, b, c] has the corners (a, b, b, c).
+    """
+
+    def __init__(self, universe: NDArray, corners: tuple,
+                 mf: NDArray = None, dtype=np.float64):
+        """Initializes a piecewise linear membership function.
 
         Args:
             universe: The universe of discourse for the fuzzy set.
-            params: The parameters of the triangular membership function
-                [a, b, c]
+            corners: The corners of the trapezoid (a, b, c, d).
+            mf: The membership function already sampled over the
+                universe, e.g. from a compiled model. Sampled from the
+                corners by default.
+            dtype: The floating point type of the sampled membership
+                function.
         """
+        self.corners = tuple(float(corner) for corner in corners)
         self._universe = universe
-        self._mf = fuzz.trimf(universe, params)
+        self._lower = float(universe.min())
+        self._upper = float(universe.max())
+        if mf is None:
+            mf = trapezoid(universe, *self.corners).astype(dtype, copy=False)
+        self._mf = mf
 
     @property
     def universe(self):
@@ -113,38 +263,65 @@ class TriangularMF(MembershipFunction):
     def mf(self):
         return self._mf
 
-    def singleton_interp_mem(self, x: float):
-        return super().singleton_interp_mem(x)
+    def singleton_interp_mem(self, x: float) -> float:
+        if x > self._upper or x < self._lower:
+            raise ValueError("%f is outside range of universe" % (x))
+        a, b, c, d = self.corners
+        if b <= x <= c:
+            return 1.0
+        if x <= a or x >= d:
+            return 0.0
+        if x < b:
+            return (x - a) / (b - a)
+        return (d - x) / (d - c)
+
+    def singleton_interp_mems(self, xs: NDArray) -> NDArray:
+        xs = np.asarray(xs, dtype=float)
+        if np.any(xs > self._upper) or np.any(xs < self._lower):
+            raise ValueError("input values are outside range of universe")
+        return trapezoid(xs, *self.corners)
+
+
+class TriangularMF(PiecewiseLinearMF):
+    """A Triangular Membership Function"""
+
+    def __init__(self, universe: NDArray, params: list,
+                 mf: NDArray = None, dtype=np.float64):
+        """Initializes a triangular membership function.
+
+        Args:
+            universe: The universe of discourse for the fuzzy set.
+            params: The parameters of the triangular membership function
+                [a, b, c]
+            mf: The already sampled membership function, if any.
+            dtype: The floating point type of the sampled membership
+                function.
+        """
+        a, b, c = params
+        super().__init__(universe, (a, b, b, c), mf, dtype)
 
     def nonsingleton_interp_mem(self, input_mf: np.ndarray,
                                 defuzz: str):
         return super().nonsingleton_interp_mem(input_mf, defuzz)
 
 
-class TrapezoidalMF(MembershipFunction):
+class TrapezoidalMF(PiecewiseLinearMF):
     """A Trapezoidal Membership Function"""
 
-    def __init__(self, universe: np.ndarray, params: list):
+    def __init__(self, universe: np.ndarray, params: list,
+                 mf: np.ndarray = None, dtype=np.float64):
         """Initializes a trapezoidal membership function.
 
         Args:
             universe (np.ndarray): The universe of discourse for the fuzzy set.
             params (list): The parameters of the trapezoidal membership
                 function [a, b, c, d]
+            mf (np.ndarray): The already sampled membership function, if
+                any.
+            dtype: The floating point type of the sampled membership
+                function.
         """
-        self._universe = universe
-        self._mf = fuzz.trapmf(universe, params)
-
-    @property
-    def universe(self):
-        return self._universe
-
-    @property
-    def mf(self):
-        return self._mf
-
-    def singleton_interp_mem(self, x: float):
-        return super().singleton_interp_mem(x)
+        super().__init__(universe, params, mf, dtype)
 
     def nonsingleton_interp_mem(self, input_mf: np.ndarray,
                                 defuzz: str):
@@ -159,7 +336,8 @@ class GauAngleMF(MembershipFunction):
     """
 
     def __init__(self, universe: NDArray, params: list,
-                 start: float, end: float):
+                 start: float, end: float, mf: NDArray = None,
+                 dtype=np.float64):
         """Initializes a GauAngle membership function.
 
         Args:
@@ -170,9 +348,15 @@ class GauAngleMF(MembershipFunction):
                 function is non-zero.
             end: The last value at which the membership
                 function is non-zero.
+            mf: The already sampled membership function, if any.
+            dtype: The floating point type of the sampled membership
+                function.
         """
         self._universe = universe
-        self._mf = fuzz.gaussmf(universe, params[0], params[1])
+        if mf is not None:
+            self._mf = mf
+            return
+        self._mf = gaussian(universe, params[0], params[1])
         # Calculate the indices of the start / end points in the NDArray
         step = universe[1] - universe[0]
         start_idx = max(int(start * (1 / step)) + 1, 0)
@@ -180,6 +364,7 @@ class GauAngleMF(MembershipFunction):
         if end != -1:
             end_idx = int(end * (1 / step))
             self._mf[end_idx:] = [0] * (len(universe) - end_idx)
+        self._mf = self._mf.astype(dtype, copy=False)
 
     @property
     def universe(self):
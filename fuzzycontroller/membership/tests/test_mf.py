@@ -1,5 +1,5 @@
 from ..membership_functions import TriangularMF, \
-        TrapezoidalMF, GauAngleMF
+        TrapezoidalMF, GauAngleMF, trapezoid, gauangle_matrix, supports
 import skfuzzy as fuzz
 import numpy as np
 import pytest
@@ -178,3 +178,52 @@ def test_gauangle_with_no_end():
     gamf = GauAngleMF(universe, [4, 1], 0, -1)
     assert gamf.mf[-1] != 0
     assert gamf.singleton_interp_mem(4) == 1.0
+
+
+def test_trapezoid_matches_skfuzzy():
+    universe = np.arange(0, 100.1, 0.1)
+    for params in ([0, 0, 32, 35.1], [39, 41, 60, 60], [25, 30, 55, 65],
+                   [85, 95, 100, 100]):
+        assert np.array_equal(trapezoid(universe, *params),
+                              fuzz.trapmf(universe, params))
+    for params in ([0, 0, 5], [0, 0.5, 1.5], [40, 65, 70]):
+        a, b, c = params
+        assert np.array_equal(trapezoid(universe, a, b, b, c),
+                              fuzz.trimf(universe, params))
+
+
+def test_singleton_interp_mem_tri_between_samples():
+    tmf = TriangularMF(np.arange(0, 11, 1), [0, 2.5, 10])
+    assert tmf.singleton_interp_mem(1.25) == 0.5
+
+
+def test_singleton_interp_mem_trap_shoulders():
+    trapmf = TrapezoidalMF(np.arange(0, 11, 1), [0, 0, 5, 10])
+    assert trapmf.singleton_interp_mem(0) == 1.0
+    assert trapmf.singleton_interp_mem(7.5) == 0.5
+    assert trapmf.singleton_interp_mem(10) == 0.0
+
+
+def test_singleton_interp_mems_matches_scalar(trapmf):
+    xs = np.linspace(0, 10, 37)
+    expected = [trapmf.singleton_interp_mem(x) for x in xs]
+    assert np.array_equal(trapmf.singleton_interp_mems(xs), expected)
+
+
+def test_singleton_interp_mems_outside_universe(tmf):
+    with pytest.raises(ValueError):
+        tmf.singleton_interp_mems(np.array([5, 11]))
+
+
+def test_gauangle_matrix_matches_gauangle():
+    universe = np.arange(0, 11, 0.1)
+    params = [(3, 1, 2.1, 4.4), (4, 1, -1, 6), (4, 1, 0, -1), (5, 2, 1, 9)]
+    matrix = gauangle_matrix(universe, *np.array(params).T)
+    for row, (mean, sigma, start, end) in zip(matrix, params):
+        gamf = GauAngleMF(universe, [mean, sigma], start, end)
+        assert np.array_equal(row, gamf.mf)
+
+
+def test_supports():
+    mfs = np.array([[0, 0.5, 1, 0, 0], [0, 0, 0, 0, 0], [1, 0, 0, 0, 0.2]])
+    assert supports(mfs).tolist() == [[1, 3], [0, 0], [0, 5]]
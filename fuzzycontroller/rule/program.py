@@ -0,0 +1,559 @@
+from __future__ import annotations
+from ..membership.membership_functions import supports
+from .propositions import Antecedent
+from numpy.typing import NDArray
+import numpy as np
+
+
+class RuleProgram():
+    """A rule base compiled into flat index arrays.
+
+    Every antecedent tree of a :class:`.Rules` object is flattened into
+    leaves (a (variable, term) pair, optionally negated) and binary AND / OR
+    nodes. The nodes are grouped into layers by their height in the tree, so
+    that every node of a layer only depends on nodes of earlier layers. The
+    strengths of all the rules are then computed with one fmin / fmax per
+    layer, over a membership vector holding the firing strength of every
+    referenced linguistic term.
+
+    Attributes:
+        rule_names: names of the rules, in the order of the program.
+        term_index: dictionary mapping a (variable name, term name) pair to
+            its position in the membership vector.
+        leaf_terms: position in the membership vector of every leaf.
+        leaf_negate: boolean mask, True where the leaf is negated.
+        layers: list of (left, right, is_or) index arrays. The nodes of a
+            layer are stored after the leaves and the nodes of all the
+            earlier layers.
+        roots: index of the node holding the strength of each rule.
+        output_term_names: names of the consequent linguistic terms.
+        consequent_terms: row of :attr:`output_mfs` used by each rule.
+        output_mfs: (T x U) matrix of the consequent membership functions.
+        output_supports: (T x 2) array of the (start, stop) slice of the
+            universe outside of which each consequent term is zero. Rule
+            outputs are only clipped and aggregated over these slices.
+        term_rules: inverted index of the rules by term, as a pair of
+            arrays (rules, starts): the rules indexed under the term at
+            position i of the membership vector are
+            rules[starts[i]:starts[i + 1]]. Only the sparse path uses it,
+            so it is built on first use rather than when compiling.
+        rule_needs: a rule can only fire when at least this many of the
+            terms it is indexed under are non-zero. It is 0 for the rules
+            which can fire whatever the active terms, e.g. because of a
+            NOT: NOT of a zero membership is one. Built with
+            :attr:`term_rules`.
+        min_sparse_rules: smallest number of rules for which
+            :meth:`sparse_rule_strengths` looks for the active rules.
+        max_active_fraction: largest fraction of active rules for which
+            :meth:`sparse_rule_strengths` only evaluates the active rules.
+    """
+
+    min_sparse_rules = 256
+    max_active_fraction = 0.25
+
+    def __init__(self, rules: dict):
+        """Compiles the rules.
+
+        Args:
+            rules: dictionary of :class:`.Rule` objects. The keys are the
+                names of the rules.
+        """
+        self.rule_names = list(rules.keys())
+        self.term_index = {}
+        self.output_term_names = []
+        leaves = []
+        nodes = []
+        roots = []
+        consequent_terms = []
+        output_terms = []
+        for rule in rules.values():
+            roots.append(self._compile(rule.antecedents, leaves, nodes)[0])
+            term = rule.consequent.term
+            if term.name not in self.output_term_names:
+                self.output_term_names.append(term.name)
+                output_terms.append(term)
+            consequent_terms.append(self.output_term_names.index(term.name))
+
+        self.leaf_terms = np.array([leaf[0] for leaf in leaves], dtype=int)
+        self.leaf_negate = np.array([leaf[1] for leaf in leaves], dtype=bool)
+
+        # Number the nodes so that each layer is contiguous.
+        order = sorted(range(len(nodes)), key=lambda i: nodes[i][3])
+        node_ids = np.empty(len(nodes), dtype=int)
+        node_ids[order] = np.arange(len(leaves), len(leaves) + len(nodes))
+
+        def resolve(ref):
+            return ref if ref >= 0 else node_ids[-ref - 1]
+
+        self.layers = []
+        heights = sorted({node[3] for node in nodes})
+        for height in heights:
+            layer = [nodes[i] for i in order if nodes[i][3] == height]
+            self.layers.append((
+                np.array([resolve(node[0]) for node in layer], dtype=int),
+                np.array([resolve(node[1]) for node in layer], dtype=int),
+                np.array([node[2] for node in layer], dtype=bool)))
+
+        self.roots = np.array([resolve(root) for root in roots], dtype=int)
+        self.consequent_terms = np.array(consequent_terms, dtype=int)
+        self._stack_consequents(output_terms)
+        self._n_nodes = len(leaves) + len(nodes)
+        self._index_consequents()
+        self._term_rules = None
+
+    def _stack_consequents(self, terms: list):
+        """Stacks the membership functions of the consequent terms into
+        :attr:`output_mfs`.
+
+        Args:
+            terms: the consequent terms, in the order of
+                :attr:`output_term_names`.
+        """
+        self.output_mfs = np.array([term.mf.mf for term in terms])
+
+    def _compile(self, antecedents, leaves: list, nodes: list) \
+            -> tuple[int, int]:
+        """Recursively flattens an antecedent tree.
+
+        Leaves are referenced by their (positive) index into leaves, nodes by
+        a negative reference -(index into nodes + 1).
+
+        Args:
+            antecedents: an :class:`.Antecedents` or :class:`.Antecedent`.
+            leaves: list of (membership vector position, negate) tuples.
+            nodes: list of (left ref, right ref, is_or, height) tuples.
+
+        Returns:
+            reference to the compiled node and its height in the tree.
+        """
+        if isinstance(antecedents, Antecedent):
+            key = (antecedents.name, antecedents.term.name)
+            if key not in self.term_index:
+                self.term_index[key] = len(self.term_index)
+            leaves.append((self.term_index[key], antecedents.negate))
+            return len(leaves) - 1, 0
+
+        if antecedents.single_antecedent:
+            return self._compile(antecedents.antecedents['antecedent1'],
+                                 leaves, nodes)
+
+        left, left_height = self._compile(
+            antecedents.antecedents['antecedent1'], leaves, nodes)
+        right, right_height = self._compile(
+            antecedents.antecedents['antecedent2'], leaves, nodes)
+        height = max(left_height, right_height) + 1
+        nodes.append((left, right, antecedents.antecedents['operator'] == 'OR',
+                      height))
+        return -len(nodes), height
+
+    @classmethod
+    def from_tables(cls, metadata: dict, tables: dict[str, NDArray]) \
+            -> RuleProgram:
+        """Rebuilds a program without compiling the rules again.
+
+        Args:
+            metadata: the dictionary returned by :meth:`metadata`.
+            tables: the arrays returned by :meth:`tables`.
+
+        Returns:
+            the program.
+        """
+        program = cls.__new__(cls)
+        program.rule_names = list(metadata["rule_names"])
+        program.term_index = {(name, term): i for i, (name, term)
+                              in enumerate(metadata["terms"])}
+        program.output_term_names = list(metadata["output_term_names"])
+        program.layers = [None] * metadata["n_layers"]
+        program._n_nodes = metadata["n_nodes"]
+        program.attach(tables)
+        return program
+
+    def metadata(self) -> dict:
+        """Returns the parts of the program which are not arrays, as a
+        JSON serializable dictionary."""
+        return {"rule_names": self.rule_names,
+                "terms": [list(key) for key in self.term_index],
+                "output_term_names": self.output_term_names,
+                "n_layers": len(self.layers),
+                "n_nodes": self._n_nodes}
+
+    def tables(self) -> dict[str, NDArray]:
+        """Returns the arrays of the program, keyed by name."""
+        tables = {"leaf_terms": self.leaf_terms,
+                  "leaf_negate": self.leaf_negate,
+                  "roots": self.roots,
+                  "consequent_terms": self.consequent_terms,
+                  "output_mfs": self.output_mfs}
+        for i, (left, right, is_or) in enumerate(self.layers):
+            tables[f"layer{i}.left"] = left
+            tables[f"layer{i}.right"] = right
+            tables[f"layer{i}.is_or"] = is_or
+        return tables
+
+    def attach(self, tables: dict[str, NDArray]):
+        """Replaces the arrays of the program with the equal arrays of
+        tables, e.g. arrays in shared memory.
+
+        Args:
+            tables: arrays keyed by name, as returned by :meth:`tables`.
+        """
+        self.leaf_terms = tables["leaf_terms"]
+        self.leaf_negate = tables["leaf_negate"]
+        self.roots = tables["roots"]
+        self.consequent_terms = tables["consequent_terms"]
+        self.output_mfs = tables["output_mfs"]
+        self.layers = [(tables[f"layer{i}.left"], tables[f"layer{i}.right"],
+                        tables[f"layer{i}.is_or"])
+                       for i in range(len(self.layers))]
+        self._index_consequents()
+        self._term_rules = None
+
+    def _index_consequents(self):
+        """Computes the supports of the consequent terms, and the order
+        which groups the rules by consequent term."""
+        self.output_supports = supports(self.output_mfs)
+        self._by_consequent = np.argsort(self.consequent_terms, kind="stable")
+        self._consequent_starts = np.searchsorted(
+            self.consequent_terms[self._by_consequent],
+            np.arange(len(self.output_mfs)))
+
+    @property
+    def term_rules(self) -> tuple[NDArray, NDArray]:
+        """Returns the inverted index of the rules by term, building it on
+        first use."""
+        if self._term_rules is None:
+            self._index_rules()
+        return self._term_rules
+
+    @property
+    def rule_needs(self) -> NDArray:
+        """Returns the number of indexed terms each rule needs to fire,
+        building the index on first use."""
+        if self._term_rules is None:
+            self._index_rules()
+        return self._rule_needs
+
+    def _index_rules(self):
+        """Finds the rule each leaf and node belongs to, and builds the
+        inverted index of the rules by term."""
+        n_leaves = len(self.leaf_terms)
+        n_rules = len(self.roots)
+        sizes = [len(left) for left, _, _ in self.layers]
+        self._layer_starts = n_leaves + np.cumsum([0] + sizes)
+        self._node_left, self._node_right, self._node_is_or = (
+            np.concatenate([layer[i] for layer in self.layers]
+                           + [np.empty(0, dtype=dtype)])
+            for i, dtype in enumerate((int, int, bool)))
+
+        # Every node belongs to the rule of its parent.
+        node_rules = np.empty(self._n_nodes, dtype=int)
+        node_rules[self.roots] = np.arange(n_rules)
+        for (left, right, _), start in zip(reversed(self.layers),
+                                           self._layer_starts[-2::-1]):
+            parents = node_rules[start:start + len(left)]
+            node_rules[left] = parents
+            node_rules[right] = parents
+        self._rule_nodes = np.argsort(node_rules, kind="stable")
+        self._rule_node_starts = np.searchsorted(
+            node_rules[self._rule_nodes], np.arange(n_rules + 1))
+
+        conditions = [None if negate else (frozenset([term]), 1)
+                      for term, negate in zip(self.leaf_terms.tolist(),
+                                              self.leaf_negate.tolist())]
+        for left, right, is_or in zip(self._node_left.tolist(),
+                                      self._node_right.tolist(),
+                                      self._node_is_or.tolist()):
+            conditions.append(_combine(conditions[left], conditions[right],
+                                       is_or))
+
+        pairs = []
+        self._rule_needs = np.zeros(n_rules, dtype=int)
+        for rule, root in enumerate(self.roots.tolist()):
+            if conditions[root] is not None:
+                terms, self._rule_needs[rule] = conditions[root]
+                pairs.extend((term, rule) for term in terms)
+        pairs = np.array(sorted(pairs), dtype=int).reshape(-1, 2)
+        self._term_rules = (pairs[:, 1], np.searchsorted(
+            pairs[:, 0], np.arange(len(self.term_index) + 1)))
+
+    def membership_vector(self, firing_strengths:
+                          dict[str, dict[str, float or NDArray]]) -> NDArray:
+        """Gathers the firing strengths referenced by the rules into a
+        membership vector.
+
+        Args:
+            firing_strengths: dict of firing strengths, of the form
+                {variable_name: {term_name: firing_strength}}. The firing
+                strengths may be 1-D arrays for a batch of inputs.
+
+        Returns:
+            a (M,) membership vector, or a (M x N) matrix for a batch.
+        """
+        return np.array([firing_strengths[name][term]
+                         for name, term in self.term_index])
+
+    def rule_strengths(self, memberships: NDArray) -> NDArray:
+        """Computes the strength (cylindrical extension) of every rule.
+
+        Args:
+            memberships: a membership vector, see :meth:`membership_vector`.
+
+        Returns:
+            a (R,) array of rule strengths, or a (R x N) matrix for a batch.
+        """
+        extra_dims = (None,) * (memberships.ndim - 1)
+        values = np.empty((self._n_nodes,) + memberships.shape[1:])
+        leaves = memberships[self.leaf_terms]
+        negate = self.leaf_negate[(slice(None),) + extra_dims]
+        values[:len(self.leaf_terms)] = np.where(negate, 1 - leaves, leaves)
+
+        start = len(self.leaf_terms)
+        for left, right, is_or in self.layers:
+            is_or = is_or[(slice(None),) + extra_dims]
+            values[start:start + len(left)] = np.where(
+                is_or, np.fmax(values[left], values[right]),
+                np.fmin(values[left], values[right]))
+            start += len(left)
+
+        return values[self.roots]
+
+    def active_rules(self, memberships: NDArray) -> NDArray:
+        """Finds the rules which can have a non-zero strength, from the
+        inverted index of the rules by term.
+
+        Each rule is indexed under terms of which at least
+        :attr:`rule_needs` must be non-zero for it to fire: an AND needs
+        both of its operands to be non-zero, an OR either one. Only the
+        rules with enough non-zero terms are returned.
+
+        Args:
+            memberships: a membership vector, see :meth:`membership_vector`,
+                or a (M x N) matrix for a batch.
+
+        Returns:
+            the sorted positions of the rules.
+        """
+        if memberships.ndim > 1:
+            memberships = memberships.any(axis=1)
+        rules, starts = self.term_rules
+        hits = np.bincount(_gather(rules, starts, np.flatnonzero(memberships)),
+                           minlength=len(self.roots))
+        return np.flatnonzero(hits >= self.rule_needs)
+
+    def sparse_rule_strengths(self, memberships: NDArray) \
+            -> tuple[NDArray, NDArray]:
+        """Computes the strength of every rule like :meth:`rule_strengths`,
+        but only evaluates the :meth:`active_rules`. The others are zero.
+
+        Selecting the nodes of the active rules has a fixed cost, so with
+        fewer than :attr:`min_sparse_rules` rules, or when more than
+        :attr:`max_active_fraction` of them are active, every rule is
+        evaluated with :meth:`rule_strengths` instead.
+
+        Args:
+            memberships: a membership vector, see :meth:`membership_vector`.
+
+        Returns:
+            a (R,) array of rule strengths, or a (R x N) matrix for a batch,
+            and the positions of the rules which were evaluated.
+        """
+        if len(self.roots) < self.min_sparse_rules:
+            return self.rule_strengths(memberships), \
+                np.arange(len(self.roots))
+        rules = self.active_rules(memberships)
+        if len(rules) > self.max_active_fraction * len(self.roots):
+            return self.rule_strengths(memberships), \
+                np.arange(len(self.roots))
+        strengths = np.zeros((len(self.roots),) + memberships.shape[1:])
+        strengths[rules] = self.evaluate_rules(memberships, rules)
+        return strengths, rules
+
+    def evaluate_rules(self, memberships: NDArray, rules: NDArray) \
+            -> NDArray:
+        """Computes the strengths of some of the rules, only evaluating the
+        leaves and nodes which belong to them.
+
+        Args:
+            memberships: a membership vector, see :meth:`membership_vector`,
+                or a (M x N) matrix for a batch.
+            rules: positions of the rules.
+
+        Returns:
+            a (len(rules),) array of rule strengths, or a (len(rules) x N)
+            matrix for a batch.
+        """
+        extra_dims = (None,) * (memberships.ndim - 1)
+        if len(rules) == 0:
+            return np.zeros((0,) + memberships.shape[1:])
+        if self._term_rules is None:
+            self._index_rules()
+
+        # Children are numbered before their parents, so evaluating the
+        # nodes by number follows the layers.
+        nodes = np.sort(_gather(self._rule_nodes, self._rule_node_starts,
+                                rules))
+        bounds = np.searchsorted(nodes, self._layer_starts)
+        values = np.empty((self._n_nodes,) + memberships.shape[1:])
+        leaves = nodes[:bounds[0]]
+        memberships = memberships[self.leaf_terms[leaves]]
+        negate = self.leaf_negate[leaves][(slice(None),) + extra_dims]
+        values[leaves] = np.where(negate, 1 - memberships, memberships)
+
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if start == stop:
+                continue
+            ids = nodes[start:stop]
+            i = ids - len(self.leaf_terms)
+            left = values[self._node_left[i]]
+            right = values[self._node_right[i]]
+            is_or = self._node_is_or[i][(slice(None),) + extra_dims]
+            values[ids] = np.where(is_or, np.fmax(left, right),
+                                   np.fmin(left, right))
+
+        return values[self.roots[rules]]
+
+    def consequent_strengths(self, strengths: NDArray) -> NDArray:
+        """Combines the rule strengths of the rules sharing a consequent.
+
+        Under max aggregation the output of all the rules with the same
+        consequent term is that term clipped at their largest strength.
+
+        Args:
+            strengths: a (R,) array of rule strengths, or a (R x N) matrix
+                for a batch.
+
+        Returns:
+            a (T,) array, the strength of each consequent term, or a (T x N)
+            matrix for a batch.
+        """
+        return np.maximum.reduceat(strengths[self._by_consequent],
+                                   self._consequent_starts)
+
+    def consequent_sums(self, strengths: NDArray) -> NDArray:
+        """Sums the rule strengths of the rules sharing a consequent, e.g.
+        for a weighted average of the consequents.
+
+        Args:
+            strengths: a (R,) array of rule strengths, or a (R x N) matrix
+                for a batch.
+
+        Returns:
+            a (T,) array, the total strength of each consequent term, or a
+            (T x N) matrix for a batch.
+        """
+        return np.add.reduceat(strengths[self._by_consequent],
+                               self._consequent_starts)
+
+    def output_sets(self, strengths: NDArray) -> NDArray:
+        """Computes the output set of every rule.
+
+        Args:
+            strengths: a (R,) array of rule strengths.
+
+        Returns:
+            a (R x U) matrix with one output set per rule.
+        """
+        return np.fmin(self.output_mfs[self.consequent_terms],
+                       strengths[:, None].astype(self.output_mfs.dtype))
+
+    def aggregate_set(self, strengths: NDArray,
+                      grouped: bool = True) -> NDArray:
+        """Computes the aggregate set, the fmax of the output sets of all the
+        rules.
+
+        By default the rules are first grouped by consequent term, see
+        :meth:`consequent_strengths`, so only one clip per output term is
+        needed whatever the number of rules. Either way, output sets which
+        are zero are skipped, and the others are only clipped and
+        aggregated over the support of their term, since they are zero
+        everywhere else.
+
+        Args:
+            strengths: a (R,) array of rule strengths.
+            grouped: clip each consequent term once at the largest strength
+                of its rules, rather than once per rule. Both give the same
+                aggregate set.
+
+        Returns:
+            a (U,) aggregate set, of the dtype of the output membership
+            functions.
+        """
+        dtype = self.output_mfs.dtype
+        aggregate_set = np.zeros(self.output_mfs.shape[1], dtype=dtype)
+        if grouped:
+            strengths = self.consequent_strengths(strengths).astype(dtype)
+            terms = np.arange(len(strengths))
+        else:
+            strengths = strengths.astype(dtype)
+            terms = self.consequent_terms
+        for i in np.flatnonzero(strengths):
+            term = terms[i]
+            start, stop = self.output_supports[term]
+            np.fmax(aggregate_set[start:stop],
+                    np.fmin(self.output_mfs[term, start:stop],
+                            strengths[i]),
+                    out=aggregate_set[start:stop])
+        return aggregate_set
+
+    def aggregate_sets(self, strengths: NDArray,
+                       grouped: bool = True) -> NDArray:
+        """Computes the aggregate set for each sample of a batch.
+
+        Like :meth:`aggregate_set`, the rules are grouped by consequent term
+        by default, each output set is only aggregated over the support of
+        its term, and output sets which are zero for every sample are
+        skipped.
+
+        Args:
+            strengths: a (R x N) matrix of rule strengths.
+            grouped: clip each consequent term once per sample rather than
+                once per rule and sample.
+
+        Returns:
+            a (N x U) matrix with one aggregate set per sample, of the
+            dtype of the output membership functions.
+        """
+        dtype = self.output_mfs.dtype
+        aggregate_sets = np.zeros((strengths.shape[1],
+                                   self.output_mfs.shape[1]), dtype=dtype)
+        if grouped:
+            strengths = self.consequent_strengths(strengths).astype(dtype)
+            terms = np.arange(len(strengths))
+        else:
+            strengths = strengths.astype(dtype)
+            terms = self.consequent_terms
+        for i in np.flatnonzero(strengths.any(axis=1)):
+            term = terms[i]
+            start, stop = self.output_supports[term]
+            np.fmax(aggregate_sets[:, start:stop],
+                    np.fmin(self.output_mfs[term, start:stop],
+                            strengths[i, :, None]),
+                    out=aggregate_sets[:, start:stop])
+        return aggregate_sets
+
+
+def _combine(left: tuple or None, right: tuple or None, is_or: bool) \
+        -> tuple or None:
+    """Combines the firing conditions of the operands of a node.
+
+    A condition (terms, need) means that the node is zero unless at least
+    need of the terms are non-zero. None means that the node can be
+    non-zero whatever the terms.
+    """
+    if is_or:
+        if left is None or right is None:
+            return None
+        return left[0] | right[0], min(left[1], right[1])
+    if left is None or right is None:
+        return right if left is None else left
+    if left[0].isdisjoint(right[0]):
+        return left[0] | right[0], left[1] + right[1]
+    return max(left, right, key=lambda condition: condition[1])
+
+
+def _gather(values: NDArray, starts: NDArray, keys: NDArray) -> NDArray:
+    """Concatenates the groups values[starts[k]:starts[k + 1]] of the given
+    keys, without a python loop over the keys."""
+    lengths = starts[keys + 1] - starts[keys]
+    offsets = np.repeat(starts[keys] - np.cumsum(lengths) + lengths, lengths)
+    return values[offsets + np.arange(lengths.sum())]
@@ -126,6 +126,11 @@ class Antecedent(Proposition):
         else:
             return super().to_string()
 
+    def variable_names(self) -> set[str]:
+        """Returns the names of the linguistic variables the antecedent
+        depends on."""
+        return {self.name}
+
     def get_cylindrical_extension(self, firing_strengths:
                                   dict[str, dict[str, float]]) -> float:
         """Returns the cylindrical extension of a single antecedent.
@@ -212,6 +217,14 @@ class Antecedents():
                              else self.antecedents[key].to_string()
                               for key in self.antecedents.keys()]) + ")"
 
+    def variable_names(self) -> set[str]:
+        """Returns the names of the linguistic variables the antecedents
+        depend on."""
+        names = self.antecedents['antecedent1'].variable_names()
+        if not self.single_antecedent:
+            names |= self.antecedents['antecedent2'].variable_names()
+        return names
+
     def get_cylindrical_extension(self, firing_strengths:
                                   dict[str, dict[str, float]]) \
             -> float or np.ndarray:
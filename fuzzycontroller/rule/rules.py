@@ -1,5 +1,6 @@
 from __future__ import annotations
 from .rule import Rule
+from .program import RuleProgram
 from ..linguistic.variables import LinguisticVariable
 import numpy as np
 
@@ -14,6 +15,8 @@ class Rules():
             name of the rule.
         lvs: dictionary of linguistic variables.
         rules: dictionary of rules. The keys are the name of the rule.
+        program: the compiled :class:`.RuleProgram`, or None if the rules
+            have not been compiled.
     """
 
     def __init__(self, rules: dict,
@@ -25,6 +28,7 @@ class Rules():
             linguistic_variables: dict of linguistic variables.
         """
         self._output_sets = None
+        self.program = None
         self.lvs = linguistic_variables
         self.rules = {}
         for rule_name, rule in rules.items():
@@ -41,16 +45,65 @@ class Rules():
             return self._output_sets
         raise AttributeError("Output sets not computed")
 
-    def get_correct_output_sets(self,
-                                firing_strengths: dict[str, dict[str, float]]):
-        """Calculates the correct output sets for the given firing strengths.
+    def dependency_index(self) -> dict[str, list[str]]:
+        """Indexes the rules by the linguistic variables their antecedents
+        depend on.
+
+        Returns:
+            dictionary mapping a variable name to the names of the rules
+            which use it, in the order of the rules.
+        """
+        index = {}
+        for rule_name, rule in self.rules.items():
+            for name in sorted(rule.antecedents.variable_names()):
+                index.setdefault(name, []).append(rule_name)
+        return index
+
+    def compile(self, program_class: type = RuleProgram) -> RuleProgram:
+        """Compiles the rules into a :class:`.RuleProgram`, which is then used
+        to calculate the output sets.
+
+        Args:
+            program_class: the :class:`.RuleProgram` subclass to compile
+                into, e.g. one with other kinds of consequents.
+
+        Returns:
+            the compiled program.
+        """
+        self.program = program_class(self.rules)
+        return self.program
+
+    def compute_output_sets(self,
+                            firing_strengths: dict[str, dict[str, float]]) \
+            -> dict[str, np.ndarray]:
+        """Calculates the output sets for the given firing strengths,
+        without storing them, so that it can be called from many threads.
 
         Args:
             firing_strengths: dict of firing strengths for each
                 linguistic term.
+
+        Returns:
+            dictionary of output sets, keyed by rule name.
         """
+        if self.program is not None:
+            strengths = self.program.rule_strengths(
+                self.program.membership_vector(firing_strengths))
+            return dict(zip(self.program.rule_names,
+                            self.program.output_sets(strengths)))
+
         output_sets = {}
         for rule_name, rule in self.rules.items():
             output_sets[rule_name] = rule.apply_rule(firing_strengths)
+        return output_sets
+
+    def get_correct_output_sets(self,
+                                firing_strengths: dict[str, dict[str, float]]):
+        """Calculates the correct output sets for the given firing strengths
+        and stores them in :attr:`output_sets`.
 
-        self._output_sets = output_sets
+        Args:
+            firing_strengths: dict of firing strengths for each
+                linguistic term.
+        """
+        self._output_sets = self.compute_output_sets(firing_strengths)
@@ -0,0 +1,181 @@
+from ..rules import Rules
+from ...linguistic.variables import LinguisticVariable
+import pytest
+import numpy as np
+
+
+@pytest.fixture
+def rules():
+    lv_ant = LinguisticVariable("temperature",
+                                {"universe": {"start": 0, "end": 60,
+                                              "step": 0.1},
+                                 "terms": {
+                                     "cold": {
+                                         "name": "cold",
+                                         "mf": {"type": "trimf",
+                                                "params": [0, 10, 20]}
+                                        },
+                                     "hot": {
+                                         "name": "hot",
+                                         "mf": {"type": "trimf",
+                                                "params": [40, 50, 60]}
+                                        }
+                                    }
+                                 })
+    lv_conq = LinguisticVariable("layers",
+                                 {"universe": {"start": 0, "end": 5,
+                                               "step": 1},
+                                  "terms": {
+                                      "many": {
+                                          "name": "many",
+                                          "mf": {"type": "trimf",
+                                                 "params": [3, 5, 5]}
+                                        },
+                                      "few": {
+                                          "name": "few",
+                                          "mf": {"type": "trimf",
+                                                 "params": [0, 0, 2]}
+                                        }
+                                    }
+                                  })
+    rules = {"rule1": {"antecedent": {"antecedent1": "temperature IS cold"},
+                       "consequent": "layers IS many"},
+             "rule2": {"antecedent": {
+                           "antecedent1": "NOT temperature IS hot",
+                           "operator": "AND",
+                           "antecedent2": {
+                               "antecedent1": "temperature IS cold",
+                               "operator": "OR",
+                               "antecedent2": {
+                                   "antecedent1": "temperature IS hot",
+                                   "operator": "AND",
+                                   "antecedent2": "NOT temperature IS cold"}}},
+                       "consequent": "layers IS few"}}
+    yield Rules(rules, {'temperature': lv_ant, 'layers': lv_conq})
+
+
+def test_compile_layers(rules):
+    program = rules.compile()
+    assert program.rule_names == ['rule1', 'rule2']
+    assert len(program.layers) == 3
+    assert list(program.leaf_negate) == [False, True, False, False, True]
+    assert program.output_term_names == ['many', 'few']
+
+
+def test_rule_strengths_match_tree(rules):
+    program = rules.compile()
+    for cold, hot in [(0.2, 0.7), (0.9, 0.1), (0.0, 1.0), (0.4, 0.4)]:
+        fs = {'temperature': {'cold': cold, 'hot': hot}}
+        expected = [rule.antecedents.get_cylindrical_extension(fs)
+                    for rule in rules.rules.values()]
+        strengths = program.rule_strengths(program.membership_vector(fs))
+        assert np.array_equal(strengths, expected)
+
+
+def test_rule_strengths_batch(rules):
+    program = rules.compile()
+    fs = {'temperature': {'cold': np.array([0.2, 0.9]),
+                          'hot': np.array([0.7, 0.1])}}
+    strengths = program.rule_strengths(program.membership_vector(fs))
+    assert strengths.shape == (2, 2)
+    assert np.array_equal(strengths[:, 1], program.rule_strengths(
+        program.membership_vector({'temperature': {'cold': 0.9,
+                                                   'hot': 0.1}})))
+
+
+def test_get_correct_output_sets_compiled(rules):
+    fs = {'temperature': {'cold': 0.3, 'hot': 0.6}}
+    rules.get_correct_output_sets(fs)
+    expected = rules.output_sets
+    rules.compile()
+    rules.get_correct_output_sets(fs)
+    for name, output_set in expected.items():
+        assert np.array_equal(rules.output_sets[name], output_set)
+
+
+def test_output_supports(rules):
+    program = rules.compile()
+    # many = trimf(3, 5, 5) and few = trimf(0, 0, 2) over 0, 1, .., 4.
+    assert program.output_supports.tolist() == [[4, 5], [0, 2]]
+
+
+def test_aggregate_set_matches_dense(rules):
+    program = rules.compile()
+    for strengths in [np.array([0.3, 0.8]), np.array([0.0, 0.5]),
+                      np.array([0.0, 0.0])]:
+        expected = np.fmax.reduce(program.output_sets(strengths))
+        assert np.array_equal(program.aggregate_set(strengths), expected)
+        assert np.array_equal(program.aggregate_set(strengths, grouped=False),
+                              expected)
+
+    batch = np.array([[0.3, 0.0, 0.0], [0.8, 0.5, 0.0]])
+    assert np.array_equal(program.aggregate_sets(batch), np.stack(
+        [program.aggregate_set(batch[:, i]) for i in range(3)]))
+
+
+def test_dependency_index(rules):
+    assert rules.dependency_index() == {'temperature': ['rule1', 'rule2']}
+
+
+def test_consequent_strengths_batch(rules):
+    grouped = Rules({"rule1": {"antecedent": {
+                                   "antecedent1": "temperature IS cold"},
+                               "consequent": "layers IS few"},
+                     "rule2": {"antecedent": {
+                                   "antecedent1": "temperature IS hot"},
+                               "consequent": "layers IS many"},
+                     "rule3": {"antecedent": {
+                                   "antecedent1": "NOT temperature IS hot"},
+                               "consequent": "layers IS few"}}, rules.lvs)
+    program = grouped.compile()
+    strengths = np.array([[0.3, 0.9, 0.0], [0.1, 0.0, 0.0],
+                          [0.8, 0.5, 0.0]])
+    assert program.consequent_strengths(strengths).tolist() == \
+        [[0.8, 0.9, 0.0], [0.1, 0.0, 0.0]]
+    assert np.array_equal(program.aggregate_sets(strengths),
+                          program.aggregate_sets(strengths, grouped=False))
+
+
+def test_active_rules(rules):
+    program = rules.compile()
+    # rule1 needs cold. rule2 is NOT hot AND (cold OR (hot AND NOT cold)),
+    # so it needs cold or hot.
+    rule_ids, starts = program.term_rules
+    cold = program.term_index[('temperature', 'cold')]
+    hot = program.term_index[('temperature', 'hot')]
+    assert rule_ids[starts[cold]:starts[cold + 1]].tolist() == [0, 1]
+    assert rule_ids[starts[hot]:starts[hot + 1]].tolist() == [1]
+    assert program.rule_needs.tolist() == [1, 1]
+    for cold, hot, active in [(0.0, 0.5, [1]), (0.3, 0.0, [0, 1]),
+                              (0.0, 0.0, [])]:
+        memberships = program.membership_vector(
+            {'temperature': {'cold': cold, 'hot': hot}})
+        assert program.active_rules(memberships).tolist() == active
+
+
+def test_sparse_rule_strengths_match_dense(rules):
+    program = rules.compile()
+    program.min_sparse_rules = 0
+    program.max_active_fraction = 1.0
+    for cold, hot in [(0.2, 0.7), (0.0, 1.0), (0.0, 0.0), (0.4, 0.0)]:
+        memberships = program.membership_vector(
+            {'temperature': {'cold': cold, 'hot': hot}})
+        strengths, evaluated = program.sparse_rule_strengths(memberships)
+        assert np.array_equal(strengths, program.rule_strengths(memberships))
+        assert np.array_equal(evaluated, program.active_rules(memberships))
+    memberships = program.membership_vector(
+        {'temperature': {'cold': np.array([0.0, 0.9]),
+                         'hot': np.array([0.7, 0.0])}})
+    strengths, evaluated = program.sparse_rule_strengths(memberships)
+    assert np.array_equal(strengths, program.rule_strengths(memberships))
+
+
+def test_evaluate_rules(rules):
+    program = rules.compile()
+    memberships = program.membership_vector(
+        {'temperature': {'cold': 0.3, 'hot': 0.6}})
+    dense = program.rule_strengths(memberships)
+    for subset in ([0], [1], [0, 1], []):
+        assert np.array_equal(
+            program.evaluate_rules(memberships, np.array(subset, dtype=int)),
+            dense[subset])
@@ -0,0 +1,301 @@
+from __future__ import annotations
+from .cli import rows_to_batch
+from .system.fis import FIS
+from collections import deque
+import asyncio
+import json
+import math
+import time
+import numpy as np
+
+
+class MicroBatcher():
+    """Collects concurrent requests into batches for one vectorized call.
+
+    A batch is started by the first waiting request and closed when it
+    holds max_batch_size requests or max_wait seconds have passed. Requests
+    which are already queued are taken without waiting, so under load the
+    batches fill up on their own and when idle a lone request is delayed by
+    at most max_wait.
+
+    Attributes:
+        fis: the inference system being served.
+        max_batch_size: largest number of requests evaluated together.
+        max_wait: longest time, in seconds, a batch waits for requests.
+        defuzzication_method: method used to defuzzify the outputs.
+        requests: number of requests evaluated.
+        batches: number of batches evaluated.
+    """
+
+    def __init__(self, fis: FIS, max_batch_size: int = 256,
+                 max_wait: float = 0.002,
+                 defuzzication_method: str = "centroid",
+                 latency_window: int = 10000):
+        """Initializes the batcher. It must be started with :meth:`start`.
+
+        Args:
+            fis: a loaded inference system.
+            max_batch_size: largest number of requests evaluated together.
+            max_wait: longest time, in seconds, a batch waits for requests.
+            defuzzication_method: method used to defuzzify the outputs.
+            latency_window: number of recent latencies kept for the
+                percentiles.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.fis = fis
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.defuzzication_method = defuzzication_method
+        self.requests = 0
+        self.batches = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        """Starts batching on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stops batching. Queued requests are cancelled."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            self._queue.get_nowait()[1].cancel()
+
+    async def evaluate(self, inputs: dict) -> float:
+        """Evaluates one input as part of the next batch.
+
+        Args:
+            inputs: the input dictionary, as for
+                :meth:`.FIS.compute_defuzzified_output`.
+
+        Returns:
+            the defuzzified output.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((inputs, future, time.perf_counter()))
+        return await future
+
+    async def _next_batch(self) -> list[tuple]:
+        """Waits for the next batch of requests."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(),
+                                                        remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self._queue.get_nowait())
+        return batch
+
+    def _compute(self, rows: list[dict]) -> list:
+        """Evaluates the rows of a batch. If the batch cannot be evaluated,
+        e.g. because one input is out of range, the rows are evaluated one
+        by one so only the bad requests fail.
+
+        Returns:
+            the output, or the raised exception, of every row.
+        """
+        try:
+            return self.fis.compute_defuzzified_outputs(
+                rows_to_batch(self.fis, rows),
+                self.defuzzication_method).tolist()
+        except Exception:
+            results = []
+            for row in rows:
+                try:
+                    results.append(self.fis.compute_defuzzified_outputs(
+                        rows_to_batch(self.fis, [row]),
+                        self.defuzzication_method)[0])
+                except Exception as error:
+                    results.append(error)
+            return results
+
+    async def _run(self):
+        """Evaluates batches until stopped. The evaluation runs in a worker
+        thread so the event loop keeps accepting requests meanwhile."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            results = await loop.run_in_executor(
+                None, self._compute, [inputs for inputs, _, _ in batch])
+            self.requests += len(batch)
+            self.batches += 1
+            now = time.perf_counter()
+            for (_, future, received), result in zip(batch, results):
+                self._latencies.append(now - received)
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self) -> dict[str, float]:
+        """Returns the counters and the latency percentiles, in
+        milliseconds, of the recent requests."""
+        stats = {"requests": self.requests, "batches": self.batches,
+                 "mean_batch_size": self.requests / self.batches
+                 if self.batches else 0.0}
+        latencies = np.array(self._latencies) * 1000
+        for percentile in (50, 90, 99):
+            stats[f"p{percentile}_ms"] = \
+                float(np.percentile(latencies, percentile)) \
+                if len(latencies) else None
+        return stats
+
+
+class InferenceServer():
+    """Serves an inference system over line-delimited JSON.
+
+    Every line sent by a client is one JSON request and gets one JSON line
+    back, in the order of the requests. A client can send many requests
+    without waiting for the responses, and the requests of all the clients
+    are evaluated together by a :class:`MicroBatcher`.
+
+    Requests are either {"inputs": {...}}, answered with {"output": x}, or
+    {"command": "stats"}, answered with the statistics of the batcher. An
+    "id" in a request is copied into its response. Failed requests are
+    answered with {"error": message}.
+
+    Attributes:
+        batcher: the micro-batcher evaluating the requests.
+        server: the asyncio server, once started.
+    """
+
+    def __init__(self, fis: FIS, max_batch_size: int = 256,
+                 max_wait: float = 0.002,
+                 defuzzication_method: str = "centroid"):
+        """Initializes the server.
+
+        Args:
+            fis: a loaded inference system.
+            max_batch_size: largest number of requests evaluated together.
+            max_wait: longest time, in seconds, a batch waits for requests.
+            defuzzication_method: method used to defuzzify the outputs.
+        """
+        self.batcher = MicroBatcher(fis, max_batch_size, max_wait,
+                                    defuzzication_method)
+        self.server = None
+        self._connections = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765,
+                    path: str = None):
+        """Starts listening on a TCP port, or on a Unix socket if path is
+        given.
+
+        Args:
+            host: the host to listen on.
+            port: the TCP port, 0 for any free port.
+            path: path of the Unix socket.
+        """
+        self.batcher.start()
+        if path is None:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        else:
+            self.server = await asyncio.start_unix_server(self._handle, path)
+
+    @property
+    def address(self):
+        """The address the server listens on."""
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """Stops the server and closes the open connections."""
+        self.server.close()
+        for connection in list(self._connections):
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self.server.wait_closed()
+        await self.batcher.stop()
+
+    async def _respond(self, line: bytes) -> dict:
+        """Answers one request line."""
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return {"error": "invalid JSON: %s" % error}
+        if not isinstance(request, dict):
+            return {"error": "a request should be a JSON object"}
+
+        try:
+            if request.get("command") == "stats":
+                response = self.batcher.stats()
+            elif "inputs" in request:
+                output = await self.batcher.evaluate(request["inputs"])
+                response = {"output": None if math.isnan(output)
+                            else output}
+            else:
+                response = {"error": "expected 'inputs' or 'command'"}
+        except Exception as error:
+            response = {"error": str(error)}
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter):
+        """Reads the requests of a client and writes the responses in
+        order, while the requests are evaluated concurrently."""
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        responses = asyncio.Queue()
+
+        async def write_responses():
+            while True:
+                response = await responses.get()
+                if response is None:
+                    return
+                writer.write(json.dumps(await response).encode() + b"\n")
+                await writer.drain()
+
+        writing = asyncio.get_running_loop().create_task(write_responses())
+        try:
+            async for line in reader:
+                if line.strip():
+                    await responses.put(asyncio.ensure_future(
+                        self._respond(line)))
+            await responses.put(None)
+            await writing
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writing.cancel()
+            writer.close()
+            self._connections.discard(connection)
+
+
+async def serve(fis: FIS, host: str = "127.0.0.1", port: int = 8765,
+                path: str = None, max_batch_size: int = 256,
+                max_wait: float = 0.002,
+                defuzzication_method: str = "centroid"):
+    """Serves an inference system until cancelled.
+
+    Args:
+        fis: a loaded inference system.
+        host: the host to listen on.
+        port: the TCP port.
+        path: path of a Unix socket to listen on instead of a TCP port.
+        max_batch_size: largest number of requests evaluated together.
+        max_wait: longest time, in seconds, a batch waits for requests.
+        defuzzication_method: method used to defuzzify the outputs.
+    """
+    server = InferenceServer(fis, max_batch_size, max_wait,
+                             defuzzication_method)
+    await server.start(host, port, path)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+from numpy.typing import NDArray
+import json
+import struct
+import numpy as np
+
+MAGIC = b"FUZZYFIS"
+VERSION = 1
+_ALIGNMENT = 64
+# magic, format version, length of the JSON header.
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _align(offset: int) -> int:
+    """Rounds offset up to the next multiple of the alignment."""
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def save_compiled(path: str, model_data: dict, tables: dict[str, NDArray],
+                  program: dict):
+    """Saves a built model to a binary file.
+
+    The file starts with a preamble (magic, format version and header
+    length) followed by a JSON header, holding the model dictionary, the
+    metadata of the compiled rules and the layout of the arrays. The raw
+    arrays follow, each aligned to 64 bytes, so that they can be
+    memory-mapped.
+
+    Args:
+        path: path of the file.
+        model_data: the dictionary the model was loaded from.
+        tables: the arrays of the built model, see :meth:`.FIS.tables`.
+        program: the metadata of the compiled rules, see
+            :meth:`.RuleProgram.metadata`.
+    """
+    arrays = {name: np.ascontiguousarray(table)
+              for name, table in tables.items()}
+    layout = []
+    offset = 0
+    for name, array in arrays.items():
+        layout.append([name, array.dtype.str, list(array.shape), offset])
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({"model": model_data, "program": program,
+                         "arrays": layout}).encode()
+    data_start = _align(_PREAMBLE.size + len(header))
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for (_, _, _, offset), array in zip(layout, arrays.values()):
+            f.write(b"\0" * (data_start + offset - f.tell()))
+            f.write(array.tobytes())
+
+
+def load_compiled(path: str, mmap: bool = True) \
+        -> tuple[dict, dict[str, NDArray], dict]:
+    """Loads a model saved by :func:`save_compiled`.
+
+    Args:
+        path: path of the file.
+        mmap: memory-map the arrays, read-only, instead of reading them
+            into memory.
+
+    Returns:
+        the model dictionary, the arrays of the built model and the
+        metadata of the compiled rules.
+
+    Raises:
+        ValueError: if the file is not a compiled model or was written by
+            an unsupported version.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size or \
+                preamble[:len(MAGIC)] != MAGIC:
+            raise ValueError("%s is not a compiled model" % path)
+        _, version, header_size = _PREAMBLE.unpack(preamble)
+        if version != VERSION:
+            raise ValueError("Unsupported compiled model version: %d"
+                             % version)
+        header = json.loads(f.read(header_size))
+
+    data_start = _align(_PREAMBLE.size + header_size)
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        with open(path, "rb") as f:
+            buffer = np.frombuffer(f.read(), dtype=np.uint8)
+    tables = {name: np.ndarray(tuple(shape), dtype=dtype, buffer=buffer,
+                               offset=data_start + offset)
+              for name, dtype, shape, offset in header["arrays"]}
+    return header["model"], tables, header["program"]
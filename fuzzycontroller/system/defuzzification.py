@@ -0,0 +1,219 @@
+from __future__ import annotations
+from ..membership.membership_functions import trapezoid
+from numpy.typing import NDArray
+import numpy as np
+
+
+def defuzz(universe: NDArray, aggregate_set: NDArray,
+           method: str = "centroid") -> float:
+    """Defuzzifies a single aggregate set with skfuzzy's defuzz.
+
+    skfuzzy is imported on first use, so importing the inference systems
+    does not pay for it.
+
+    Args:
+        universe: the universe of discourse of the output variable.
+        aggregate_set: the aggregate set.
+        method: defuzzification method, any method supported by
+            skfuzzy's defuzz.
+
+    Returns:
+        The defuzzified output.
+    """
+    import skfuzzy as fuzz
+    return fuzz.defuzz(universe, aggregate_set, method)
+
+
+def centroids(universe: NDArray, aggregate_sets: NDArray) -> NDArray:
+    """Computes the centroid of every row of a matrix of aggregate sets.
+
+    Uses the same piecewise-linear (trapezoid) area and moment as
+    skfuzzy's centroid, but for all rows at once. Reduced precision
+    aggregate sets are summed in float64.
+
+    Args:
+        universe: the universe of discourse of the output variable, of
+            length U.
+        aggregate_sets: a (N x U) matrix, one aggregate set per row.
+
+    Returns:
+        A numpy array of N centroids. Rows with an empty aggregate set
+            have a centroid of nan.
+    """
+    aggregate_sets = aggregate_sets.astype(np.float64, copy=False)
+    x1, x2 = universe[:-1], universe[1:]
+    y1, y2 = aggregate_sets[:, :-1], aggregate_sets[:, 1:]
+    width = x2 - x1
+    area = (0.5 * width * (y1 + y2)).sum(axis=1)
+    moment = (width * (x1 * (2 * y1 + y2) + x2 * (y1 + 2 * y2)) / 6) \
+        .sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(area > 0, moment / area, np.nan)
+
+
+def bisectors(universe: NDArray, aggregate_sets: NDArray) -> NDArray:
+    """Computes the bisector of every row of a matrix of aggregate sets.
+
+    Follows skfuzzy's bisector step by step, but for all rows at once: the
+    trapezoid areas between samples are accumulated with a cumulative sum,
+    the first sample interval reaching half of the total area is found with
+    argmax, and the bisector is solved for within that interval.
+
+    Args:
+        universe: the universe of discourse of the output variable, of
+            length U.
+        aggregate_sets: a (N x U) matrix, one aggregate set per row.
+
+    Returns:
+        A numpy array of N bisectors. Rows with an empty aggregate set are
+            nan.
+    """
+    x1, x2 = universe[:-1], universe[1:]
+    y1, y2 = aggregate_sets[:, :-1], aggregate_sets[:, 1:]
+    width = x2 - x1
+    has_area = ~(((y1 == 0) & (y2 == 0)) | (width == 0))
+    accumulated = np.cumsum(0.5 * width * (y1 + y2), axis=1)
+    total = accumulated[:, -1]
+    half = total / 2.
+
+    # Like skfuzzy, intervals without area do not hold the accumulated area.
+    accumulated = np.where(has_area, accumulated, 0.0)
+    rows = np.arange(len(aggregate_sets))
+    index = np.argmax(accumulated >= half[:, None], axis=1)
+    before = np.where(index > 0, accumulated[rows, index - 1], 0.0)
+    subarea = half - before
+    x1, x2, width = x1[index], x2[index], width[index]
+    y1, y2 = y1[rows, index], y2[rows, index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (y2 - y1) / width
+        output = np.select(
+            [y1 == y2, (y1 == 0.0) & (y2 != 0.0), (y2 == 0.0) & (y1 != 0.0)],
+            [subarea / y1 + x1,
+             x1 + np.sqrt(2. * subarea * width / y2),
+             x2 - np.sqrt(width * width - (2. * subarea * width / y1))],
+            x1 - (y1 - np.sqrt(y1 * y1 + 2.0 * slope * subarea)) / slope)
+    return np.where(total > 0, output, np.nan)
+
+
+def maxima(universe: NDArray, aggregate_sets: NDArray,
+           method: str = "mom") -> NDArray:
+    """Computes the mean, smallest or largest of maximum of every row of a
+    matrix of aggregate sets, like skfuzzy's 'mom', 'som' and 'lom'.
+
+    Args:
+        universe: the universe of discourse of the output variable, of
+            length U.
+        aggregate_sets: a (N x U) matrix, one aggregate set per row.
+        method: one of 'mom', 'som' or 'lom'.
+
+    Returns:
+        A numpy array of N crisp outputs. As in skfuzzy, every point of an
+            empty aggregate set is a maximum.
+    """
+    is_max = aggregate_sets == aggregate_sets.max(axis=1, keepdims=True)
+    if method == "som":
+        return universe[np.argmax(is_max, axis=1)]
+    if method == "lom":
+        return universe[len(universe) - 1
+                        - np.argmax(is_max[:, ::-1], axis=1)]
+    return (is_max * universe).sum(axis=1) / is_max.sum(axis=1)
+
+
+def defuzzify(universe: NDArray, aggregate_sets: NDArray,
+              method: str = "centroid") -> NDArray:
+    """Defuzzifies every row of a matrix of aggregate sets.
+
+    The 'centroid', 'bisector', 'mom', 'som' and 'lom' methods are computed
+    for all the rows at once, the others with skfuzzy row by row.
+
+    Args:
+        universe: the universe of discourse of the output variable.
+        aggregate_sets: a (N x U) matrix, one aggregate set per row.
+        method: defuzzification method, any method supported by
+            skfuzzy's defuzz.
+
+    Returns:
+        A numpy array of N crisp outputs. Rows with an empty aggregate set
+            are nan for the area based methods.
+    """
+    if method == "centroid":
+        return centroids(universe, aggregate_sets)
+    if method == "bisector":
+        return bisectors(universe, aggregate_sets)
+    if method in ("mom", "som", "lom"):
+        return maxima(universe, aggregate_sets, method)
+
+    return np.array([defuzz(universe, aggregate_set, method)
+                     for aggregate_set in aggregate_sets])
+
+
+def exact_centroid(corners: NDArray, strengths: NDArray,
+                   lower: float, upper: float) -> float:
+    """Computes the exact centroid of the aggregate of clipped trapezoids.
+
+    The aggregate max_t(min(mf_t(x), strength_t)) of trapezoidal (or
+    triangular) membership functions is piecewise linear. Its breakpoints
+    are the corners of the trapezoids, the points where they cross their
+    clipping level and the points where two clipped trapezoids cross. Between
+    two breakpoints the aggregate is linear, so its area and moment are
+    integrated exactly with a two point Gauss-Legendre rule. No output
+    universe needs to be sampled.
+
+    The pairwise crossings make this O(T^3) in the number of terms T. The
+    rules are grouped by consequent term first (see
+    :meth:`.RuleProgram.consequent_strengths`), so T is the handful of
+    output terms and does not grow with the number of rules.
+
+    Args:
+        corners: a (T x 4) array of the (a, b, c, d) corners of each term.
+        strengths: a (T,) array of the clipping level of each term.
+        lower: lower bound of the output universe.
+        upper: upper bound of the output universe.
+
+    Returns:
+        The centroid of the aggregate set over [lower, upper].
+
+    Raises:
+        ValueError: if the aggregate set is empty.
+    """
+    active = strengths > 0
+    corners = np.asarray(corners, dtype=float)[active]
+    levels = np.asarray(strengths, dtype=float)[active][:, None]
+    a, b, c, d = (corners[:, i:i + 1] for i in range(4))
+
+    def aggregate(x):
+        return np.fmin(trapezoid(x, a, b, c, d), levels)
+
+    crossings = np.concatenate([a + levels * (b - a), d - levels * (d - c)])
+    breakpoints = np.concatenate([[lower, upper], corners.ravel(),
+                                  crossings.ravel()])
+    breakpoints = np.unique(np.clip(breakpoints, lower, upper))
+
+    # Within each interval every clipped trapezoid is linear. Their
+    # one-sided values at the interval ends are extrapolated from two
+    # interior points, which also handles vertical edges.
+    x0, width = breakpoints[:-1], np.diff(breakpoints)
+    first = aggregate(x0 + width / 3)
+    second = aggregate(x0 + 2 * width / 3)
+    left, right = 2 * first - second, 2 * second - first
+    for i in range(len(corners)):
+        dleft, dright = left[i] - left[i + 1:], right[i] - right[i + 1:]
+        crossing = dleft * dright < 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = dleft / (dleft - dright)
+        breakpoints = np.concatenate([breakpoints, (x0 + t * width)[crossing]])
+    breakpoints = np.unique(breakpoints)
+
+    middle, half_width = (breakpoints[:-1] + breakpoints[1:]) / 2, \
+        np.diff(breakpoints) / 2
+    offset = half_width / np.sqrt(3)
+    area = 0.0
+    moment = 0.0
+    for x in (middle - offset, middle + offset):
+        y = aggregate(x).max(axis=0, initial=0.0)
+        area += np.sum(half_width * y)
+        moment += np.sum(half_width * x * y)
+
+    if area <= 0:
+        raise ValueError("Total area is zero in defuzzification")
+    return moment / area
@@ -1,12 +1,19 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from ..utils.json_handler import JsonHandler
+from ..utils.cache import OutputCache
+from ..utils.profiling import Profiler
+from ..utils.pool import ArrayPool
 from ..rule.rules import Rules
+from ..rule.program import RuleProgram
 from ..linguistic.variables import LinguisticVariable
+from ..membership.membership_functions import PiecewiseLinearMF
+from .defuzzification import defuzz, defuzzify, exact_centroid
+from .inference import Inference
+from .session import InferenceSession
+from .compiled import save_compiled, load_compiled
 from numpy.typing import NDArray
-import skfuzzy as fuzz
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 class FIS(ABC):
@@ -14,12 +21,27 @@ class FIS(ABC):
 
     Attributes:
         json_handler: JsonHandler object used to read the json file.
+        model_data: the dictionary the model was loaded from.
         variables: dictionary containing the linguistic variables.
+        input_names: names of the input variables, in the order they are
+            defined in the json file.
         output_variable: name of the output variable.
         rules: Rules object containing the rules.
+        cache: OutputCache of defuzzified outputs, or None when caching is
+            disabled.
+        profiler: Profiler timing the stages of every evaluation, or None
+            when profiling is disabled.
+        pool: ArrayPool in which the universes, membership functions and
+            term matrices of the loaded model are interned.
+        dtype: floating point type of the membership functions, output
+            sets and aggregate sets of the loaded model.
         type: type of the inference system - used in implementation.
+        program_class: the :class:`.RuleProgram` class the rules are
+            compiled into.
     """
 
+    program_class = RuleProgram
+
     @property
     def type(self):
         pass
@@ -27,11 +49,17 @@ class FIS(ABC):
     def __init__(self):
         """Initializes the Mamdani Fuzzy Inference System."""
         self.json_handler = JsonHandler()
+        self.model_data = None
         self.variables = {}
+        self.input_names = []
         self.output_variable = None
+        self.cache = None
+        self.profiler = None
+        self.pool = ArrayPool()
+        self.dtype = np.dtype(np.float64)
 
-    def _load_linguistic_variable(self, name: str,
-                                  variable_data: dict) -> None:
+    def _load_linguistic_variable(self, name: str, variable_data: dict,
+                                  tables: dict[str, NDArray] = None) -> None:
         """Loads the linguistic variable from a dictionary.
         variable_data should be of the form {'universe': universe,
         'terms': terms}
@@ -39,10 +67,32 @@ class FIS(ABC):
         Args:
             name: name of the linguistic variable.
             variable_data: dictionary containing the linguistic variable info.
+            tables: the arrays of the built model, if any, see
+                :meth:`load_dict`.
         """
-        self.variables[name] = LinguisticVariable(name, variable_data)
+        if tables is None:
+            self.variables[name] = LinguisticVariable(name, variable_data,
+                                                      pool=self.pool,
+                                                      dtype=self.dtype)
+        else:
+            self.variables[name] = LinguisticVariable(
+                name, variable_data, tables[f"{name}.universe"],
+                tables[f"{name}.terms"])
+
+    def _load_output(self, name: str, output_data: dict,
+                     tables: dict[str, NDArray] = None) -> None:
+        """Loads the output variable from a dictionary, as a linguistic
+        variable.
 
-    def load_data(self, input_file: str):
+        Args:
+            name: name of the output variable.
+            output_data: dictionary containing the output variable info.
+            tables: the arrays of the built model, if any, see
+                :meth:`load_dict`.
+        """
+        self._load_linguistic_variable(name, output_data, tables)
+
+    def load_data(self, input_file: str, dtype: str = None):
         """Loads the data from a json file
 
         Input file should correspond to 'example.json' in the
@@ -50,22 +100,249 @@ class FIS(ABC):
 
         Args:
             input_file: path to the json file containing the data.
+            dtype: overrides the dtype of the model, see :meth:`load_dict`.
+
+        """
+        self.load_dict(self.json_handler.read(input_file), dtype=dtype)
 
+    def load_dict(self, json_data: dict, tables: dict[str, NDArray] = None,
+                  program: dict = None, dtype: str = None):
+        """Loads the data from a dictionary, in the same format as the json
+        file read by :meth:`load_data`.
+
+        Args:
+            json_data: dictionary containing the data.
+            tables: the arrays of the built model, as returned by
+                :meth:`tables`. When given, the universes and membership
+                functions are used as they are instead of being rebuilt.
+            program: the metadata of the compiled rules, as returned by
+                :meth:`.RuleProgram.metadata`. When given with tables, the
+                rules are not compiled again.
+            dtype: floating point type of the membership functions and of
+                the sets computed from them, one of 'float64', 'float32'
+                or 'float16'. Overrides the optional 'dtype' of the model,
+                which defaults to 'float64'. Universes and defuzzification
+                sums stay float64. Ignored when tables are given.
+
+        Raises:
+            ValueError: if the dtype is not supported.
         """
-        json_data = self.json_handler.read(input_file)
+        dtype = np.dtype(dtype or json_data.get("dtype", "float64"))
+        if dtype not in (np.float64, np.float32, np.float16):
+            raise ValueError("Unsupported dtype: %s" % dtype)
+        if tables is not None:
+            dtype = tables[f"{next(iter(json_data['inputs']))}.terms"].dtype
+        self.dtype = dtype
+        self.model_data = json_data
+        self.variables = {}
+        self.pool = ArrayPool()
         inputs = json_data["inputs"]
+        self.input_names = list(inputs.keys())
         for key, data in inputs.items():
-            self._load_linguistic_variable(key, data)
+            self._load_linguistic_variable(key, data, tables)
         for key, data in json_data["output"].items():
             self.output_variable = key
-            self.variables[key] = LinguisticVariable(key, data)
+            self._load_output(key, data, tables)
+
+        # The term matrices hold copies of the membership functions.
+        self.pool.release("mf")
 
         self.rules = Rules(json_data["rules"], self.variables)
+        if tables is None:
+            self.rules.compile(self.program_class)
+        else:
+            rule_tables = {name[len("rules."):]: table
+                           for name, table in tables.items()
+                           if name.startswith("rules.")}
+            if program is None:
+                self.rules.compile(self.program_class).attach(rule_tables)
+            else:
+                self.rules.program = self.program_class.from_tables(
+                    program, rule_tables)
+        if self.cache is not None:
+            self.cache.clear()
+            self.cache.bounds = self._input_bounds()
+
+    def memory_report(self) -> dict[str, dict[str, int]]:
+        """Reports how many arrays were shared when loading the model.
+
+        Variables with the same universe share one read-only universe
+        array, and variables whose terms have the same membership functions
+        share one read-only term matrix. Membership functions repeated over
+        the same universe are only sampled once while loading.
+
+        Returns:
+            dictionary of counters for the 'universe', 'mf' and
+            'term_matrix' arrays and their 'total', see
+            :meth:`.ArrayPool.report`. 'saved_bytes' is the memory which
+            was not allocated thanks to the sharing.
+        """
+        return self.pool.report()
+
+    def save_compiled(self, path: str):
+        """Saves the built model to a binary file, see
+        :func:`.save_compiled`.
+
+        Args:
+            path: path of the file.
+        """
+        save_compiled(path, dict(self.model_data, dtype=self.dtype.name),
+                      self.tables(), self.rules.program.metadata())
+
+    def load_compiled(self, path: str, mmap: bool = True):
+        """Loads a model saved by :meth:`save_compiled`.
+
+        The universes, membership functions and compiled rules are not
+        rebuilt. By default they are memory-mapped from the file, so that
+        loading is nearly instant and processes loading the same file
+        share its pages.
+
+        Args:
+            path: path of the file.
+            mmap: memory-map the arrays instead of reading them.
+        """
+        self.load_dict(*load_compiled(path, mmap))
+
+    def tables(self) -> dict[str, NDArray]:
+        """Returns the arrays of the loaded model, keyed by name: the
+        universe and term matrix of every linguistic variable and the arrays
+        of the compiled rules.
+
+        Returns:
+            dictionary of arrays.
+        """
+        tables = {}
+        for name, variable in self._linguistic_variables():
+            tables[f"{name}.universe"] = variable.universe
+            tables[f"{name}.terms"] = variable.term_matrix
+        for name, table in self.rules.program.tables().items():
+            tables[f"rules.{name}"] = table
+        return tables
+
+    def attach_tables(self, tables: dict[str, NDArray]):
+        """Replaces the arrays of the loaded model with equal arrays, e.g.
+        arrays in shared memory, so that they are not duplicated.
+
+        Args:
+            tables: arrays keyed by name, as returned by :meth:`tables`.
+        """
+        for name, variable in self._linguistic_variables():
+            variable.attach(tables[f"{name}.universe"],
+                            tables[f"{name}.terms"])
+        self.rules.program.attach({name[len("rules."):]: table
+                                   for name, table in tables.items()
+                                   if name.startswith("rules.")})
+
+    def _linguistic_variables(self):
+        """Yields the (name, variable) pairs of the variables which are
+        :class:`.LinguisticVariable` objects, i.e. which have tables."""
+        for name, variable in self.variables.items():
+            if isinstance(variable, LinguisticVariable):
+                yield name, variable
+
+    def enable_cache(self, max_entries: int = 1024,
+                     quantization: dict[str, float] = None,
+                     policy: str = "lru") -> OutputCache:
+        """Caches the outputs of :meth:`compute_defuzzified_output`.
+
+        Inputs are rounded to their quantization step before being
+        evaluated, so that repeated or nearly repeated inputs skip
+        fuzzification and rule evaluation entirely. Rounded inputs are
+        clamped to the universe of their variable. The cache is cleared
+        whenever :meth:`load_data` reloads the model.
+
+        Args:
+            max_entries: maximum number of cached outputs.
+            quantization: dictionary of quantization steps, keyed by input
+                variable name.
+            policy: eviction policy, either 'lru' or 'lfu'.
+
+        Returns:
+            the cache, which exposes the hit / miss counters.
+        """
+        self.cache = OutputCache(max_entries, quantization, policy,
+                                 self._input_bounds())
+        return self.cache
+
+    def _input_bounds(self) -> dict[str, tuple[float, float]]:
+        """Returns the (lower, upper) bounds of the universe of every input
+        variable, keyed by name."""
+        return {name: (float(self.variables[name].universe.min()),
+                       float(self.variables[name].universe.max()))
+                for name in self.input_names}
+
+    def disable_cache(self):
+        """Stops caching the defuzzified outputs."""
+        self.cache = None
+
+    def enable_profiling(self, profiler: Profiler = None) -> Profiler:
+        """Times the fuzzification, rule firing, aggregation and
+        defuzzification stages of every evaluation and counts the rule
+        evaluations.
+
+        Args:
+            profiler: the profiler to record into, e.g. one shared by many
+                systems. A new one is created by default.
+
+        Returns:
+            the profiler, which exposes the counters and the hook registry.
+        """
+        self.profiler = profiler if profiler is not None else Profiler()
+        return self.profiler
+
+    def disable_profiling(self):
+        """Stops profiling the evaluations."""
+        self.profiler = None
+
+    def _stage(self, stage: str, samples: int, function, *args):
+        """Calls function(*args), timing it as a stage of the evaluation
+        when profiling is enabled."""
+        if self.profiler is None:
+            return function(*args)
+        return self.profiler.time(stage, samples, function, *args)
+
+    def _rule_strengths(self, fs: dict, samples: int = 1) -> NDArray:
+        """Computes the strength of every rule from the firing strengths.
+
+        Only the rules which reference a non-zero term, or have a negated
+        antecedent, are evaluated, see :meth:`.RuleProgram.active_rules`.
+        The evaluated and skipped rules are counted when profiling is
+        enabled."""
+        program = self.rules.program
+        strengths, rules = program.sparse_rule_strengths(
+            program.membership_vector(fs))
+        if self.profiler is not None:
+            self.profiler.count_rules(
+                [program.rule_names[i] for i in rules], samples,
+                skipped=len(program.rule_names) - len(rules))
+        return strengths
 
     @abstractmethod
     def get_all_firing_strengths(self, inputs) -> dict[str, dict[str, float]]:
         pass
 
+    def get_batch_firing_strengths(self, batch) \
+            -> dict[str, dict[str, NDArray]]:
+        """Computes the firing strengths of all the linguistic terms for a
+        batch of inputs.
+
+        Args:
+            batch: the batch of inputs.
+
+        Returns:
+            dictionary of the form {'input1': {'term1': NDArray, ...}, ...}
+            where each array holds one firing strength per sample.
+        """
+        raise NotImplementedError(
+            f"batch evaluation is not supported by {type(self).__name__}")
+
+    def _batch_size(self, batch: dict) -> int:
+        """Returns the number of samples in a dictionary batch."""
+        sizes = {len(np.atleast_1d(values)) for values in batch.values()}
+        if len(sizes) != 1:
+            raise ValueError("all inputs in a batch must have the same length")
+        return sizes.pop()
+
     def compute_output_sets(self, crisp_inputs: dict) -> dict[str, NDArray]:
         """Computes the output sets for the given crisp inputs.
 
@@ -78,9 +355,58 @@ class FIS(ABC):
             dictionary containing the output sets for each rule.
 
         """
-        fs = self.get_all_firing_strengths(crisp_inputs)
-        self.rules.get_correct_output_sets(fs)
-        return self.rules.output_sets
+        fs = self._stage("fuzzification", 1, self.get_all_firing_strengths,
+                         crisp_inputs)
+        if self.profiler is not None:
+            self.profiler.count_rules(self.rules.rules)
+        return self._stage("rule_firing", 1, self.rules.compute_output_sets,
+                           fs)
+
+    def evaluate(self, crisp_inputs,
+                 defuzzication_method="centroid") -> Inference:
+        """Evaluates the system for the given inputs and returns every
+        intermediate result.
+
+        Nothing is stored on the system, so one system can evaluate inputs
+        from many threads at once.
+
+        Args:
+            crisp_inputs: dictionary containing the crisp inputs.
+            defuzzication_method: method used to defuzzify the output
+                default: centroid
+
+        Returns:
+            the :class:`.Inference` holding the firing strengths, rule
+            strengths, output sets, aggregate set and defuzzified output.
+        """
+        fs = self._stage("fuzzification", 1, self.get_all_firing_strengths,
+                         crisp_inputs)
+        program = self.rules.program
+        strengths = self._stage("rule_firing", 1, self._rule_strengths, fs)
+        output_sets = program.output_sets(strengths)
+        aggregate_set = self._stage("aggregation", 1, program.aggregate_set,
+                                    strengths)
+        output = self._stage("defuzzification", 1, defuzz,
+                             self.variables[self.output_variable].universe,
+                             aggregate_set, defuzzication_method)
+        return Inference(fs, dict(zip(program.rule_names, strengths)),
+                         dict(zip(program.rule_names, output_sets)),
+                         aggregate_set, output)
+
+    def start_session(self, crisp_inputs,
+                      defuzzication_method="centroid") -> InferenceSession:
+        """Starts an :class:`.InferenceSession`, which evaluates the system
+        again only where the inputs changed.
+
+        Args:
+            crisp_inputs: dictionary containing the initial crisp inputs.
+            defuzzication_method: method used to defuzzify the output
+                default: centroid
+
+        Returns:
+            the session, whose update method takes the changed inputs.
+        """
+        return InferenceSession(self, crisp_inputs, defuzzication_method)
 
     def compute_aggregate_set(self, crisp_inputs) -> NDArray:
         """Computes the aggregate set for the given crisp inputs.
@@ -91,39 +417,145 @@ class FIS(ABC):
         Returns:
             aggregate set for the given crisp inputs.
         """
-        output_sets = self.compute_output_sets(crisp_inputs)
-        return np.fmax.reduce(list(output_sets.values()))
+        fs = self._stage("fuzzification", 1, self.get_all_firing_strengths,
+                         crisp_inputs)
+        strengths = self._stage("rule_firing", 1, self._rule_strengths, fs)
+        return self._stage("aggregation", 1, self.rules.program.aggregate_set,
+                           strengths)
 
     def compute_defuzzified_output(self, crisp_inputs,
-                                   defuzzication_method="centroid"):
+                                   defuzzication_method="centroid",
+                                   engine="sampled"):
         """Computes the defuzzified output for the given crisp inputs.
 
         Args:
             crisp_inputs: dictionary containing the crisp inputs.
             defuzzication_method: method used to defuzzify the output
                 default: centroid
+            engine: 'sampled' defuzzifies the aggregate set sampled over
+                the output universe. 'exact' computes the centroid of the
+                piecewise linear aggregate set from its breakpoints, which
+                requires triangular / trapezoidal output terms and does not
+                depend on the step of the output universe.
+                default: sampled
 
         Returns:
             defuzzified output for the given crisp inputs.
 
         """
+        if self.cache is not None:
+            crisp_inputs = self.cache.quantize(crisp_inputs)
+            key = self.cache.key(crisp_inputs, defuzzication_method, engine)
+            output = self.cache.get(key)
+            if output is None:
+                output = self._compute_defuzzified_output(
+                    crisp_inputs, defuzzication_method, engine)
+                self.cache.put(key, output)
+            return output
+        return self._compute_defuzzified_output(crisp_inputs,
+                                                defuzzication_method, engine)
+
+    def _compute_defuzzified_output(self, crisp_inputs,
+                                    defuzzication_method: str,
+                                    engine: str) -> float:
+        """Computes the defuzzified output, bypassing the cache. See
+        :meth:`compute_defuzzified_output`."""
+        if engine == "exact":
+            return self._compute_exact_centroid(crisp_inputs,
+                                                defuzzication_method)
+        if engine != "sampled":
+            raise ValueError("Unknown defuzzification engine: %s" % engine)
+
         aggregate_set = self.compute_aggregate_set(crisp_inputs)
-        return fuzz.defuzz(self.variables[self.output_variable].universe,
+        return self._stage("defuzzification", 1, defuzz,
+                           self.variables[self.output_variable].universe,
                            aggregate_set, defuzzication_method)
 
+    def _compute_exact_centroid(self, crisp_inputs,
+                                defuzzication_method: str) -> float:
+        """Computes the exact centroid of the aggregate set, see
+        :func:`.exact_centroid`.
+
+        Args:
+            crisp_inputs: dictionary containing the crisp inputs.
+            defuzzication_method: must be 'centroid'.
+
+        Returns:
+            defuzzified output for the given crisp inputs.
+        """
+        if defuzzication_method != "centroid":
+            raise ValueError("The exact engine only supports centroid")
+        output = self.variables[self.output_variable]
+        program = self.rules.program
+        mfs = [output.get_term(name).mf for name in program.output_term_names]
+        if not all(isinstance(mf, PiecewiseLinearMF) for mf in mfs):
+            raise ValueError("The exact engine requires triangular or "
+                             "trapezoidal output terms")
+
+        fs = self._stage("fuzzification", 1, self.get_all_firing_strengths,
+                         crisp_inputs)
+        strengths = self._stage("rule_firing", 1, self._rule_strengths, fs)
+        return self._stage("defuzzification", 1, exact_centroid,
+                           np.array([mf.corners for mf in mfs]),
+                           program.consequent_strengths(strengths),
+                           output.universe.min(), output.universe.max())
+
+    def compute_aggregate_sets(self, batch) -> NDArray:
+        """Computes the aggregate sets for a batch of inputs.
+
+        Args:
+            batch: the batch of inputs, see
+                :meth:`get_batch_firing_strengths`.
+
+        Returns:
+            a (N x U) matrix with one aggregate set per sample, where U is
+            the size of the output universe.
+        """
+        samples = _batch_length(batch) if self.profiler is not None else 0
+        fs = self._stage("fuzzification", samples,
+                         self.get_batch_firing_strengths, batch)
+        strengths = self._stage("rule_firing", samples, self._rule_strengths,
+                                fs, samples)
+        return self._stage("aggregation", samples,
+                           self.rules.program.aggregate_sets, strengths)
+
+    def compute_defuzzified_outputs(self, batch,
+                                    defuzzication_method="centroid") \
+            -> NDArray:
+        """Computes the defuzzified outputs for a batch of inputs.
+
+        Fuzzification, rule firing, aggregation and defuzzification are
+        computed as numpy operations over the whole batch.
+
+        Args:
+            batch: the batch of inputs, see
+                :meth:`get_batch_firing_strengths`.
+            defuzzication_method: method used to defuzzify the output
+                default: centroid
+
+        Returns:
+            a numpy array with one defuzzified output per sample. Samples
+            which fire no rules are nan.
+        """
+        aggregate_sets = self.compute_aggregate_sets(batch)
+        return self._stage("defuzzification", len(aggregate_sets), defuzzify,
+                           self.variables[self.output_variable].universe,
+                           aggregate_sets, defuzzication_method)
+
     def graph_membership_functions(self):
-        """Graphs the membership functions for all the linguistic variables."""
-        fig, axs = plt.subplots(nrows=len(self.variables), figsize=(15, 5))
-        for i, (key, variable) in enumerate(self.variables.items()):
-            variable.graph(axs[i])
-            axs[i].set_title(key)
-            axs[i].legend()
-
-        for ax in axs:
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.get_xaxis().tick_bottom()
-            ax.get_yaxis().tick_left()
-
-        plt.tight_layout()
-        plt.show()
+        """Graphs the membership functions for all the linguistic variables.
+
+        Requires matplotlib, which is only imported when this is called.
+        """
+        from ..utils.plotting import graph_variables
+        graph_variables(self.variables)
+
+
+def _batch_length(batch) -> int:
+    """Returns the number of samples in a batch of inputs."""
+    if not isinstance(batch, dict):
+        return len(batch)
+    values = next(iter(batch.values()))
+    if isinstance(values, dict):
+        values = values["start"]
+    return len(np.atleast_1d(values))
@@ -0,0 +1,120 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from numpy.typing import NDArray
+import numpy as np
+
+
+class Inference():
+    """The result of one evaluation of an inference system.
+
+    Every intermediate result is held here rather than on the system, so
+    evaluations running in different threads never see each other's
+    results.
+
+    Attributes:
+        firing_strengths: firing strengths of the linguistic terms, of the
+            form {variable_name: {term_name: firing_strength}}.
+        rule_strengths: strength of each rule, keyed by rule name.
+        output_sets: output set of each rule, keyed by rule name.
+        aggregate_set: the aggregate of the output sets.
+        output: the defuzzified output.
+    """
+
+    def __init__(self, firing_strengths: dict[str, dict[str, float]],
+                 rule_strengths: dict[str, float],
+                 output_sets: dict[str, NDArray], aggregate_set: NDArray,
+                 output: float):
+        """Initializes the result of an evaluation."""
+        self.firing_strengths = firing_strengths
+        self.rule_strengths = rule_strengths
+        self.output_sets = output_sets
+        self.aggregate_set = aggregate_set
+        self.output = output
+
+
+class ThreadPoolEvaluator():
+    """Evaluates many inputs with one inference system on a pool of threads.
+
+    The evaluation of a system does not modify it, and numpy releases the
+    GIL in the heavy reductions, so the threads share one system instead of
+    each holding a copy.
+
+    Attributes:
+        fis: the inference system being evaluated.
+        chunk_size: number of samples per task for batches.
+    """
+
+    def __init__(self, fis, max_workers: int = None, chunk_size: int = 4096):
+        """Starts the thread pool.
+
+        Args:
+            fis: a loaded inference system.
+            max_workers: number of threads.
+            chunk_size: number of samples per task for batches.
+        """
+        self.fis = fis
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self) -> ThreadPoolEvaluator:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def evaluate(self, inputs: list[dict],
+                 defuzzication_method: str = "centroid") -> list[Inference]:
+        """Evaluates every input, see :meth:`.FIS.evaluate`.
+
+        Args:
+            inputs: list of input dictionaries.
+            defuzzication_method: method used to defuzzify the outputs.
+
+        Returns:
+            the results, in the order of the inputs.
+        """
+        return list(self._executor.map(
+            lambda crisp_inputs: self.fis.evaluate(crisp_inputs,
+                                                   defuzzication_method),
+            inputs))
+
+    def compute_defuzzified_outputs(self, batch,
+                                    defuzzication_method: str = "centroid") \
+            -> NDArray:
+        """Computes the defuzzified outputs of a batch, one chunk of samples
+        per task, see :meth:`.FIS.compute_defuzzified_outputs`.
+
+        Args:
+            batch: the batch of inputs, a dictionary or an array.
+            defuzzication_method: method used to defuzzify the outputs.
+
+        Returns:
+            a numpy array with one defuzzified output per sample.
+        """
+        if isinstance(batch, dict):
+            size = self.fis._batch_size(
+                {name: values["start"] if isinstance(values, dict) else values
+                 for name, values in batch.items()})
+        else:
+            size = len(batch)
+
+        def evaluate_chunk(start):
+            chunk = _slice_batch(batch, start, start + self.chunk_size)
+            return self.fis.compute_defuzzified_outputs(chunk,
+                                                        defuzzication_method)
+
+        return np.concatenate(list(self._executor.map(
+            evaluate_chunk, range(0, size, self.chunk_size)))
+            or [np.empty(0)])
+
+    def close(self):
+        """Stops the thread pool."""
+        self._executor.shutdown()
+
+
+def _slice_batch(batch, start: int, stop: int):
+    """Returns the samples [start, stop) of a batch."""
+    if not isinstance(batch, dict):
+        return batch[start:stop]
+    return {name: _slice_batch(values, start, stop)
+            for name, values in batch.items()}
@@ -0,0 +1,171 @@
+from __future__ import annotations
+from numpy.typing import NDArray
+import itertools
+import numpy as np
+
+
+class LookupTable():
+    """A control surface sampled on a grid.
+
+    The defuzzified output of a :class:`.SingletonFIS` is sampled once on a
+    grid over the universe of every input. Afterwards an output is computed
+    by multilinear interpolation between the 2^n_inputs surrounding grid
+    points, which only takes a handful of array lookups.
+
+    Attributes:
+        input_names: names of the input variables, in the order of the
+            grid axes.
+        grids: list of 1-D arrays, the grid points of each input.
+        values: n_inputs dimensional array of the sampled outputs.
+        sampled_error: the largest absolute difference between the table
+            and the inference system at the centres of the grid cells, or
+            nan if it has not been measured. It is a sample of the error,
+            not a bound: the error elsewhere in a cell can be larger.
+    """
+
+    def __init__(self, input_names: list[str], grids: list[NDArray],
+                 values: NDArray, sampled_error: float = np.nan):
+        """Initializes the lookup table.
+
+        Args:
+            input_names: names of the input variables.
+            grids: the grid points of each input, in increasing order.
+            values: the outputs sampled on the grid.
+            sampled_error: the error of the table measured at the cell
+                centres.
+        """
+        self.input_names = list(input_names)
+        self.grids = [np.asarray(grid, dtype=float) for grid in grids]
+        self.values = np.asarray(values, dtype=float)
+        self.sampled_error = float(sampled_error)
+        if self.values.shape != tuple(len(grid) for grid in self.grids):
+            raise ValueError("values do not match the shape of the grids")
+
+    @classmethod
+    def from_fis(cls, fis, points: int or dict[str, int] = 101,
+                 defuzzication_method: str = "centroid",
+                 chunk_size: int = 4096) -> LookupTable:
+        """Samples the control surface of an inference system.
+
+        The grid points and cell centres are evaluated in chunks of
+        chunk_size, so that only one chunk of aggregate sets is held in
+        memory at a time.
+
+        Args:
+            fis: the :class:`.SingletonFIS` to sample.
+            points: number of grid points per input, either one number for
+                all the inputs or a dictionary keyed by input name.
+            defuzzication_method: method used to defuzzify the output.
+            chunk_size: number of points evaluated per batch.
+
+        Returns:
+            the lookup table, with its :attr:`sampled_error` measured at
+            the centre of every grid cell.
+        """
+        if not isinstance(points, dict):
+            points = {name: points for name in fis.input_names}
+        grids = []
+        for name in fis.input_names:
+            universe = fis.variables[name].universe
+            if points[name] < 2:
+                raise ValueError("at least 2 grid points are needed per input")
+            grids.append(np.linspace(universe.min(), universe.max(),
+                                     points[name]))
+
+        values = np.concatenate([
+            fis.compute_defuzzified_outputs(chunk, defuzzication_method)
+            for chunk in _grid_chunks(grids, chunk_size)])
+        table = cls(fis.input_names, grids,
+                    values.reshape([len(grid) for grid in grids]))
+
+        sampled_error = np.nan
+        for centres in _grid_chunks([(grid[:-1] + grid[1:]) / 2
+                                     for grid in grids], chunk_size):
+            error = np.abs(table.evaluate(centres)
+                           - fis.compute_defuzzified_outputs(
+                               centres, defuzzication_method))
+            if not np.isnan(error).all():
+                sampled_error = np.fmax(sampled_error,
+                                        np.nanmax(error))
+        table.sampled_error = sampled_error
+        return table
+
+    def evaluate(self, batch: dict[str, NDArray] or NDArray) -> NDArray:
+        """Interpolates the outputs for a batch of crisp inputs.
+
+        Args:
+            batch: a dictionary of 1-D arrays keyed by input name, or a
+                (N x n_inputs) array whose columns follow
+                :attr:`input_names`.
+
+        Returns:
+            a numpy array with one output per sample.
+
+        Raises:
+            ValueError: if an input is outside the grid.
+        """
+        if isinstance(batch, dict):
+            batch = np.stack([np.asarray(batch[name], dtype=float)
+                              for name in self.input_names], axis=1)
+        batch = np.atleast_2d(np.asarray(batch, dtype=float))
+        if batch.shape[1] != len(self.grids):
+            raise ValueError("batch should be of shape (N, %d)"
+                             % len(self.grids))
+
+        indices = []
+        fractions = []
+        for grid, x in zip(self.grids, batch.T):
+            if np.any(x < grid[0]) or np.any(x > grid[-1]):
+                raise ValueError("input values are outside range of grid")
+            index = np.clip(np.searchsorted(grid, x, side='right') - 1,
+                            0, len(grid) - 2)
+            indices.append(index)
+            fractions.append((x - grid[index])
+                             / (grid[index + 1] - grid[index]))
+
+        outputs = np.zeros(len(batch))
+        for corner in itertools.product((0, 1), repeat=len(self.grids)):
+            weight = np.ones(len(batch))
+            for bit, fraction in zip(corner, fractions):
+                weight *= fraction if bit else 1 - fraction
+            outputs += weight * self.values[tuple(
+                index + bit for index, bit in zip(indices, corner))]
+        return outputs
+
+    def save(self, path: str):
+        """Saves the lookup table to a .npz file.
+
+        Args:
+            path: path of the file.
+        """
+        np.savez(path, input_names=np.array(self.input_names),
+                 values=self.values, sampled_error=self.sampled_error,
+                 **{f"grid_{i}": grid for i, grid in enumerate(self.grids)})
+
+    @classmethod
+    def load(cls, path: str) -> LookupTable:
+        """Loads a lookup table saved with :meth:`save`.
+
+        Args:
+            path: path of the file.
+
+        Returns:
+            the lookup table.
+        """
+        with np.load(path) as data:
+            input_names = [str(name) for name in data["input_names"]]
+            grids = [data[f"grid_{i}"] for i in range(len(input_names))]
+            return cls(input_names, grids, data["values"],
+                       float(data["sampled_error"]))
+
+
+def _grid_chunks(grids: list[NDArray], chunk_size: int):
+    """Yields the points of a grid, in C order, as the rows of
+    (chunk_size x n_dims) arrays. The last chunk may be smaller."""
+    shape = tuple(len(grid) for grid in grids)
+    size = int(np.prod(shape))
+    for start in range(0, size, chunk_size):
+        indices = np.unravel_index(
+            np.arange(start, min(start + chunk_size, size)), shape)
+        yield np.stack([grid[index] for grid, index in zip(grids, indices)],
+                       axis=1)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from .fis import FIS
-from ..membership.membership_functions import GauAngleMF
+from ..membership.membership_functions import GauAngleMF, gauangle_matrix
+from numpy.typing import NDArray
+import numpy as np
 
 
 class NonSingletonFIS(FIS):
@@ -38,3 +40,58 @@ class NonSingletonFIS(FIS):
 
         return {key: self.variables[key].compute_memberships(
                 input_sets[key], self.type) for key in inputs.keys()}
+
+    def create_batch_input_sets(self, var_name: str, starts: NDArray,
+                                ends: NDArray) -> NDArray:
+        """Creates the input fuzzy sets of a batch of intervals of one
+        variable, in one pass. Row i is equal to the mf of the set created
+        by :meth:`create_input_sets` for the interval (starts[i], ends[i]).
+
+        Args:
+            var_name: name of the input variable.
+            starts: (N,) array of the interval starts.
+            ends: (N,) array of the interval ends.
+
+        Returns:
+            a (N x U) matrix of input fuzzy sets.
+        """
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        return gauangle_matrix(self.variables[var_name].universe,
+                               (starts + ends) / 2, (ends - starts) / 4,
+                               starts, ends)
+
+    def get_batch_firing_strengths(self, batch: dict[str, dict[str, NDArray]]
+                                   or NDArray) \
+            -> dict[str, dict[str, NDArray]]:
+        """Computes the firing strength of all the linguistic terms for a
+        batch of interval inputs.
+
+        The batch is either a dictionary of the form {'input1': {'start':
+        NDArray, 'end': NDArray}, ...}, or a (N x n_inputs x 2) array of
+        (start, end) pairs whose second axis follows the order of
+        :attr:`input_names`.
+
+        Args:
+            batch: the batch of interval inputs.
+
+        Returns:
+            dictionary containing the firing strengths of all the linguistic
+            terms. Will be of the form {'input1': {'term1': NDArray, ...},
+            'input2': ...}, with one firing strength per sample.
+        """
+        if not isinstance(batch, dict):
+            batch = np.asarray(batch, dtype=float)
+            if batch.ndim != 3 or batch.shape[1:] != (len(self.input_names),
+                                                      2):
+                raise ValueError("batch should be of shape (N, %d, 2)"
+                                 % len(self.input_names))
+            batch = {name: {"start": batch[:, i, 0], "end": batch[:, i, 1]}
+                     for i, name in enumerate(self.input_names)}
+        self._batch_size({key: interval["start"]
+                          for key, interval in batch.items()})
+
+        return {key: self.variables[key].compute_memberships(
+                self.create_batch_input_sets(key, interval["start"],
+                                             interval["end"]), self.type)
+                for key, interval in batch.items()}
@@ -0,0 +1,206 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from .singleton import SingletonFIS
+from numpy.typing import NDArray
+import numpy as np
+
+_ALIGNMENT = 64
+
+# State of a worker process, set by _init_worker.
+_worker = {}
+
+
+class SharedTables():
+    """Named numpy arrays packed into one block of shared memory.
+
+    The arrays are copied into shared memory once by :meth:`create`. Other
+    processes :meth:`attach` to the block from its picklable descriptor and
+    get zero-copy views of the arrays.
+
+    Attributes:
+        shm: the SharedMemory block.
+        descriptor: (block name, [(array name, dtype, shape, offset)]).
+        arrays: dictionary of views of the arrays, keyed by name.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: list):
+        """Wraps a block of shared memory.
+
+        Args:
+            shm: the SharedMemory block.
+            layout: list of (array name, dtype, shape, offset).
+        """
+        self.shm = shm
+        self.descriptor = (shm.name, layout)
+        self.arrays = {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf,
+                                        offset=offset)
+                       for name, dtype, shape, offset in layout}
+
+    @classmethod
+    def create(cls, arrays: dict[str, NDArray]) -> SharedTables:
+        """Copies arrays into a new block of shared memory.
+
+        Args:
+            arrays: dictionary of arrays, keyed by name.
+
+        Returns:
+            the shared tables.
+        """
+        layout = []
+        size = 0
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            layout.append((name, array.dtype.str, array.shape, size))
+            size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        tables = cls(shm, layout)
+        for name, array in arrays.items():
+            tables.arrays[name][...] = array
+        return tables
+
+    @classmethod
+    def attach(cls, descriptor: tuple) -> SharedTables:
+        """Attaches to shared tables created by another process.
+
+        Args:
+            descriptor: the descriptor of the shared tables.
+
+        Returns:
+            the shared tables.
+        """
+        name, layout = descriptor
+        return cls(shared_memory.SharedMemory(name=name), layout)
+
+    def close(self, unlink: bool = False):
+        """Releases the views and closes the block.
+
+        Args:
+            unlink: also free the block. Only its creator should do this.
+        """
+        self.arrays = {}
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _init_worker(fis_class: type, model_data: dict, program: dict,
+                 descriptor: tuple):
+    """Loads the inference system of a worker process directly from the
+    shared model tables, without building the universes, membership
+    functions or rules again."""
+    tables = SharedTables.attach(descriptor)
+    fis = fis_class()
+    fis.load_dict(model_data, tables=tables.arrays, program=program)
+    _worker["fis"] = fis
+    _worker["tables"] = tables
+
+
+def _evaluate_shard(io_descriptor: tuple, start: int, stop: int,
+                    defuzzication_method: str) -> int:
+    """Evaluates rows [start, stop) of the shared input buffer into the
+    shared output buffer.
+
+    Returns:
+        the number of rows evaluated.
+    """
+    buffers = SharedTables.attach(io_descriptor)
+    try:
+        buffers.arrays["outputs"][start:stop] = \
+            _worker["fis"].compute_defuzzified_outputs(
+                buffers.arrays["inputs"][start:stop], defuzzication_method)
+    finally:
+        buffers.close()
+    return stop - start
+
+
+class ParallelEvaluator():
+    """Evaluates large batches on a pool of processes.
+
+    The arrays of the loaded model (universes, term matrices and compiled
+    rules) are placed in shared memory once, and every worker loads the
+    model from them, in the dtype of the parent, instead of building its
+    own copy. For each batch, the inputs are copied into a shared buffer,
+    workers evaluate shards of it and write their results into a shared
+    output buffer, so only shard bounds are sent to the workers.
+
+    Attributes:
+        fis: the inference system being evaluated.
+        shard_size: number of rows evaluated per task.
+    """
+
+    def __init__(self, fis, max_workers: int = None,
+                 shard_size: int = 16384, mp_context=None):
+        """Starts the worker processes.
+
+        Args:
+            fis: a loaded :class:`.SingletonFIS`, :class:`.TSKFIS` or
+                :class:`.NonSingletonFIS`.
+            max_workers: number of worker processes, defaults to the
+                number of processors.
+            shard_size: number of rows evaluated per task.
+            mp_context: multiprocessing context used to start the workers.
+        """
+        self.fis = fis
+        self.shard_size = shard_size
+        self._tables = SharedTables.create(fis.tables())
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(type(fis), dict(fis.model_data, dtype=fis.dtype.name),
+                      fis.rules.program.metadata(),
+                      self._tables.descriptor))
+
+    def __enter__(self) -> ParallelEvaluator:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _as_array(self, batch) -> NDArray:
+        """Converts a batch into the array form of
+        :meth:`.FIS.get_batch_firing_strengths`."""
+        if not isinstance(batch, dict):
+            return np.asarray(batch, dtype=float)
+        names = self.fis.input_names
+        if isinstance(self.fis, SingletonFIS):
+            return np.stack([np.asarray(batch[name], dtype=float)
+                             for name in names], axis=1)
+        return np.stack([np.stack([np.asarray(batch[name][key], dtype=float)
+                                   for key in ("start", "end")], axis=1)
+                         for name in names], axis=1)
+
+    def compute_defuzzified_outputs(self, batch,
+                                    defuzzication_method="centroid") \
+            -> NDArray:
+        """Computes the defuzzified outputs of a batch on the worker
+        processes.
+
+        Args:
+            batch: the batch of inputs, in any format accepted by
+                :meth:`.FIS.compute_defuzzified_outputs`.
+            defuzzication_method: method used to defuzzify the output
+                default: centroid
+
+        Returns:
+            a numpy array with one defuzzified output per sample.
+        """
+        inputs = self._as_array(batch)
+        buffers = SharedTables.create(
+            {"inputs": inputs, "outputs": np.empty(len(inputs))})
+        try:
+            futures = [self._executor.submit(
+                _evaluate_shard, buffers.descriptor, start,
+                min(start + self.shard_size, len(inputs)),
+                defuzzication_method)
+                for start in range(0, len(inputs), self.shard_size)]
+            for future in futures:
+                future.result()
+            return buffers.arrays["outputs"].copy()
+        finally:
+            buffers.close(unlink=True)
+
+    def close(self):
+        """Stops the worker processes and frees the shared model tables."""
+        self._executor.shutdown()
+        self._tables.close(unlink=True)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+from .defuzzification import defuzz
+from numpy.typing import NDArray
+import numpy as np
+
+
+class InferenceSession():
+    """Evaluates a stream of inputs of which only a few change at a time.
+
+    The session keeps the firing strengths, rule strengths and aggregate set
+    of the last evaluation. On every update, only the variables whose input
+    changed are fuzzified again, only the rules depending on them (found
+    with :meth:`.Rules.dependency_index`) are evaluated again, and the
+    aggregate set is only rebuilt over the supports of the consequent terms
+    whose strength changed. The affected rules are evaluated with the
+    compiled :class:`.RuleProgram`. The results are equal to a full
+    evaluation.
+
+    A session holds state, so unlike the system it should not be shared
+    between threads.
+
+    Attributes:
+        fis: the inference system being evaluated.
+        defuzzication_method: method used to defuzzify the output.
+        inputs: the current inputs, keyed by variable name.
+        firing_strengths: firing strengths of the current inputs, of the
+            form {variable_name: {term_name: firing_strength}}.
+        rule_strengths: (R,) array of the strength of each rule, in the
+            order of :attr:`.RuleProgram.rule_names`.
+        term_strengths: (T,) array of the strength of each consequent term.
+        aggregate_set: the aggregate set of the current inputs.
+        output: the defuzzified output of the current inputs.
+        dependencies: dictionary mapping an input variable name to the
+            positions of the rules which depend on it.
+        last_update: counters of the last update, of the form
+            {'variables': int, 'rules': int, 'terms': int}, the number of
+            variables, rules and consequent terms which were recomputed.
+    """
+
+    def __init__(self, fis, crisp_inputs: dict,
+                 defuzzication_method: str = "centroid"):
+        """Evaluates the initial inputs.
+
+        Args:
+            fis: a loaded inference system.
+            crisp_inputs: dictionary containing a crisp input for every
+                input variable.
+            defuzzication_method: method used to defuzzify the output.
+        """
+        self.fis = fis
+        self.defuzzication_method = defuzzication_method
+        program = fis.rules.program
+        position = {name: i for i, name in enumerate(program.rule_names)}
+        self.dependencies = {
+            name: np.array([position[rule] for rule in rules], dtype=int)
+            for name, rules in fis.rules.dependency_index().items()}
+
+        self.inputs = dict(crisp_inputs)
+        self.firing_strengths = fis._stage(
+            "fuzzification", 1, fis.get_all_firing_strengths, self.inputs)
+        self.rule_strengths = fis._stage("rule_firing", 1,
+                                         fis._rule_strengths,
+                                         self.firing_strengths)
+        self.term_strengths = program.consequent_strengths(
+            self.rule_strengths)
+        self.aggregate_set = fis._stage("aggregation", 1,
+                                        program.aggregate_set,
+                                        self.rule_strengths)
+        self.output = self._defuzzify(self.aggregate_set)
+        self.last_update = {"variables": len(self.inputs),
+                            "rules": len(self.rule_strengths),
+                            "terms": len(self.term_strengths)}
+
+    def update(self, crisp_inputs: dict) -> float:
+        """Changes some of the inputs and evaluates the system again.
+
+        The new state is only kept once it has been fully computed: if an
+        input is rejected, e.g. because it is outside its universe, the
+        error is raised and the session keeps its previous inputs and
+        output.
+
+        Args:
+            crisp_inputs: dictionary of the new crisp inputs, keyed by
+                variable name. Inputs which are missing or equal to their
+                current value are not recomputed.
+
+        Returns:
+            the defuzzified output for the current inputs.
+        """
+        changed = {name: value for name, value in crisp_inputs.items()
+                   if not _equal(self.inputs[name], value)}
+        last_update = {"variables": len(changed), "rules": 0, "terms": 0}
+        if not changed:
+            self.last_update = last_update
+            return self.output
+
+        fis = self.fis
+        program = fis.rules.program
+        firing_strengths = dict(self.firing_strengths)
+        firing_strengths.update(fis._stage(
+            "fuzzification", 1, fis.get_all_firing_strengths, changed))
+        rules = np.unique(np.concatenate(
+            [self.dependencies.get(name, np.empty(0, dtype=int))
+             for name in changed]))
+        last_update["rules"] = len(rules)
+
+        rule_strengths = self.rule_strengths
+        term_strengths = self.term_strengths
+        aggregate_set = self.aggregate_set
+        output = self.output
+        if len(rules):
+            rule_strengths = rule_strengths.copy()
+            rule_strengths[rules] = fis._stage(
+                "rule_firing", 1, self._evaluate_rules, firing_strengths,
+                rules)
+            term_strengths = program.consequent_strengths(rule_strengths)
+            terms = np.flatnonzero(term_strengths != self.term_strengths)
+            last_update["terms"] = len(terms)
+            if len(terms):
+                aggregate_set = aggregate_set.copy()
+                fis._stage("aggregation", 1, self._update_aggregate_set,
+                           aggregate_set, term_strengths, terms)
+                output = self._defuzzify(aggregate_set)
+
+        self.inputs.update(changed)
+        self.firing_strengths = firing_strengths
+        self.rule_strengths = rule_strengths
+        self.term_strengths = term_strengths
+        self.aggregate_set = aggregate_set
+        self.output = output
+        self.last_update = last_update
+        return output
+
+    def _evaluate_rules(self, firing_strengths: dict, rules: NDArray) \
+            -> NDArray:
+        """Evaluates the strengths of some rules with the compiled rule
+        program, see :meth:`.RuleProgram.evaluate_rules`.
+
+        Args:
+            firing_strengths: firing strengths of the inputs.
+            rules: positions of the rules.
+
+        Returns:
+            the strengths of the rules.
+        """
+        program = self.fis.rules.program
+        if self.fis.profiler is not None:
+            self.fis.profiler.count_rules(
+                [program.rule_names[i] for i in rules])
+        return program.evaluate_rules(
+            program.membership_vector(firing_strengths), rules)
+
+    def _update_aggregate_set(self, aggregate_set: NDArray,
+                              term_strengths: NDArray, terms: NDArray):
+        """Rebuilds an aggregate set over the supports of some consequent
+        terms. Within a support, the aggregate set is the fmax of every
+        firing consequent term which overlaps it, clipped at its strength.
+
+        Args:
+            aggregate_set: the aggregate set to update, in place.
+            term_strengths: the strength of every consequent term.
+            terms: rows of the output membership functions whose strength
+                changed.
+        """
+        program = self.fis.rules.program
+        supports = program.output_supports
+        strengths = term_strengths.astype(program.output_mfs.dtype)
+        firing = np.flatnonzero(strengths)
+        for start, stop in supports[terms]:
+            region = aggregate_set[start:stop]
+            region[:] = 0
+            for term in firing:
+                lo = max(supports[term, 0], start)
+                hi = min(supports[term, 1], stop)
+                if lo < hi:
+                    np.fmax(aggregate_set[lo:hi],
+                            np.fmin(program.output_mfs[term, lo:hi],
+                                    strengths[term]),
+                            out=aggregate_set[lo:hi])
+
+    def _defuzzify(self, aggregate_set: NDArray) -> float:
+        """Defuzzifies an aggregate set."""
+        return self.fis._stage(
+            "defuzzification", 1, defuzz,
+            self.fis.variables[self.fis.output_variable].universe,
+            aggregate_set, self.defuzzication_method)
+
+
+def _equal(old, new) -> bool:
+    """True if an input has not changed. Non-singleton inputs are
+    dictionaries of the interval bounds."""
+    try:
+        return bool(old == new)
+    except ValueError:
+        return False
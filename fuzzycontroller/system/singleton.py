@@ -1,5 +1,8 @@
 from __future__ import annotations
 from .fis import FIS
+from .lut import LookupTable
+from numpy.typing import NDArray
+import numpy as np
 
 
 class SingletonFIS(FIS):
@@ -37,7 +40,66 @@ class SingletonFIS(FIS):
 
         """
         return {key: self.variables[key].compute_memberships(
-                crisp_inputs[key], self.type)
+                crisp_inputs[key], "singleton")
                 for key in crisp_inputs.keys()}
 
+    def get_batch_firing_strengths(self,
+                                   batch: dict[str, NDArray] or NDArray) \
+            -> dict[str, dict[str, NDArray]]:
+        """Computes the firing strength of all the linguistic terms for a
+        batch of crisp inputs.
 
+        The batch is either a dictionary of 1-D arrays, of the form
+        {'input1': np.array([1.0, 2.0]), 'input2': np.array([3.0, 4.0])},
+        or a (N x n_inputs) array whose columns follow the order of
+        :attr:`input_names`.
+
+        Args:
+            batch: the batch of crisp inputs.
+
+        Returns:
+            dictionary containing the firing strengths of all the linguistic
+            terms. Will be of the form {'input1': {'term1': NDArray, ...},
+            'input2': ...}, with one firing strength per sample.
+        """
+        return {key: self.variables[key].compute_memberships(
+                values, "singleton")
+                for key, values in self._batch_inputs(batch).items()}
+
+    def _batch_inputs(self, batch: dict[str, NDArray] or NDArray) \
+            -> dict[str, NDArray]:
+        """Converts a batch, in either format accepted by
+        :meth:`get_batch_firing_strengths`, into a dictionary of 1-D float
+        arrays keyed by input name.
+
+        Raises:
+            ValueError: if the batch has the wrong shape or its inputs have
+                different lengths.
+        """
+        if not isinstance(batch, dict):
+            batch = np.asarray(batch, dtype=float)
+            if batch.ndim != 2 or batch.shape[1] != len(self.input_names):
+                raise ValueError("batch should be of shape (N, %d)"
+                                 % len(self.input_names))
+            batch = dict(zip(self.input_names, batch.T))
+        self._batch_size(batch)
+        return {key: np.asarray(values, dtype=float)
+                for key, values in batch.items()}
+
+    def compile_lookup_table(self, points: int or dict[str, int] = 101,
+                             defuzzication_method: str = "centroid",
+                             chunk_size: int = 4096) -> LookupTable:
+        """Samples the whole input to output surface of this system into a
+        :class:`.LookupTable`.
+
+        Args:
+            points: number of grid points per input, either one number for
+                all the inputs or a dictionary keyed by input name.
+            defuzzication_method: method used to defuzzify the output.
+            chunk_size: number of points evaluated per batch.
+
+        Returns:
+            the lookup table.
+        """
+        return LookupTable.from_fis(self, points, defuzzication_method,
+                                    chunk_size)
@@ -0,0 +1,69 @@
+from ..singleton import SingletonFIS
+from ..nonsingleton import NonSingletonFIS
+from ..compiled import load_compiled
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    sfis = SingletonFIS()
+    sfis.load_data("fuzzycontroller/system/tests/data.json")
+    path = str(tmp_path / "model.fzc")
+    sfis.save_compiled(path)
+    yield sfis, path
+
+
+def test_round_trip(compiled):
+    sfis, path = compiled
+    loaded = SingletonFIS()
+    loaded.load_compiled(path)
+    inputs = {"temperature": 34.0, "headache": 4.0, "age": 65.0}
+    assert loaded.compute_defuzzified_output(inputs) == 93.34755751076897
+    assert loaded.compute_defuzzified_output(inputs, engine="exact") == \
+        sfis.compute_defuzzified_output(inputs, engine="exact")
+    batch = {name: np.linspace(1, 9, 17) for name in sfis.input_names}
+    assert np.array_equal(loaded.compute_defuzzified_outputs(batch),
+                          sfis.compute_defuzzified_outputs(batch),
+                          equal_nan=True)
+    assert loaded.rules.program.term_index == sfis.rules.program.term_index
+
+
+def test_arrays_are_memory_mapped(compiled):
+    _, path = compiled
+    loaded = SingletonFIS()
+    loaded.load_compiled(path)
+    variable = loaded.variables["temperature"]
+    assert isinstance(variable.term_matrix.base, np.memmap)
+    assert not variable.term_matrix.flags.writeable
+    assert variable.term_matrix.ctypes.data % 64 == 0
+    assert np.shares_memory(variable.terms["cold"].mf.mf,
+                            variable.term_matrix)
+
+
+def test_nonsingleton_and_without_mmap(compiled):
+    _, path = compiled
+    nsfis = NonSingletonFIS()
+    nsfis.load_data("fuzzycontroller/system/tests/data.json")
+    loaded = NonSingletonFIS()
+    loaded.load_compiled(path, mmap=False)
+    inputs = {"temperature": {"start": 36.5, "end": 38},
+              "headache": {"start": 3, "end": 4},
+              "age": {"start": 10, "end": 15}}
+    assert loaded.compute_defuzzified_output(inputs) == \
+        nsfis.compute_defuzzified_output(inputs)
+
+
+def test_invalid_files(tmp_path, compiled):
+    _, path = compiled
+    not_compiled = tmp_path / "model.json"
+    not_compiled.write_text("{}")
+    with pytest.raises(ValueError):
+        load_compiled(str(not_compiled))
+
+    data = bytearray(open(path, "rb").read())
+    data[8] = 99
+    newer = tmp_path / "newer.fzc"
+    newer.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version"):
+        load_compiled(str(newer))
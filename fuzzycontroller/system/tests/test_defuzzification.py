@@ -0,0 +1,81 @@
+from ..defuzzification import bisectors, centroids, defuzzify, \
+    exact_centroid, maxima
+import numpy as np
+import pytest
+import skfuzzy as fuzz
+
+
+def test_centroids():
+    universe = np.arange(0, 100, 0.1)
+    aggregate_sets = np.array([fuzz.trapmf(universe, [0, 10, 20, 30]),
+                               fuzz.trimf(universe, [40, 65, 70])])
+    expected = [fuzz.defuzz(universe, mf, 'centroid')
+                for mf in aggregate_sets]
+    assert np.allclose(centroids(universe, aggregate_sets), expected)
+
+
+def test_centroids_empty_set():
+    universe = np.arange(0, 10, 1)
+    assert np.isnan(centroids(universe, np.zeros((1, 10)))[0])
+
+
+def test_defuzzify_other_method():
+    universe = np.arange(0, 100, 0.1)
+    aggregate_sets = np.array([fuzz.trapmf(universe, [0, 10, 20, 30])])
+    assert defuzzify(universe, aggregate_sets, 'mom')[0] == \
+        fuzz.defuzz(universe, aggregate_sets[0], 'mom')
+
+
+@pytest.fixture
+def aggregate_sets():
+    universe = np.arange(0, 100, 0.1)
+    rng = np.random.default_rng(0)
+    sets = []
+    for _ in range(40):
+        corners = np.sort(rng.uniform(0, 100, (3, 4)), axis=1)
+        levels = rng.choice([0.2, 0.5, 1.0, rng.uniform()], 3)
+        sets.append(np.fmax.reduce([np.fmin(fuzz.trapmf(universe, c), s)
+                                    for c, s in zip(corners, levels)]))
+    yield universe, np.array(sets)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_bisectors_match_skfuzzy(aggregate_sets, dtype):
+    universe, sets = aggregate_sets
+    sets = sets.astype(dtype)
+    expected = [fuzz.defuzz(universe, mf, 'bisector') for mf in sets]
+    assert np.array_equal(bisectors(universe, sets), expected)
+    assert np.isnan(bisectors(universe, np.zeros((1, len(universe))))[0])
+
+
+@pytest.mark.parametrize("method", ["mom", "som", "lom"])
+def test_maxima_match_skfuzzy(aggregate_sets, method):
+    universe, sets = aggregate_sets
+    expected = [fuzz.defuzz(universe, mf, method) for mf in sets]
+    assert np.allclose(maxima(universe, sets, method), expected,
+                       rtol=1e-12)
+    assert np.allclose(defuzzify(universe, sets, method), expected,
+                       rtol=1e-12)
+
+
+def test_exact_centroid_matches_fine_sampling():
+    corners = np.array([[0, 10, 20, 30], [25, 30, 55, 65], [85, 95, 100, 100],
+                        [0, 0, 0, 5]])
+    strengths = np.array([0.8, 0.35, 0.6, 0.2])
+    universe = np.linspace(0, 100, 400001)
+    aggregate_set = np.fmax.reduce([np.fmin(fuzz.trapmf(universe, c), s)
+                                    for c, s in zip(corners, strengths)])
+    expected = fuzz.defuzz(universe, aggregate_set, 'centroid')
+    actual = exact_centroid(corners, strengths, 0, 100)
+    assert np.isclose(actual, expected, atol=1e-6)
+
+
+def test_exact_centroid_symmetric():
+    corners = np.array([[0, 10, 10, 20], [10, 20, 20, 30]])
+    assert np.isclose(exact_centroid(corners, np.array([0.5, 0.5]), 0, 30),
+                      15)
+
+
+def test_exact_centroid_empty():
+    with pytest.raises(ValueError):
+        exact_centroid(np.array([[0, 1, 2, 3]]), np.array([0.0]), 0, 10)
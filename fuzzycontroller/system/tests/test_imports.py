@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+
+def _imported_modules(module: str) -> set:
+    script = f"import sys, {module}; print(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script],
+                            capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_singleton_import_is_cheap():
+    modules = _imported_modules("fuzzycontroller.system.singleton")
+    assert "matplotlib" not in modules
+    assert "skfuzzy" not in modules
+
+
+def test_nonsingleton_import_is_cheap():
+    modules = _imported_modules("fuzzycontroller.system.nonsingleton")
+    assert "matplotlib" not in modules
+    assert "skfuzzy" not in modules
+
+
+def test_tsk_import_is_cheap():
+    modules = _imported_modules("fuzzycontroller.system.tsk")
+    assert "matplotlib" not in modules
+    assert "skfuzzy" not in modules
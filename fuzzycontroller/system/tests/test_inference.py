@@ -0,0 +1,58 @@
+from ..singleton import SingletonFIS
+from ..nonsingleton import NonSingletonFIS
+from ..inference import ThreadPoolEvaluator
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def sfis():
+    sfis = SingletonFIS()
+    sfis.load_data("fuzzycontroller/system/tests/data.json")
+    yield sfis
+
+
+def test_evaluate(sfis):
+    inputs = {"temperature": 34.0, "headache": 4, "age": 65}
+    result = sfis.evaluate(inputs)
+    assert result.output == sfis.compute_defuzzified_output(inputs)
+    assert result.firing_strengths["temperature"]["very_cold"] > 0
+    assert set(result.rule_strengths) == set(sfis.rules.rules)
+    assert np.array_equal(result.aggregate_set,
+                          sfis.compute_aggregate_set(inputs))
+    for name, output_set in sfis.compute_output_sets(inputs).items():
+        assert np.array_equal(result.output_sets[name], output_set)
+
+
+def test_evaluate_does_not_store_results(sfis):
+    sfis.evaluate({"temperature": 34.0, "headache": 4, "age": 65})
+    sfis.compute_output_sets({"temperature": 34.0, "headache": 4, "age": 65})
+    with pytest.raises(AttributeError):
+        sfis.rules.output_sets
+
+
+def test_thread_pool_evaluate(sfis):
+    rng = np.random.default_rng(0)
+    inputs = [{"temperature": float(t), "headache": float(h),
+               "age": float(a)}
+              for t, h, a in zip(rng.uniform(38, 41, 50),
+                                 rng.uniform(0, 10, 50),
+                                 rng.uniform(0, 100, 50))]
+    with ThreadPoolEvaluator(sfis, max_workers=4) as evaluator:
+        results = evaluator.evaluate(inputs)
+    assert [result.output for result in results] == \
+        [sfis.compute_defuzzified_output(i) for i in inputs]
+
+
+def test_thread_pool_batches():
+    nsfis = NonSingletonFIS()
+    nsfis.load_data("fuzzycontroller/system/tests/data.json")
+    starts = np.linspace(0, 5, 30)
+    batch = {name: {"start": starts + 30 * (name == "temperature"),
+                    "end": starts + 1 + 30 * (name == "temperature")}
+             for name in nsfis.input_names}
+    with ThreadPoolEvaluator(nsfis, max_workers=3,
+                             chunk_size=7) as evaluator:
+        outputs = evaluator.compute_defuzzified_outputs(batch)
+    assert np.allclose(outputs, nsfis.compute_defuzzified_outputs(batch),
+                       equal_nan=True)
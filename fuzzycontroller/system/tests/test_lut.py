@@ -0,0 +1,60 @@
+from ..singleton import SingletonFIS
+from ..lut import LookupTable
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def table():
+    sfis = SingletonFIS()
+    sfis.load_data("fuzzycontroller/system/tests/smaller_data.json")
+    yield sfis, sfis.compile_lookup_table({"temperature": 31, "headache": 11})
+
+
+def test_compile_lookup_table_shape(table):
+    sfis, lut = table
+    assert lut.input_names == ["temperature", "headache"]
+    assert lut.values.shape == (31, 11)
+    assert lut.sampled_error >= 0
+
+
+def test_chunk_size_does_not_change_table(table):
+    sfis, lut = table
+    chunked = sfis.compile_lookup_table({"temperature": 31, "headache": 11},
+                                        chunk_size=7)
+    assert np.array_equal(chunked.values, lut.values, equal_nan=True)
+    assert chunked.sampled_error == lut.sampled_error
+
+
+def test_evaluate_on_grid_points(table):
+    sfis, lut = table
+    batch = np.array([[lut.grids[0][12], lut.grids[1][5]],
+                      [lut.grids[0][20], lut.grids[1][3]]])
+    assert np.allclose(lut.evaluate(batch),
+                       sfis.compute_defuzzified_outputs(batch),
+                       equal_nan=True)
+
+
+def test_evaluate_interpolates_linearly():
+    lut = LookupTable(["x", "y"], [np.array([0.0, 1.0]), np.array([0.0, 2.0])],
+                      np.array([[0.0, 2.0], [1.0, 3.0]]))
+    assert np.allclose(lut.evaluate({"x": np.array([0.5, 1.0]),
+                                     "y": np.array([1.0, 2.0])}),
+                       [1.5, 3.0])
+
+
+def test_evaluate_outside_grid(table):
+    sfis, lut = table
+    with pytest.raises(ValueError):
+        lut.evaluate(np.array([[70.0, 5.0]]))
+
+
+def test_save_and_load(table, tmp_path):
+    sfis, lut = table
+    path = tmp_path / "lut.npz"
+    lut.save(path)
+    loaded = LookupTable.load(path)
+    assert loaded.input_names == lut.input_names
+    assert loaded.sampled_error == lut.sampled_error
+    assert np.array_equal(loaded.values, lut.values, equal_nan=True)
+    assert all(np.array_equal(a, b) for a, b in zip(loaded.grids, lut.grids))
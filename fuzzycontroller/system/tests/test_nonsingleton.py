@@ -62,3 +62,54 @@ def test_defuzzified_output(nsfis):
               "age": {"start": 10, "end": 15}}
     output = nsfis.compute_defuzzified_output(inputs)
     assert round(output, 5) == 35.44026
+
+
+def test_create_batch_input_sets(nsfis):
+    input_sets = nsfis.create_batch_input_sets("temperature",
+                                               np.array([34, 38]),
+                                               np.array([36.5, 40]))
+    expected = nsfis.create_input_sets(
+        {"temperature": {"start": 38, "end": 40}})["temperature"]
+    assert input_sets.shape == (2, len(expected.universe))
+    assert np.array_equal(input_sets[1], expected.mf)
+
+
+def test_get_batch_firing_strengths(nsfis):
+    batch = {"temperature": {"start": np.array([34, 38]),
+                             "end": np.array([36.5, 40])}}
+    fs = nsfis.get_batch_firing_strengths(batch)
+    single = nsfis.get_all_firing_strengths(
+        {"temperature": {"start": 34, "end": 36.5}})
+    for term, value in single["temperature"].items():
+        assert fs["temperature"][term][0] == value
+
+
+def test_compute_defuzzified_outputs(nsfis):
+    batch = np.array([[[36.5, 38], [3, 4], [10, 15]],
+                      [[38, 40], [5, 7], [40, 50]]])
+    outputs = nsfis.compute_defuzzified_outputs(batch)
+    assert round(outputs[0], 5) == 35.44026
+    assert np.isclose(outputs[1], nsfis.compute_defuzzified_output(
+        {"temperature": {"start": 38, "end": 40},
+         "headache": {"start": 5, "end": 7},
+         "age": {"start": 40, "end": 50}}))
+
+
+def test_compute_defuzzified_outputs_wrong_shape(nsfis):
+    with pytest.raises(ValueError):
+        nsfis.compute_defuzzified_outputs(np.array([[36.5, 38]]))
+
+
+def test_float32_outputs(nsfis):
+    reduced = NonSingletonFIS()
+    reduced.load_data("fuzzycontroller/system/tests/data.json",
+                      dtype="float32")
+    batch = np.array([[[36.5, 38], [3, 4], [10, 15]],
+                      [[38, 40], [5, 7], [40, 50]]])
+    outputs = reduced.compute_defuzzified_outputs(batch)
+    assert np.allclose(outputs, nsfis.compute_defuzzified_outputs(batch),
+                       rtol=1e-6)
+    assert np.isclose(outputs[0], reduced.compute_defuzzified_output(
+        {"temperature": {"start": 36.5, "end": 38},
+         "headache": {"start": 3, "end": 4},
+         "age": {"start": 10, "end": 15}}))
@@ -0,0 +1,69 @@
+from ..singleton import SingletonFIS
+from ..nonsingleton import NonSingletonFIS
+from ..tsk import TSKFIS
+from ..parallel import ParallelEvaluator, SharedTables
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(0)
+    yield np.stack([rng.uniform(30, 45, 300), rng.uniform(0, 10, 300),
+                    rng.uniform(0, 100, 300)], axis=1)
+
+
+def test_shared_tables_round_trip():
+    arrays = {"a": np.arange(5.0), "b": np.array([[True, False]]),
+              "c": np.arange(3)}
+    tables = SharedTables.create(arrays)
+    attached = SharedTables.attach(tables.descriptor)
+    for name, array in arrays.items():
+        assert np.array_equal(attached.arrays[name], array)
+    attached.arrays["a"][0] = 10
+    assert tables.arrays["a"][0] == 10
+    attached.close()
+    tables.close(unlink=True)
+
+
+def test_parallel_singleton(batch):
+    sfis = SingletonFIS()
+    sfis.load_data("fuzzycontroller/system/tests/data.json")
+    with ParallelEvaluator(sfis, max_workers=2, shard_size=64) as evaluator:
+        outputs = evaluator.compute_defuzzified_outputs(batch)
+    assert np.allclose(outputs, sfis.compute_defuzzified_outputs(batch),
+                       equal_nan=True)
+
+
+def test_parallel_tsk(batch):
+    tsk = TSKFIS()
+    tsk.load_data("fuzzycontroller/system/tests/tsk_data.json")
+    inputs = dict(zip(tsk.input_names, batch.T))
+    with ParallelEvaluator(tsk, max_workers=2, shard_size=64) as evaluator:
+        outputs = evaluator.compute_defuzzified_outputs(inputs)
+    assert np.array_equal(outputs, tsk.compute_outputs(batch),
+                          equal_nan=True)
+
+
+def test_parallel_nonsingleton(batch):
+    nsfis = NonSingletonFIS()
+    nsfis.load_data("fuzzycontroller/system/tests/data.json")
+    intervals = {name: {"start": batch[:20, i], "end": batch[:20, i] + 1}
+                 for i, name in enumerate(nsfis.input_names)}
+    with ParallelEvaluator(nsfis, max_workers=2, shard_size=8) as evaluator:
+        outputs = evaluator.compute_defuzzified_outputs(intervals)
+    assert np.allclose(outputs, nsfis.compute_defuzzified_outputs(intervals),
+                       equal_nan=True)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_parallel_matches_serial_with_dtype_override(batch, dtype):
+    nsfis = NonSingletonFIS()
+    nsfis.load_data("fuzzycontroller/system/tests/data.json", dtype=dtype)
+    intervals = {name: {"start": batch[:200, i], "end": batch[:200, i] + 1}
+                 for i, name in enumerate(nsfis.input_names)}
+    with ParallelEvaluator(nsfis, max_workers=2, shard_size=16) as evaluator:
+        outputs = evaluator.compute_defuzzified_outputs(intervals)
+    assert np.array_equal(outputs,
+                          nsfis.compute_defuzzified_outputs(intervals),
+                          equal_nan=True)
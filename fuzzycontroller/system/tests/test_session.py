@@ -0,0 +1,69 @@
+from ..singleton import SingletonFIS
+from ..nonsingleton import NonSingletonFIS
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def sfis():
+    sfis = SingletonFIS()
+    sfis.load_data("fuzzycontroller/system/tests/data.json")
+    yield sfis
+
+
+def test_session_matches_full_evaluation(sfis):
+    rng = np.random.default_rng(0)
+    inputs = {"temperature": 39.0, "headache": 4.0, "age": 65.0}
+    session = sfis.start_session(inputs)
+    assert session.output == sfis.compute_defuzzified_output(inputs)
+    bounds = {"temperature": (34, 42), "headache": (0, 10), "age": (0, 100)}
+    for _ in range(50):
+        name = rng.choice(list(bounds))
+        inputs[name] = float(rng.uniform(*bounds[name]))
+        output = session.update({name: inputs[name]})
+        assert output == sfis.compute_defuzzified_output(inputs)
+        assert np.array_equal(session.aggregate_set,
+                              sfis.compute_aggregate_set(inputs))
+
+
+def test_session_only_recomputes_dependent_rules(sfis):
+    session = sfis.start_session({"temperature": 39.0, "headache": 4.0,
+                                  "age": 65.0})
+    session.update({"age": 30.0, "headache": 4.0})
+    dependent = sfis.rules.dependency_index()["age"]
+    assert session.last_update["variables"] == 1
+    assert session.last_update["rules"] == len(dependent)
+    assert len(dependent) < len(sfis.rules.rules)
+
+    output = session.output
+    assert session.update({"age": 30.0}) == output
+    assert session.last_update == {"variables": 0, "rules": 0, "terms": 0}
+
+
+def test_rejected_update_keeps_state(sfis):
+    inputs = {"temperature": 39.0, "headache": 4.0, "age": 65.0}
+    session = sfis.start_session(inputs)
+    output = session.output
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            session.update({"temperature": 500.0, "age": 30.0})
+        assert session.inputs == inputs
+        assert session.output == output
+    inputs["age"] = 30.0
+    assert session.update({"age": 30.0}) == \
+        sfis.compute_defuzzified_output(inputs)
+
+
+def test_session_nonsingleton():
+    nsfis = NonSingletonFIS()
+    nsfis.load_data("fuzzycontroller/system/tests/data.json")
+    inputs = {"temperature": {"start": 38, "end": 40},
+              "headache": {"start": 3, "end": 5},
+              "age": {"start": 60, "end": 70}}
+    session = nsfis.start_session(inputs)
+    for name, interval in [("headache", {"start": 6, "end": 9}),
+                           ("temperature", {"start": 35, "end": 36}),
+                           ("age", {"start": 10, "end": 20})]:
+        inputs[name] = interval
+        assert session.update({name: interval}) == \
+            nsfis.compute_defuzzified_output(inputs)
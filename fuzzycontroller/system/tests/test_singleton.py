@@ -80,3 +80,168 @@ def test_full_urgency_system(sfis):
                                               "headache": 4,
                                               "age": 65})
     assert output == 93.34755751076897
+
+
+def test_compute_defuzzified_outputs_matches_single_calls(sfis):
+    batch = {"temperature": np.array([34.0, 39.5, 37.0]),
+             "headache": np.array([4.0, 2.0, 7.0]),
+             "age": np.array([65.0, 40.0, 8.0])}
+    outputs = sfis.compute_defuzzified_outputs(batch)
+    for i, output in enumerate(outputs):
+        expected = sfis.compute_defuzzified_output(
+            {key: values[i] for key, values in batch.items()})
+        assert np.isclose(output, expected)
+
+
+def test_compute_defuzzified_outputs_from_array(sfis):
+    batch = np.array([[34.0, 4.0, 65.0], [39.5, 2.0, 40.0]])
+    outputs = sfis.compute_defuzzified_outputs(batch)
+    assert outputs.shape == (2,)
+    assert np.isclose(outputs[0], 93.34755751076897)
+
+
+def test_compute_defuzzified_outputs_wrong_shape(sfis):
+    with pytest.raises(ValueError):
+        sfis.compute_defuzzified_outputs(np.array([[34.0, 4.0]]))
+
+
+def test_compute_aggregate_sets_matches_single_call():
+    sfis = SingletonFIS()
+    sfis.load_data("fuzzycontroller/system/tests/smaller_data.json")
+    aggregate_sets = sfis.compute_aggregate_sets(
+        {"temperature": np.array([37.0, 30.0]),
+         "headache": np.array([5.0, 5.0])})
+    assert np.array_equal(aggregate_sets[0],
+                          sfis.compute_aggregate_set({"temperature": 37.0,
+                                                      "headache": 5.0}))
+
+
+def test_compute_defuzzified_output_exact_engine(sfis):
+    inputs = {"temperature": 40.5, "headache": 6.0, "age": 50.0}
+    sampled = sfis.compute_defuzzified_output(inputs)
+    exact = sfis.compute_defuzzified_output(inputs, engine="exact")
+    assert abs(sampled - exact) < 1e-3
+
+
+def test_compute_defuzzified_output_unknown_engine(sfis):
+    inputs = {"temperature": 40.5, "headache": 6.0, "age": 50.0}
+    with pytest.raises(ValueError):
+        sfis.compute_defuzzified_output(inputs, engine="other")
+    with pytest.raises(ValueError):
+        sfis.compute_defuzzified_output(inputs, "mom", engine="exact")
+
+
+def test_cached_defuzzified_output(sfis):
+    cache = sfis.enable_cache(max_entries=8,
+                              quantization={"temperature": 0.5})
+    inputs = {"temperature": 34.1, "headache": 4.0, "age": 65.0}
+    first = sfis.compute_defuzzified_output(inputs)
+    second = sfis.compute_defuzzified_output({"temperature": 33.9,
+                                              "headache": 4.0, "age": 65.0})
+    assert first == second == sfis.compute_defuzzified_output(
+        {"temperature": 34.0, "headache": 4.0, "age": 65.0}, engine="sampled")
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+
+def test_cache_with_integer_step(sfis):
+    sfis.enable_cache(quantization={"temperature": 1, "age": 5})
+    inputs = {"temperature": 38.7, "headache": 4.0, "age": 63.0}
+    assert sfis.compute_defuzzified_output(inputs) == \
+        sfis._compute_defuzzified_output(
+            {"temperature": 39.0, "headache": 4.0, "age": 65.0},
+            "centroid", "sampled")
+
+
+def test_cache_clamps_to_universe(sfis):
+    sfis.enable_cache(quantization={"temperature": 0.7})
+    inputs = {"temperature": 59.9, "headache": 4.0, "age": 65.0}
+    assert sfis.compute_defuzzified_output(inputs) == \
+        sfis._compute_defuzzified_output(
+            {"temperature": 60.0, "headache": 4.0, "age": 65.0},
+            "centroid", "sampled")
+
+
+def test_load_data_clears_cache(sfis):
+    cache = sfis.enable_cache()
+    sfis.compute_defuzzified_output({"temperature": 34.0, "headache": 4.0,
+                                     "age": 65.0})
+    sfis.load_data("fuzzycontroller/system/tests/data.json")
+    assert len(cache) == 0
+
+
+def test_profiling(sfis):
+    inputs = {"temperature": 34.0, "headache": 4.0, "age": 65.0}
+    expected = sfis.compute_defuzzified_output(inputs)
+    profiler = sfis.enable_profiling()
+    stages = []
+    profiler.add_hook(lambda stage, elapsed_ns, samples: stages.append(stage))
+
+    assert sfis.compute_defuzzified_output(inputs) == expected
+    assert stages == ["fuzzification", "rule_firing", "aggregation",
+                      "defuzzification"]
+    sfis.compute_defuzzified_outputs({name: np.full(5, value)
+                                      for name, value in inputs.items()})
+    snapshot = profiler.snapshot()
+    for stage in stages:
+        assert snapshot["stages"][stage]["calls"] == 2
+        assert snapshot["stages"][stage]["samples"] == 6
+    # Rules whose terms are all zero may be skipped rather than evaluated.
+    assert sum(snapshot["rules"].values()) + snapshot["skipped_rules"] \
+        == 6 * len(sfis.rules.rules)
+
+    sfis.disable_profiling()
+    sfis.compute_defuzzified_output(inputs)
+    assert profiler.calls["fuzzification"] == 2
+
+
+def test_identical_variables_share_arrays():
+    model = SingletonFIS().json_handler.read(
+        "fuzzycontroller/system/tests/data.json")
+    model["inputs"]["temperature2"] = model["inputs"]["temperature"]
+    sfis = SingletonFIS()
+    sfis.load_dict(model)
+    first = sfis.variables["temperature"]
+    second = sfis.variables["temperature2"]
+    assert first.universe is second.universe
+    assert first.term_matrix is second.term_matrix
+    assert not first.term_matrix.flags.writeable
+
+    report = sfis.memory_report()
+    assert report["universe"]["saved_bytes"] == first.universe.nbytes
+    assert report["term_matrix"]["saved_bytes"] == first.term_matrix.nbytes
+    assert sfis.compute_defuzzified_output(
+        {"temperature": 34.0, "temperature2": 34.0, "headache": 4.0,
+         "age": 65.0}) == 93.34755751076897
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-6),
+                                              ("float16", 1e-2)])
+def test_reduced_precision(sfis, dtype, tolerance):
+    reduced = SingletonFIS()
+    reduced.load_data("fuzzycontroller/system/tests/data.json", dtype=dtype)
+    assert reduced.dtype == np.dtype(dtype)
+    assert reduced.variables["age"].term_matrix.dtype == np.dtype(dtype)
+    assert reduced.variables["age"].universe.dtype == np.float64
+    assert reduced.rules.program.output_mfs.dtype == np.dtype(dtype)
+
+    inputs = {"temperature": 34.0, "headache": 4.0, "age": 65.0}
+    assert reduced.compute_aggregate_set(inputs).dtype == np.dtype(dtype)
+    assert np.isclose(reduced.compute_defuzzified_output(inputs),
+                      sfis.compute_defuzzified_output(inputs),
+                      rtol=tolerance)
+    batch = {name: np.linspace(1, 9, 17) for name in sfis.input_names}
+    assert reduced.compute_aggregate_sets(batch).dtype == np.dtype(dtype)
+    assert np.allclose(reduced.compute_defuzzified_outputs(batch),
+                       sfis.compute_defuzzified_outputs(batch),
+                       rtol=tolerance, equal_nan=True)
+
+
+def test_dtype_from_model():
+    model = SingletonFIS().json_handler.read(
+        "fuzzycontroller/system/tests/data.json")
+    sfis = SingletonFIS()
+    sfis.load_dict(dict(model, dtype="float32"))
+    assert sfis.dtype == np.float32
+    with pytest.raises(ValueError):
+        sfis.load_dict(model, dtype="int32")
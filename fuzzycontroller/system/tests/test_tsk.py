@@ -0,0 +1,142 @@
+from ..singleton import SingletonFIS
+from ..tsk import TSKFIS
+import json
+import numpy as np
+import pytest
+
+CONSTANTS = {"none": 0.0, "low": 25.0, "medium": 50.0, "high": 75.0,
+             "emergency": 100.0}
+
+
+def _model(functions: dict) -> dict:
+    with open("fuzzycontroller/system/tests/data.json") as f:
+        model = json.load(f)
+    model["output"] = {"urgency": {"terms": {
+        name: {"name": name, "function": function}
+        for name, function in functions.items()}}}
+    return model
+
+
+@pytest.fixture
+def sfis():
+    sfis = SingletonFIS()
+    sfis.load_data("fuzzycontroller/system/tests/data.json")
+    yield sfis
+
+
+@pytest.fixture
+def tsk():
+    tsk = TSKFIS()
+    tsk.load_dict(_model({name: {"type": "constant", "params": [value]}
+                          for name, value in CONSTANTS.items()}))
+    yield tsk
+
+
+def test_type(tsk):
+    assert tsk.type == "tsk"
+
+
+def test_constant_output_is_weighted_average(tsk, sfis):
+    inputs = {"temperature": 39.0, "headache": 4.0, "age": 65.0}
+    evaluation = sfis.evaluate(inputs)
+    weights = np.array(list(evaluation.rule_strengths.values()))
+    values = np.array([CONSTANTS[rule.consequent.term.name]
+                       for rule in sfis.rules.rules.values()])
+    assert tsk.compute_rule_strengths(inputs) == \
+        pytest.approx(evaluation.rule_strengths)
+    assert tsk.compute_output(inputs) == \
+        pytest.approx(np.dot(weights, values) / weights.sum())
+
+
+def test_linear_consequent():
+    tsk = TSKFIS()
+    functions = {name: {"type": "constant", "params": [value]}
+                 for name, value in CONSTANTS.items()}
+    functions["low"] = {"type": "linear", "params": [1.0, 2.0, 0.5, 3.0]}
+    tsk.load_dict(_model(functions))
+    inputs = {"temperature": 38.0, "headache": 5.0, "age": 20.0}
+    strengths = tsk.compute_rule_strengths(inputs)
+    values = {"low": 38.0 + 2.0 * 5.0 + 0.5 * 20.0 + 3.0, **{
+        name: value for name, value in CONSTANTS.items() if name != "low"}}
+    expected = sum(strengths[name] * values[rule.consequent.term.name]
+                   for name, rule in tsk.rules.rules.items()) \
+        / sum(strengths.values())
+    assert tsk.compute_output(inputs) == pytest.approx(expected)
+
+
+def test_batch_matches_single_inputs(tsk):
+    rng = np.random.default_rng(0)
+    batch = np.column_stack([rng.uniform(34, 42, 50), rng.uniform(0, 10, 50),
+                             rng.uniform(0, 100, 50)])
+    outputs = tsk.compute_outputs(batch)
+    for row, output in zip(batch, outputs):
+        assert output == pytest.approx(
+            tsk.compute_output(dict(zip(tsk.input_names, row))))
+
+
+def test_no_rule_fires():
+    model = _model({name: {"type": "constant", "params": [value]}
+                    for name, value in CONSTANTS.items()})
+    model["rules"] = {"rule1": model["rules"]["rule1"]}
+    tsk = TSKFIS()
+    tsk.load_dict(model)
+    inputs = {"temperature": 37.0, "headache": 4.0, "age": 65.0}
+    with pytest.raises(ValueError):
+        tsk.compute_output(inputs)
+    assert np.isnan(tsk.compute_outputs(
+        {name: np.array([value]) for name, value in inputs.items()}))[0]
+
+
+def test_integer_inputs(tsk, sfis):
+    inputs = {"temperature": 39, "headache": 4, "age": 65}
+    floats = {name: float(value) for name, value in inputs.items()}
+    assert tsk.compute_output(inputs) == tsk.compute_output(floats)
+    assert sfis.compute_defuzzified_output(inputs) == \
+        sfis.compute_defuzzified_output(floats)
+
+
+def test_cached_output(tsk):
+    cache = tsk.enable_cache(quantization={"temperature": 0.5})
+    first = tsk.compute_output({"temperature": 38.9, "headache": 4.0,
+                                "age": 65.0})
+    assert tsk.compute_output({"temperature": 39.1, "headache": 4.0,
+                               "age": 65.0}) == first
+    assert cache.hits == 1
+
+
+def test_evaluate(tsk):
+    inputs = {"temperature": 39.0, "headache": 4.0, "age": 65.0}
+    evaluation = tsk.evaluate(inputs)
+    assert evaluation.output == tsk.compute_output(inputs)
+    assert evaluation.rule_strengths == tsk.compute_rule_strengths(inputs)
+    assert evaluation.output_sets == {}
+    assert evaluation.aggregate_set is None
+
+
+def test_output_sets_not_supported(tsk):
+    inputs = {"temperature": 39.0, "headache": 4.0, "age": 65.0}
+    with pytest.raises(NotImplementedError, match="compute_aggregate_set"):
+        tsk.compute_aggregate_set(inputs)
+    with pytest.raises(NotImplementedError, match="start_session"):
+        tsk.start_session(inputs)
+
+
+def test_compiled_round_trip(tmp_path):
+    tsk = TSKFIS()
+    tsk.load_data("fuzzycontroller/system/tests/tsk_data.json")
+    path = str(tmp_path / "model.fzc")
+    tsk.save_compiled(path)
+    loaded = TSKFIS()
+    loaded.load_compiled(path)
+    assert np.array_equal(loaded.rules.program.coefficients,
+                          tsk.rules.program.coefficients)
+    batch = {name: np.linspace(1, 9, 17) for name in tsk.input_names}
+    batch["temperature"] = np.linspace(35, 42, 17)
+    assert np.array_equal(loaded.compute_outputs(batch),
+                          tsk.compute_outputs(batch), equal_nan=True)
+
+
+def test_invalid_function():
+    tsk = TSKFIS()
+    with pytest.raises(ValueError):
+        tsk.load_dict(_model({"low": {"type": "linear", "params": [1.0]}}))
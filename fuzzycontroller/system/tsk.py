@@ -0,0 +1,315 @@
+from __future__ import annotations
+from .singleton import SingletonFIS
+from .inference import Inference
+from ..rule.program import RuleProgram
+from numpy.typing import NDArray
+import numpy as np
+
+
+class TSKTerm():
+    """A Takagi-Sugeno-Kang consequent term, a function of the crisp inputs
+    rather than a fuzzy set.
+
+    Attributes:
+        name: A string representation of the name.
+        coefficients: the (n_inputs + 1,) coefficients of the function: one
+            per input, in the order of the inputs, then the constant.
+    """
+
+    def __init__(self, term: dict, input_names: list[str]):
+        """Initializes the term from a dictionary.
+
+        Args:
+            term: a dictionary defining the term, of the form
+                {'name': str, 'function': {'type': str, 'params': list}}.
+                A 'constant' function has one parameter, its value. A
+                'linear' function has one coefficient per input, in the
+                order of input_names, followed by the constant.
+            input_names: names of the input variables.
+
+        Raises:
+            ValueError: if the function type or number of parameters is
+                not supported.
+        """
+        self.name = term['name']
+        function = term['function']
+        params = [float(param) for param in function['params']]
+        if function['type'] == "constant" and len(params) == 1:
+            params = [0.0] * len(input_names) + params
+        elif function['type'] != "linear" or \
+                len(params) != len(input_names) + 1:
+            raise ValueError("Invalid function for term %s: %s"
+                             % (self.name, function))
+        self.coefficients = np.array(params)
+
+
+class TSKOutput():
+    """The output of a Takagi-Sugeno-Kang system, holding its consequent
+    terms.
+
+    Attributes:
+        name: A string representation of the name.
+        terms: A dictionary of the :class:`TSKTerm` objects, keyed by name.
+    """
+
+    def __init__(self, name: str, data: dict, input_names: list[str]):
+        """Initializes the output from a dictionary.
+
+        Args:
+            name: the name of the output.
+            data: a dictionary of the form {'terms': {'term1': term1, ...}},
+                see :class:`TSKTerm`.
+            input_names: names of the input variables.
+        """
+        self.name = name
+        self.terms = {key: TSKTerm(term, input_names)
+                      for key, term in data['terms'].items()}
+
+    def get_term(self, search_term: str) -> TSKTerm:
+        """Returns a consequent term by name.
+
+        Args:
+            search_term: name of the term.
+        """
+        return self.terms[search_term]
+
+
+class TSKProgram(RuleProgram):
+    """A :class:`.RuleProgram` whose consequents are :class:`TSKTerm`
+    functions instead of fuzzy sets.
+
+    Attributes:
+        coefficients: (T x (n_inputs + 1)) matrix of the coefficients of the
+            consequent terms, in the order of :attr:`output_term_names`.
+        output_mfs: an empty (T x 0) matrix, as there is no output universe.
+    """
+
+    def _stack_consequents(self, terms: list):
+        """Stacks the coefficients of the consequent terms into
+        :attr:`coefficients`.
+
+        Args:
+            terms: the consequent terms, in the order of
+                :attr:`output_term_names`.
+        """
+        self.coefficients = np.array([term.coefficients for term in terms])
+        self.output_mfs = np.empty((len(terms), 0))
+
+    def tables(self) -> dict[str, NDArray]:
+        """Returns the arrays of the program, keyed by name, including the
+        coefficients of the consequent terms."""
+        return dict(super().tables(), coefficients=self.coefficients)
+
+    def attach(self, tables: dict[str, NDArray]):
+        """Replaces the arrays of the program with the equal arrays of
+        tables, see :meth:`.RuleProgram.attach`.
+
+        Args:
+            tables: arrays keyed by name, as returned by :meth:`tables`.
+        """
+        self.coefficients = tables["coefficients"]
+        super().attach(tables)
+
+
+def _unsupported(name: str):
+    """Returns a method which raises NotImplementedError, standing in for a
+    method of :class:`.FIS` which needs output fuzzy sets."""
+    def method(self, *args, **kwargs):
+        raise NotImplementedError(
+            f"{type(self).__name__}.{name} is not supported, as a TSK "
+            "system has no output fuzzy sets")
+    method.__name__ = name
+    method.__doc__ = "Not supported, as there are no output fuzzy sets."
+    return method
+
+
+class TSKFIS(SingletonFIS):
+    """A Takagi-Sugeno-Kang Fuzzy Inference System.
+
+    The inputs are fuzzified and the rules evaluated as in a
+    :class:`.SingletonFIS`, but the consequent of each rule is a constant or
+    a linear function of the inputs. The output is the average of the rule
+    consequents weighted by the rule strengths, so there is no output
+    universe, clipping or defuzzification: each evaluation costs O(R).
+
+    The model is in the same format as for the other systems, except that
+    the terms of the output have a 'function' instead of an 'mf', see
+    :class:`TSKTerm`, and the output has no universe. Inherits from
+    :class:`.SingletonFIS`.
+
+    As there are no output fuzzy sets, compute_output_sets,
+    compute_aggregate_set, compute_aggregate_sets and start_session raise
+    NotImplementedError, and :meth:`evaluate` returns no output sets. The
+    defuzzification method taken by the other methods is ignored.
+    """
+
+    program_class = TSKProgram
+
+    def __init__(self) -> None:
+        """Initializes the Takagi-Sugeno-Kang inference system."""
+        super().__init__()
+        self._type = "tsk"
+
+    def _load_output(self, name: str, output_data: dict,
+                     tables: dict[str, NDArray] = None) -> None:
+        """Loads the output from a dictionary, as a :class:`TSKOutput`.
+
+        Args:
+            name: name of the output.
+            output_data: dictionary containing the output info.
+            tables: unused, as the consequent coefficients are part of the
+                compiled rules.
+        """
+        self.variables[name] = TSKOutput(name, output_data, self.input_names)
+
+    def compute_rule_strengths(self, crisp_inputs: dict[str, float]) \
+            -> dict[str, float]:
+        """Computes the strength of every rule.
+
+        Args:
+            crisp_inputs: dictionary containing the crisp inputs.
+
+        Returns:
+            dictionary of rule strengths, keyed by rule name.
+        """
+        fs = self._stage("fuzzification", 1, self.get_all_firing_strengths,
+                         crisp_inputs)
+        strengths = self._stage("rule_firing", 1, self._rule_strengths, fs)
+        return dict(zip(self.rules.program.rule_names, strengths))
+
+    def compute_output(self, crisp_inputs: dict[str, float]) -> float:
+        """Computes the output for the given crisp inputs, using the cache
+        when it is enabled.
+
+        Args:
+            crisp_inputs: dictionary containing the crisp inputs.
+
+        Returns:
+            the strength-weighted average of the rule consequents.
+
+        Raises:
+            ValueError: if no rule fires.
+        """
+        return self.compute_defuzzified_output(crisp_inputs)
+
+    def _compute_defuzzified_output(self, crisp_inputs,
+                                    defuzzication_method: str,
+                                    engine: str) -> float:
+        """Computes the output, bypassing the cache. The defuzzification
+        method and engine are ignored, as a TSK output needs no
+        defuzzification. See :meth:`compute_output`."""
+        return self._evaluate(crisp_inputs)[2]
+
+    def evaluate(self, crisp_inputs,
+                 defuzzication_method="centroid") -> Inference:
+        """Evaluates the system for the given inputs and returns every
+        intermediate result.
+
+        Args:
+            crisp_inputs: dictionary containing the crisp inputs.
+            defuzzication_method: ignored.
+
+        Returns:
+            the :class:`.Inference` holding the firing strengths, rule
+            strengths and output. Its output_sets are empty and its
+            aggregate_set is None, as there are no output fuzzy sets.
+
+        Raises:
+            ValueError: if no rule fires.
+        """
+        fs, strengths, output = self._evaluate(crisp_inputs)
+        return Inference(fs, dict(zip(self.rules.program.rule_names,
+                                      strengths)), {}, None, output)
+
+    def _evaluate(self, crisp_inputs) -> tuple[dict, NDArray, float]:
+        """Returns the firing strengths, rule strengths and output for one
+        input."""
+        fs = self._stage("fuzzification", 1, self.get_all_firing_strengths,
+                         crisp_inputs)
+        strengths = self._stage("rule_firing", 1, self._rule_strengths, fs)
+        x = np.array([crisp_inputs[name] for name in self.input_names]
+                     + [1.0], dtype=float)
+        return fs, strengths, self._stage("defuzzification", 1,
+                                          self._weighted_average,
+                                          strengths, x)
+
+    def _weighted_average(self, strengths: NDArray, x: NDArray) -> float:
+        """Computes the strength-weighted average of the rule consequents
+        for one input.
+
+        Args:
+            strengths: (R,) array of rule strengths.
+            x: the crisp inputs, followed by 1.
+
+        Raises:
+            ValueError: if no rule fires.
+        """
+        program = self.rules.program
+        weights = program.consequent_sums(strengths)
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError("Total firing strength is zero")
+        return float(np.dot(weights, program.coefficients @ x) / total)
+
+    def compute_outputs(self, batch: dict[str, NDArray] or NDArray) \
+            -> NDArray:
+        """Computes the outputs for a batch of crisp inputs.
+
+        Args:
+            batch: the batch of inputs, see
+                :meth:`get_batch_firing_strengths`.
+
+        Returns:
+            a numpy array with one output per sample. Samples which fire no
+            rules are nan.
+        """
+        batch = self._batch_inputs(batch)
+        samples = self._batch_size(batch)
+        fs = self._stage("fuzzification", samples,
+                         self.get_batch_firing_strengths, batch)
+        strengths = self._stage("rule_firing", samples, self._rule_strengths,
+                                fs, samples)
+        x = np.vstack([batch[name] for name in self.input_names]
+                      + [np.ones(samples)])
+        return self._stage("defuzzification", samples,
+                           self._weighted_averages, strengths, x)
+
+    def _weighted_averages(self, strengths: NDArray, x: NDArray) -> NDArray:
+        """Computes the strength-weighted average of the rule consequents
+        for a batch.
+
+        Args:
+            strengths: (R x N) matrix of rule strengths.
+            x: (n_inputs + 1 x N) matrix of the crisp inputs, followed by a
+                row of ones.
+        """
+        program = self.rules.program
+        weights = program.consequent_sums(strengths)
+        total = weights.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total > 0, (weights * (program.coefficients @ x))
+                            .sum(axis=0) / total, np.nan)
+
+    def compute_defuzzified_outputs(self, batch,
+                                    defuzzication_method="centroid") \
+            -> NDArray:
+        """Same as :meth:`compute_outputs`, so that the batch interfaces,
+        e.g. the command line, the server and the
+        :class:`.ParallelEvaluator`, work with a TSK system. The
+        defuzzification method is ignored."""
+        return self.compute_outputs(batch)
+
+    def graph_membership_functions(self):
+        """Graphs the membership functions of the input variables, as the
+        output has none.
+
+        Requires matplotlib, which is only imported when this is called.
+        """
+        from ..utils.plotting import graph_variables
+        graph_variables({name: self.variables[name]
+                         for name in self.input_names})
+
+    compute_output_sets = _unsupported("compute_output_sets")
+    compute_aggregate_set = _unsupported("compute_aggregate_set")
+    compute_aggregate_sets = _unsupported("compute_aggregate_sets")
+    start_session = _unsupported("start_session")
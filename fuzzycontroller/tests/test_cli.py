@@ -0,0 +1,109 @@
+from ..cli import main, evaluate_stream, load_system
+import io
+import pytest
+import json
+import subprocess
+import sys
+import numpy as np
+
+MODEL = "fuzzycontroller/system/tests/data.json"
+
+
+def test_evaluate_stream_csv_in_chunks():
+    fis = load_system(MODEL, "singleton")
+    source = io.StringIO("temperature,headache,age\n34,4,65\n"
+                         "39.5,2,40\n37,7,8\n")
+    sink = io.StringIO()
+    assert evaluate_stream(fis, source, sink, "csv", "csv", chunk_size=2) == 3
+    lines = sink.getvalue().splitlines()
+    assert lines[0] == "output"
+    assert len(lines) == 4
+    assert np.isclose(float(lines[1]), 93.34755751076897)
+
+
+def test_evaluate_stream_nonsingleton_jsonl():
+    fis = load_system(MODEL, "non-singleton")
+    row = {"temperature": {"start": 36.5, "end": 38},
+           "headache": {"start": 3, "end": 4},
+           "age": {"start": 10, "end": 15}}
+    source = io.StringIO(json.dumps(row) + "\n\n" + json.dumps(row) + "\n")
+    sink = io.StringIO()
+    assert evaluate_stream(fis, source, sink, "jsonl", "jsonl") == 2
+    outputs = [json.loads(line)["output"]
+               for line in sink.getvalue().splitlines()]
+    assert [round(output, 5) for output in outputs] == [35.44026] * 2
+
+
+def test_evaluate_stream_nonsingleton_csv_columns():
+    fis = load_system(MODEL, "non-singleton")
+    source = io.StringIO("temperature_start,temperature_end,headache_start,"
+                         "headache_end,age_start,age_end\n"
+                         "36.5,38,3,4,10,15\n")
+    sink = io.StringIO()
+    evaluate_stream(fis, source, sink, "csv", "csv")
+    assert round(float(sink.getvalue().splitlines()[1]), 5) == 35.44026
+
+
+def test_main_eval_files(tmp_path, capsys):
+    source = tmp_path / "inputs.csv"
+    source.write_text("temperature,headache,age\n34,4,65\n")
+    sink = tmp_path / "outputs.jsonl"
+    assert main(["eval", MODEL, "-i", str(source), "-o", str(sink)]) == 0
+    output = json.loads(sink.read_text())["output"]
+    assert np.isclose(output, 93.34755751076897)
+    assert "rows/sec" in capsys.readouterr().err
+
+
+def test_module_entry_point():
+    result = subprocess.run(
+        [sys.executable, "-m", "fuzzycontroller", "eval", MODEL,
+         "--format", "jsonl"],
+        input='{"temperature": 34, "headache": 4, "age": 65}\n',
+        capture_output=True, text=True, check=True)
+    assert np.isclose(json.loads(result.stdout)["output"], 93.34755751076897)
+
+
+def test_compile_command(tmp_path, capsys):
+    compiled = tmp_path / "model.fzc"
+    assert main(["compile", MODEL, "-o", str(compiled)]) == 0
+    fis = load_system(str(compiled), "singleton")
+    output = fis.compute_defuzzified_output(
+        {"temperature": 34.0, "headache": 4.0, "age": 65.0})
+    assert output == 93.34755751076897
+
+
+def test_compile_command_nonsingleton(tmp_path):
+    compiled = tmp_path / "model.fzc"
+    assert main(["compile", MODEL, "-o", str(compiled),
+                 "--type", "non-singleton"]) == 0
+    inputs = {"temperature": {"start": 36.5, "end": 38},
+              "headache": {"start": 3, "end": 4},
+              "age": {"start": 10, "end": 15}}
+    assert load_system(str(compiled), "non-singleton") \
+        .compute_defuzzified_output(inputs) == \
+        load_system(MODEL, "non-singleton").compute_defuzzified_output(inputs)
+
+
+def test_evaluate_stream_bad_row_names_line():
+    fis = load_system(MODEL, "singleton")
+    source = io.StringIO("temperature,headache,age\n34,4,65\n"
+                         "500,2,40\n")
+    with pytest.raises(ValueError, match="line 3"):
+        evaluate_stream(fis, source, io.StringIO(), "csv", "csv")
+
+
+def test_evaluate_stream_skip_errors(capsys):
+    fis = load_system(MODEL, "singleton")
+    good = '{"temperature": 34, "headache": 4, "age": 65}\n'
+    source = io.StringIO(good + "not json\n" + good
+                         + '{"temperature": 34, "age": 65}\n' + good)
+    sink = io.StringIO()
+    assert evaluate_stream(fis, source, sink, "jsonl", "jsonl",
+                           chunk_size=2, skip_errors=True) == 5
+    outputs = [json.loads(line)["output"]
+               for line in sink.getvalue().splitlines()]
+    assert outputs[1] is None and outputs[3] is None
+    assert np.allclose([outputs[0], outputs[2], outputs[4]],
+                       93.34755751076897)
+    err = capsys.readouterr().err
+    assert "line 2" in err and "line 4" in err
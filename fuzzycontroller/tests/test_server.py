@@ -0,0 +1,92 @@
+from ..cli import load_system
+from ..server import InferenceServer, MicroBatcher
+import asyncio
+import json
+import numpy as np
+
+MODEL = "fuzzycontroller/system/tests/data.json"
+INPUTS = {"temperature": 34, "headache": 4, "age": 65}
+
+
+def test_micro_batcher_batches_concurrent_requests():
+    fis = load_system(MODEL, "singleton")
+
+    async def run():
+        batcher = MicroBatcher(fis, max_batch_size=8, max_wait=0.05)
+        batcher.start()
+        outputs = await asyncio.gather(*[batcher.evaluate(INPUTS)
+                                         for _ in range(20)])
+        await batcher.stop()
+        return outputs, batcher.stats()
+
+    outputs, stats = asyncio.run(run())
+    assert np.allclose(outputs, 93.34755751076897)
+    assert stats["requests"] == 20
+    assert stats["batches"] == 3
+    assert stats["p50_ms"] <= stats["p99_ms"]
+
+
+def test_micro_batcher_isolates_bad_requests():
+    fis = load_system(MODEL, "singleton")
+
+    async def run():
+        batcher = MicroBatcher(fis, max_wait=0.05)
+        batcher.start()
+        results = await asyncio.gather(
+            batcher.evaluate(INPUTS),
+            batcher.evaluate(dict(INPUTS, age=1000)),
+            return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    good, bad = asyncio.run(run())
+    assert np.isclose(good, 93.34755751076897)
+    assert isinstance(bad, ValueError)
+
+
+def test_micro_batcher_tsk():
+    fis = load_system("fuzzycontroller/system/tests/tsk_data.json", "tsk")
+
+    async def run():
+        batcher = MicroBatcher(fis, max_wait=0.05)
+        batcher.start()
+        outputs = await asyncio.gather(*[batcher.evaluate(INPUTS)
+                                         for _ in range(4)])
+        await batcher.stop()
+        return outputs
+
+    assert np.allclose(asyncio.run(run()), fis.compute_output(INPUTS))
+
+
+def test_server_round_trip():
+    fis = load_system(MODEL, "non-singleton")
+    inputs = {"temperature": {"start": 36.5, "end": 38},
+              "headache": {"start": 3, "end": 4},
+              "age": {"start": 10, "end": 15}}
+
+    async def run():
+        server = InferenceServer(fis, max_wait=0.01)
+        await server.start(port=0)
+        host, port = server.address[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        requests = [{"id": i, "inputs": inputs} for i in range(5)]
+        requests += [{"inputs": {}}, "not json"]
+        writer.write("".join(
+            (r if isinstance(r, str) else json.dumps(r)) + "\n"
+            for r in requests).encode())
+        await writer.drain()
+        responses = [json.loads(await reader.readline())
+                     for _ in requests]
+        writer.write(b'{"command": "stats"}\n')
+        responses.append(json.loads(await reader.readline()))
+        writer.close()
+        await server.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert [response["id"] for response in responses[:5]] == list(range(5))
+    assert [round(response["output"], 5) for response in responses[:5]] \
+        == [35.44026] * 5
+    assert "error" in responses[5]
+    assert "error" in responses[6]
+    assert responses[7]["requests"] == 6
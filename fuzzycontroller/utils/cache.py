@@ -0,0 +1,184 @@
+from __future__ import annotations
+from collections import OrderedDict
+import threading
+
+_MISSING = object()
+
+
+class OutputCache():
+    """A bounded cache of defuzzified outputs.
+
+    Inputs are quantized before being used as a key, so that inputs which
+    are nearly the same share an entry. When the cache is full an entry is
+    evicted, either the least recently used ('lru') or the least frequently
+    used ('lfu') one. The cache can be shared by many threads.
+
+    Attributes:
+        max_entries: maximum number of cached outputs.
+        quantization: dictionary of quantization steps, keyed by input
+            variable name. Inputs of other variables are used as they are.
+        bounds: dictionary of the (lower, upper) bounds of the universe of
+            every quantized variable, keyed by name. Quantized inputs are
+            clamped to them.
+        policy: eviction policy, either 'lru' or 'lfu'.
+        hits: number of lookups which found an entry.
+        misses: number of lookups which did not find an entry.
+        evictions: number of evicted entries.
+    """
+
+    def __init__(self, max_entries: int = 1024,
+                 quantization: dict[str, float] = None,
+                 policy: str = "lru",
+                 bounds: dict[str, tuple[float, float]] = None):
+        """Initializes the cache.
+
+        Args:
+            max_entries: maximum number of cached outputs.
+            quantization: dictionary of quantization steps, keyed by input
+                variable name.
+            policy: eviction policy, either 'lru' or 'lfu'.
+            bounds: dictionary of the (lower, upper) bounds of the universe
+                of the variables, keyed by name.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if policy not in ("lru", "lfu"):
+            raise ValueError("Unknown eviction policy: %s" % policy)
+        self.max_entries = max_entries
+        self.quantization = dict(quantization or {})
+        self.policy = policy
+        self.bounds = dict(bounds or {})
+        self._entries = OrderedDict()
+        # LFU bookkeeping: the use count of every key, the keys of every
+        # count, oldest first, and the smallest count, so that evicting
+        # and counting a hit are O(1).
+        self._counts = {}
+        self._buckets = {}
+        self._min_count = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def quantize(self, inputs: dict) -> dict:
+        """Rounds the inputs to the nearest multiple of their quantization
+        step, as floats, clamped to the bounds of their universe.
+        Non-singleton inputs have their start and end rounded.
+
+        Args:
+            inputs: dictionary of inputs keyed by variable name.
+
+        Returns:
+            a new dictionary of quantized inputs.
+        """
+        quantized = {}
+        for name, value in inputs.items():
+            step = self.quantization.get(name)
+            if step is None:
+                quantized[name] = value
+            elif isinstance(value, dict):
+                quantized[name] = {key: self._round(name, bound, step)
+                                   for key, bound in value.items()}
+            else:
+                quantized[name] = self._round(name, value, step)
+        return quantized
+
+    def _round(self, name: str, value: float, step: float) -> float:
+        """Rounds one value to its quantization step and clamps it to the
+        bounds of its variable."""
+        value = float(round(value / step) * step)
+        if name in self.bounds:
+            lower, upper = self.bounds[name]
+            value = min(max(value, lower), upper)
+        return value
+
+    def key(self, inputs: dict, *options) -> tuple:
+        """Builds the cache key of some (quantized) inputs.
+
+        Args:
+            inputs: dictionary of inputs keyed by variable name.
+            options: any other arguments the output depends on.
+
+        Returns:
+            a hashable key.
+        """
+        return tuple(sorted(
+            (name, tuple(sorted(value.items())) if isinstance(value, dict)
+             else value) for name, value in inputs.items())) + options
+
+    def get(self, key: tuple, default=None):
+        """Looks up a cached output.
+
+        Args:
+            key: the cache key.
+            default: value returned when the key is not cached.
+
+        Returns:
+            the cached output, or default.
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            else:
+                self._count(key)
+            return value
+
+    def _count(self, key: tuple):
+        """Moves a key to the bucket of the next use count."""
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def put(self, key: tuple, value):
+        """Caches an output, evicting an entry if the cache is full.
+
+        Args:
+            key: the cache key.
+            value: the output.
+        """
+        with self._lock:
+            new = key not in self._entries
+            if new and len(self._entries) >= self.max_entries:
+                if self.policy == "lru":
+                    self._entries.popitem(last=False)
+                else:
+                    bucket = self._buckets[self._min_count]
+                    evicted, _ = bucket.popitem(last=False)
+                    if not bucket:
+                        del self._buckets[self._min_count]
+                    del self._entries[evicted]
+                    del self._counts[evicted]
+                self.evictions += 1
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if new and self.policy == "lfu":
+                self._counts[key] = 0
+                self._buckets.setdefault(0, OrderedDict())[key] = None
+                self._min_count = 0
+
+    def clear(self):
+        """Removes every entry. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._counts.clear()
+            self._buckets.clear()
+            self._min_count = 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns the counters of the cache."""
+        return {"entries": len(self._entries), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from ..linguistic.variables import LinguisticVariable
+import matplotlib.pyplot as plt
+
+
+def graph_variables(variables: dict[str, LinguisticVariable]):
+    """Graphs the membership functions of linguistic variables, one
+    subplot per variable.
+
+    This module imports matplotlib, so it is only imported when a graph is
+    requested.
+
+    Args:
+        variables: dictionary of linguistic variables, keyed by name.
+    """
+    fig, axs = plt.subplots(nrows=len(variables), figsize=(15, 5))
+    for i, (key, variable) in enumerate(variables.items()):
+        variable.graph(axs[i])
+        axs[i].set_title(key)
+        axs[i].legend()
+
+    for ax in axs:
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.get_xaxis().tick_bottom()
+        ax.get_yaxis().tick_left()
+
+    plt.tight_layout()
+    plt.show()
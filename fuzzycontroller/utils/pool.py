@@ -0,0 +1,84 @@
+from __future__ import annotations
+from numpy.typing import NDArray
+from typing import Callable, Hashable
+
+
+class ArrayPool():
+    """Interns read-only numpy arrays by key.
+
+    The first request for a key builds the array, makes it read-only and
+    keeps it; later requests for the same key get the same array back
+    instead of a new copy. Keys are tuples whose first item is the kind of
+    array, e.g. ('universe', start, end, step), and the pool counts the
+    requests and bytes saved for every kind.
+
+    Attributes:
+        stats: dictionary of counters, keyed by kind, of the form
+            {'requests': int, 'unique': int, 'bytes': int,
+            'saved_bytes': int}. 'bytes' is the size of the unique arrays
+            and 'saved_bytes' the size of the copies which were not made.
+    """
+
+    def __init__(self):
+        """Initializes an empty pool."""
+        self._arrays = {}
+        self._keys = {}
+        self.stats = {}
+
+    def __len__(self) -> int:
+        return len(self._arrays)
+
+    def intern(self, key: tuple, build: Callable[[], NDArray]) -> NDArray:
+        """Returns the array interned under key, building it if needed.
+
+        Args:
+            key: hashable key, whose first item is the kind of array.
+            build: called without arguments to build the array.
+
+        Returns:
+            the shared, read-only array.
+        """
+        stats = self.stats.setdefault(key[0], {"requests": 0, "unique": 0,
+                                               "bytes": 0, "saved_bytes": 0})
+        stats["requests"] += 1
+        array = self._arrays.get(key)
+        if array is not None:
+            stats["saved_bytes"] += array.nbytes
+            return array
+
+        array = build()
+        array.flags.writeable = False
+        self._arrays[key] = array
+        self._keys[id(array)] = key
+        stats["unique"] += 1
+        stats["bytes"] += array.nbytes
+        return array
+
+    def key_of(self, array: NDArray) -> Hashable:
+        """Returns the key an array was interned under, or None if it is not
+        held by the pool."""
+        return self._keys.get(id(array))
+
+    def release(self, kind: str):
+        """Drops the arrays of one kind, e.g. intermediate arrays which are
+        not needed once loading is done. The counters are kept.
+
+        Args:
+            kind: the kind of array.
+        """
+        for key in [key for key in self._arrays if key[0] == kind]:
+            del self._keys[id(self._arrays.pop(key))]
+
+    def report(self) -> dict[str, dict[str, int]]:
+        """Returns the counters of every kind and their total.
+
+        Returns:
+            dictionary of the form {kind: {'requests', 'unique', 'bytes',
+            'saved_bytes'}, 'total': {...}}.
+        """
+        report = {kind: dict(stats) for kind, stats in self.stats.items()}
+        report["total"] = {name: sum(stats[name]
+                                     for stats in self.stats.values())
+                           for name in ("requests", "unique", "bytes",
+                                        "saved_bytes")}
+        return report
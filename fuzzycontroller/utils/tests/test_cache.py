@@ -0,0 +1,76 @@
+from ..cache import OutputCache
+import pytest
+
+
+def test_quantize():
+    cache = OutputCache(quantization={"temperature": 0.5, "age": 5})
+    quantized = cache.quantize({"temperature": 37.2, "age": {"start": 11,
+                                                             "end": 14},
+                                "headache": 3.3})
+    assert quantized == {"temperature": 37.0,
+                         "age": {"start": 10.0, "end": 15.0},
+                         "headache": 3.3}
+    assert all(isinstance(bound, float)
+               for bound in quantized["age"].values())
+
+
+def test_quantize_returns_floats_within_bounds():
+    cache = OutputCache(quantization={"temperature": 1, "age": 0.7},
+                        bounds={"age": (0.0, 60.0)})
+    quantized = cache.quantize({"temperature": 37, "age": 59.9})
+    assert quantized == {"temperature": 37.0, "age": 60.0}
+    assert isinstance(quantized["temperature"], float)
+
+
+def test_get_and_put_counters():
+    cache = OutputCache()
+    key = cache.key({"temperature": 37.0}, "centroid")
+    assert cache.get(key) is None
+    cache.put(key, 12.5)
+    assert cache.get(key) == 12.5
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1,
+                             "evictions": 0}
+
+
+def test_lru_eviction():
+    cache = OutputCache(max_entries=2)
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    cache.get(("a",))
+    cache.put(("c",), 3)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1
+    assert cache.evictions == 1
+
+
+def test_lfu_eviction():
+    cache = OutputCache(max_entries=2, policy="lfu")
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    cache.get(("b",))
+    cache.get(("a",))
+    cache.get(("a",))
+    cache.put(("c",), 3)
+    assert cache.get(("b",)) is None
+    assert len(cache) == 2
+
+
+def test_lfu_evicts_oldest_of_least_used():
+    cache = OutputCache(max_entries=3, policy="lfu")
+    for key in "abc":
+        cache.put((key,), key)
+    cache.get(("a",))
+    cache.put(("d",), "d")
+    cache.put(("e",), "e")
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) is None
+    assert cache.get(("a",)) == "a"
+    assert cache.evictions == 2
+    cache.clear()
+    cache.put(("f",), "f")
+    assert len(cache) == 1
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        OutputCache(policy="fifo")
@@ -0,0 +1,31 @@
+from ..pool import ArrayPool
+import numpy as np
+import pytest
+
+
+def test_intern_shares_read_only_arrays():
+    pool = ArrayPool()
+    first = pool.intern(("universe", 0, 10, 1), lambda: np.arange(0, 10, 1.0))
+    second = pool.intern(("universe", 0, 10, 1), lambda: np.zeros(10))
+    assert first is second
+    assert not first.flags.writeable
+    with pytest.raises(ValueError):
+        first[0] = 1
+    assert pool.key_of(first) == ("universe", 0, 10, 1)
+    assert pool.key_of(np.arange(0, 10, 1.0)) is None
+    assert pool.stats["universe"] == {"requests": 2, "unique": 1,
+                                      "bytes": 80, "saved_bytes": 80}
+
+
+def test_release_and_report():
+    pool = ArrayPool()
+    mf = pool.intern(("mf", 1), lambda: np.ones(4))
+    pool.intern(("mf", 1), lambda: np.ones(4))
+    pool.intern(("term_matrix", 1), lambda: np.ones((2, 4)))
+    pool.release("mf")
+    assert len(pool) == 1
+    assert pool.key_of(mf) is None
+    report = pool.report()
+    assert report["mf"]["saved_bytes"] == 32
+    assert report["total"] == {"requests": 3, "unique": 2, "bytes": 96,
+                               "saved_bytes": 32}
@@ -0,0 +1,42 @@
+from ..profiling import Profiler, STAGES
+
+
+def test_record_and_hooks():
+    profiler = Profiler()
+    seen = []
+    hook = profiler.add_hook(lambda *args: seen.append(args))
+    profiler.record("aggregation", 150, samples=3)
+    profiler.record("aggregation", 50)
+    assert seen == [("aggregation", 150, 3), ("aggregation", 50, 1)]
+    profiler.remove_hook(hook)
+    profiler.record("aggregation", 10)
+    assert len(seen) == 2
+
+    stages = profiler.snapshot()["stages"]
+    assert stages["aggregation"] == {"calls": 3, "samples": 5,
+                                     "total_ns": 210, "mean_ns": 70}
+    assert stages["fuzzification"]["calls"] == 0
+
+
+def test_time():
+    profiler = Profiler()
+    assert profiler.time("defuzzification", 1, max, 2, 5) == 5
+    assert profiler.calls["defuzzification"] == 1
+    assert profiler.times_ns["defuzzification"] >= 0
+
+
+def test_count_rules_and_reset():
+    profiler = Profiler()
+    profiler.count_rules(["rule1", "rule2"])
+    profiler.count_rules(["rule1"], samples=4, skipped=1)
+    snapshot = profiler.snapshot()
+    assert snapshot["rules"] == {"rule1": 5, "rule2": 1}
+    assert snapshot["skipped_rules"] == 4
+
+    profiler.reset()
+    assert profiler.snapshot() == {
+        "stages": {stage: {"calls": 0, "samples": 0, "total_ns": 0,
+                           "mean_ns": 0} for stage in STAGES},
+        "rules": {}, "skipped_rules": 0}
+    # snapshots are copies
+    assert snapshot["rules"] == {"rule1": 5, "rule2": 1}